@@ -0,0 +1,163 @@
+# backend/async_location_service.py
+
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+from geopy.adapters import AioHTTPAdapter
+from geopy.geocoders import Nominatim
+
+from backend.gazetteer import Gazetteer
+from backend.geocode_cache import GeocodeCache, normalize_location_query
+from backend.geocode_scheduler import AsyncGeocodeScheduler, GeocodeDeadlineError
+from backend.location_service import LocationService
+from backend.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+class AsyncLocationService:
+    """
+    Asyncio variant of LocationService built on geopy's aiohttp adapter.
+    
+    The geocode cache's in-memory tier is used directly; lookups and writes
+    that reach its SQLite store run in a worker thread so they never stall
+    the loop.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[GeocodeCache] = None,
+                 gazetteer: Optional[Gazetteer] = None, scheduler: Optional[AsyncGeocodeScheduler] = None,
+                 domain: str = "nominatim.openstreetmap.org", scheme: str = "https"):
+        """
+        Initialize the async location service.
+        
+        Args:
+            api_key: Optional API key for geocoding service
+            cache: Optional cache of geocoding results
+            gazetteer: Optional offline gazetteer consulted before the geocoder
+            scheduler: Queue pacing geocoder calls (defaults to 1 request/second)
+            domain: Host (and optional port) of the Nominatim server
+            scheme: "https", or "http" for a local stand-in
+        """
+        self.api_key = api_key
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.scheduler = scheduler if scheduler is not None else AsyncGeocodeScheduler()
+        # Nominatim over aiohttp; the HTTP session is created lazily on first use
+        self.geolocator = Nominatim(user_agent="lunar_observer", adapter_factory=AioHTTPAdapter, domain=domain, scheme=scheme)
+    
+    async def get_coordinates(self, location_name: str, timeout: Optional[float] = None,
+                              client: Any = None) -> Dict[str, Any]:
+        """
+        Convert a location name to geographic coordinates.
+        
+        Args:
+            location_name: Name of the location (e.g., "Los Angeles, CA")
+            timeout: Seconds to wait for a turn at the geocoder (None waits indefinitely)
+            client: Caller identity used to share the geocoder fairly
+            
+        Returns:
+            Dictionary with latitude, longitude, and formatted address
+            
+        Raises:
+            ValueError: If location cannot be found
+            GeocodeDeadlineError: If the geocoder cannot be reached within timeout
+        """
+        if self.gazetteer is not None:
+            place = self.gazetteer.lookup(location_name)
+            if place is not None:
+                return place
+        
+        cached = await self._lookup_cache(location_name)
+        if cached is not None:
+            return cached
+        
+        try:
+            # Identical pending queries share one geocoder call
+            return await self.scheduler.submit(
+                normalize_location_query(location_name),
+                lambda: self._geocode(location_name),
+                timeout=timeout,
+                client=client
+            )
+        except GeocodeDeadlineError:
+            logger.warning("Geocoding deadline missed", extra={"location": location_name})
+            raise
+        except Exception as e:
+            logger.warning("Geocoding failed", extra={"location": location_name, "error": str(e)})
+            raise ValueError(f"Error finding location: {str(e)}")
+    
+    async def _geocode(self, location_name: str) -> Dict[str, Any]:
+        """
+        Ask the geocoder for a location and cache the outcome.
+        
+        Args:
+            location_name: Name of the location
+            
+        Returns:
+            Dictionary with latitude, longitude, and formatted address
+            
+        Raises:
+            ValueError: If the geocoder found nothing
+        """
+        with observe_upstream("nominatim") as call:
+            location = await self.geolocator.geocode(location_name)
+            call.status = "ok" if location is not None else "not_found"
+        logger.info("Geocoded location", extra={"location": location_name, "status": call.status})
+        
+        if location is None:
+            await self._store_cache(location_name, None)
+            raise ValueError(f"Location not found: {location_name}")
+        
+        location_data = LocationService._to_location_data(location)
+        await self._store_cache(location_name, location_data)
+        return location_data
+    
+    async def _lookup_cache(self, location_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously geocoded location without blocking the loop.
+        
+        Args:
+            location_name: Name of the location
+            
+        Returns:
+            Cached location data, or None on a miss
+            
+        Raises:
+            ValueError: If the location is cached as not found
+        """
+        if self.cache is None:
+            return None
+        
+        hit, location_data = self.cache.get(location_name, memory_only=True)
+        if not hit and self.cache.persistent_cache is not None:
+            hit, location_data = await asyncio.to_thread(self.cache.get, location_name)
+        if hit and location_data is None:
+            raise ValueError(f"Error finding location: Location not found: {location_name}")
+        return location_data
+    
+    async def _store_cache(self, location_name: str, location_data: Optional[Dict[str, Any]]) -> None:
+        """
+        Cache a geocoding outcome, writing to the SQLite store off the loop.
+        
+        Args:
+            location_name: Name of the location
+            location_data: Resolved location, or None if the geocoder found nothing
+        """
+        if self.cache is None:
+            return
+        
+        if location_data is None:
+            store, args = self.cache.set_not_found, (location_name,)
+        else:
+            store, args = self.cache.set, (location_name, location_data)
+        
+        if self.cache.persistent_cache is None:
+            store(*args)
+        else:
+            # The write (and the compaction it periodically triggers) stays off the loop
+            await asyncio.to_thread(store, *args)
+    
+    async def close(self) -> None:
+        """Stop the geocoding queue and close the underlying aiohttp session."""
+        await self.scheduler.close()
+        await self.geolocator.__aexit__(None, None, None)
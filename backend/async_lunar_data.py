@@ -0,0 +1,222 @@
+# backend/async_lunar_data.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+import httpx
+
+from backend.http_client import RETRY_STATUS_CODES, compute_backoff, retry_delay
+from backend.lunar_data import LunarDataService
+from backend.metrics import observe_upstream
+from backend.singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLunarDataService(LunarDataService):
+    """
+    Asyncio variant of LunarDataService for use inside the FastAPI event loop.
+
+    Shares caching, URL building and response parsing with the threaded
+    service, but talks to the Astronomy API through a pooled httpx
+    AsyncClient so many lookups can be in flight on one worker. The
+    in-memory cache is used directly; reads and writes that reach the
+    SQLite tier run in a worker thread so they never stall the loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the service (see LunarDataService for arguments)."""
+        super().__init__(*args, **kwargs)
+        self._inflight = AsyncSingleFlight()
+
+    def _create_session(self, pool_size: int) -> httpx.AsyncClient:
+        """Create the pooled async HTTP client used for API requests."""
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        return httpx.AsyncClient(headers=self.headers, limits=limits)
+
+    async def get_moon_data(self, latitude: float, longitude: float,
+                            date: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Get comprehensive moon data for a specific location and time.
+
+        Args:
+            latitude: Observer latitude
+            longitude: Observer longitude
+            date: Observation time (defaults to current time; naive values
+                are taken as local time)
+
+        Returns:
+            Dictionary with moon data including phase, position, etc.
+        """
+        if date is None:
+            date = datetime.now()
+
+        # The API is sampled (and the cache keyed) on whole UTC hours
+        utc_date = date.astimezone(timezone.utc)
+
+        cache_key = self._cache_key(utc_date)
+        geo_state = await self._get_cached_async(cache_key)
+        if geo_state is None:
+            async def load() -> Dict[str, Any]:
+                # A flight that finished after our lookup may have filled the cache already
+                cached = await self._get_cached_async(cache_key)
+                if cached is not None:
+                    return cached
+                return await self._fetch_moon_data(cache_key, latitude, longitude, utc_date)
+
+            # Only one task fetches a given hour; the others await its result
+            geo_state = await self._inflight.do(cache_key, load)
+
+        return self._observer_result(geo_state, latitude, longitude, date)
+
+    async def _fetch_moon_data(self, cache_key: str, latitude: float, longitude: float,
+                               date: datetime) -> Dict[str, Any]:
+        """
+        Request moon data from the API and cache the geocentric state.
+
+        Args:
+            cache_key: Key the state is cached under
+            latitude: Latitude of the observer the API is queried for
+            longitude: Longitude of the observer the API is queried for
+            date: Observation time in UTC
+
+        Returns:
+            Geocentric state (see LunarDataService._parse_moon_cell)
+        """
+        formatted_date = date.strftime("%Y-%m-%d")
+
+        try:
+            url = self._build_url(latitude, longitude, formatted_date, formatted_date, date.hour)
+            response = await self._get_with_retries(url)
+
+            if response.status_code != 200:
+                logger.warning("Astronomy API request failed",
+                               extra={"cache_key": cache_key, "status": response.status_code})
+                raise Exception(f"API request failed: {response.status_code}")
+
+            data = response.json()
+            logger.info("Fetched lunar data", extra={"cache_key": cache_key})
+
+            geo_state = self._parse_moon_data(data, latitude, longitude)
+            await self._store_cached_async(cache_key, geo_state)
+
+            return geo_state
+
+        except Exception as e:
+            logger.exception("Lunar data request failed", extra={"cache_key": cache_key})
+            raise Exception(f"Failed to retrieve lunar data: {str(e)}")
+
+    async def prefetch_range(self, latitude: float, longitude: float, start: datetime,
+                             end: datetime, interval: timedelta = timedelta(hours=1)) -> int:
+        """
+        Fill the cache for every timestamp between start and end.
+
+        Same batching as LunarDataService.prefetch_range, with the per-hour
+        requests issued concurrently.
+
+        Args:
+            latitude: Latitude of the observer the API is queried for
+            longitude: Longitude of the observer the API is queried for
+            start: First timestamp
+            end: Last timestamp (inclusive)
+            interval: Spacing between timestamps
+
+        Returns:
+            Number of cache entries written
+
+        Raises:
+            ValueError: If the range or interval is invalid
+        """
+        async def fetch_span(from_date, to_date, hour):
+            url = self._build_url(latitude, longitude, from_date.strftime("%Y-%m-%d"),
+                                  to_date.strftime("%Y-%m-%d"), hour)
+            response = await self._get_with_retries(url)
+            if response.status_code != 200:
+                raise Exception(f"API request failed: {response.status_code}")
+            # Parsing and the write-through to SQLite happen off the loop
+            return await asyncio.to_thread(self._store_range, response.json(), latitude,
+                                           longitude, from_date, hour)
+
+        spans = self._plan_prefetch(start, end, interval)
+        filled = await asyncio.gather(*(fetch_span(*span) for span in spans))
+        return sum(filled)
+
+    async def _get_cached_async(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result without blocking the loop on the persistent cache.
+
+        Args:
+            cache_key: Key built by _cache_key
+
+        Returns:
+            Cached geocentric state, or None on a miss
+        """
+        geo_state = self.cache.get(cache_key)
+        if geo_state is not None or self.persistent_cache is None:
+            return geo_state
+        return await asyncio.to_thread(self._get_cached, cache_key)
+
+    async def _store_cached_async(self, cache_key: str, geo_state: Dict[str, Any],
+                                  ttl: Optional[float] = None) -> None:
+        """
+        Write a geocentric state through to every cache tier off the loop.
+
+        The SQLite write (and the compaction it periodically triggers) runs
+        in a worker thread.
+
+        Args:
+            cache_key: Key built by _cache_key
+            geo_state: State returned by _parse_moon_cell
+            ttl: Seconds the entry stays valid (defaults to cache_duration)
+        """
+        self.cache.set(cache_key, geo_state, ttl=ttl)
+        if self.persistent_cache is not None:
+            await asyncio.to_thread(self.persistent_cache.set, cache_key, geo_state, ttl)
+
+    async def _get_with_retries(self, url: str) -> httpx.Response:
+        """
+        Issue a GET request, retrying on transport errors, 429 and 5xx responses.
+
+        Mirrors backend.http_client.get_with_retries without blocking the loop.
+
+        Args:
+            url: Request URL
+
+        Returns:
+            The final response (which may still carry an error status)
+
+        Raises:
+            httpx.TransportError: If the last attempt failed without a response
+        """
+        connect_timeout, read_timeout = self.timeout
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+
+        attempt = 0
+        while True:
+            try:
+                with observe_upstream("astronomy_api") as call:
+                    response = await self.session.get(url, timeout=timeout)
+                    call.status = response.status_code
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(compute_backoff(attempt, self.backoff_base, self.backoff_max))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+
+            delay = retry_delay(attempt, response.headers.get("Retry-After"),
+                                self.backoff_base, self.backoff_max)
+            if delay is None:
+                return response
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.session.aclose()
@@ -0,0 +1,190 @@
+# backend/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+class _CacheStripe:
+    """One independently locked segment of a LunarCache."""
+
+    __slots__ = ("lock", "entries", "capacity", "hits", "misses", "evictions", "expirations")
+
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        # key -> (expires_at, value), ordered from least to most recently used
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+class LunarCache:
+    """
+    Bounded, thread-safe LRU cache with per-entry time-to-live.
+
+    Keys are spread over a fixed number of stripes, each guarded by its own
+    lock, so concurrent readers and writers only contend when they hash to
+    the same stripe. Every stripe holds an equal share of the size cap and
+    evicts its least recently used entry when full.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 3600,
+                 stripes: int = 16, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries held across all stripes
+            ttl: Default time-to-live of an entry in seconds
+            stripes: Number of independently locked segments
+            clock: Monotonic time source (overridable for testing)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+
+        stripes = min(stripes, max_entries)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+
+        # Distribute the size cap so the stripes add up to max_entries exactly
+        base, extra = divmod(max_entries, stripes)
+        self._stripes: List[_CacheStripe] = [
+            _CacheStripe(base + (1 if i < extra else 0)) for i in range(stripes)
+        ]
+
+    def _stripe_for(self, key: Hashable) -> _CacheStripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a key, refreshing its recency on a hit.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value, or default
+        """
+        stripe = self._stripe_for(key)
+        now = self._clock()
+
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is None:
+                stripe.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del stripe.entries[key]
+                stripe.expirations += 1
+                stripe.misses += 1
+                return default
+
+            stripe.entries.move_to_end(key)
+            stripe.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if the stripe is full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds (defaults to the cache TTL)
+        """
+        stripe = self._stripe_for(key)
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+
+        with stripe.lock:
+            if key in stripe.entries:
+                stripe.entries.move_to_end(key)
+            stripe.entries[key] = (expires_at, value)
+
+            while len(stripe.entries) > stripe.capacity:
+                stripe.entries.popitem(last=False)
+                stripe.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Remove a key from the cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if the key was present
+        """
+        stripe = self._stripe_for(key)
+        with stripe.lock:
+            return stripe.entries.pop(key, None) is not None
+
+    def __contains__(self, key: Hashable) -> bool:
+        stripe = self._stripe_for(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            return entry is not None and entry[0] > self._clock()
+
+    def __len__(self) -> int:
+        total = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                total += len(stripe.entries)
+        return total
+
+    def purge_expired(self) -> int:
+        """
+        Drop every expired entry.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        now = self._clock()
+        for stripe in self._stripes:
+            with stripe.lock:
+                expired = [k for k, (expires_at, _) in stripe.entries.items() if expires_at <= now]
+                for key in expired:
+                    del stripe.entries[key]
+                stripe.expirations += len(expired)
+                removed += len(expired)
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            Dictionary with size, capacity, hits, misses, evictions,
+            expirations and hit rate
+        """
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "size": 0}
+        for stripe in self._stripes:
+            with stripe.lock:
+                totals["hits"] += stripe.hits
+                totals["misses"] += stripe.misses
+                totals["evictions"] += stripe.evictions
+                totals["expirations"] += stripe.expirations
+                totals["size"] += len(stripe.entries)
+
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            **totals,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "stripes": len(self._stripes),
+            "hit_rate": totals["hits"] / lookups if lookups else 0.0
+        }
@@ -3,6 +3,68 @@
 import math
 from typing import Dict, Any, List, Tuple
 
+import numpy as np
+
+from backend.cache import LunarCache
+
+# Illumination is rounded to this many percent before rendering the ASCII moon
+ASCII_MOON_ILLUMINATION_STEP = 0.5
+ASCII_MOON_CACHE_SIZE = 256  # Rendered moons kept (phase level x waxing x size x charset)
+
+# Terminal character cells are roughly twice as tall as they are wide
+_CHAR_ASPECT = 2.0
+
+# Dark sky/limb first, then the lit surface from dimmest to brightest
+_SHADE_GLYPHS = np.array([" ", "░", "▒", "▓", "█"])
+_ASCII_GLYPHS = np.array([" ", ".", ":", "-", "=", "+", "*", "#"])
+
+_ascii_moon_cache = LunarCache(max_entries=ASCII_MOON_CACHE_SIZE, ttl=math.inf, stripes=1)
+
+def _render_ascii_moon(fraction: float, is_waxing: bool, width: int, height: int,
+                       glyphs: np.ndarray) -> str:
+    """
+    Render the moon's disk as seen from Earth in one vectorized pass.
+    
+    Each character cell is a point on the visible hemisphere, shaded by the
+    cosine of the sunlight's incidence there. The sun direction follows
+    from the illuminated fraction k: cos(elongation) = 1 - 2k, on the right
+    while waxing and the left while waning (as seen from the northern
+    hemisphere), so the terminator comes out as the projected ellipse it is.
+    
+    Args:
+        fraction: Illuminated fraction of the disk (0-1)
+        is_waxing: Whether the moon is waxing
+        width: Width in characters
+        height: Height in characters
+        glyphs: Unlit glyph followed by the lit glyphs from dim to bright
+        
+    Returns:
+        ASCII art string of height lines, each width characters wide
+    """
+    if width < 1 or height < 1:
+        return "\n".join([" " * max(width, 0)] * max(height, 0))
+    
+    # Disk radius in rows and columns, keeping it round on screen
+    radius_y = height / 2
+    radius_x = min(width / 2, radius_y * _CHAR_ASPECT)
+    x = (np.arange(width) + 0.5 - width / 2) / radius_x
+    y = (np.arange(height) + 0.5 - height / 2) / radius_y
+    r2 = x[np.newaxis, :] ** 2 + y[:, np.newaxis] ** 2
+    z = np.sqrt(np.clip(1.0 - r2, 0.0, None))
+    
+    # Unit vector towards the sun (x right, z towards the observer)
+    cos_elongation = 1.0 - 2.0 * fraction
+    sin_elongation = math.sqrt(max(0.0, 1.0 - cos_elongation ** 2))
+    if not is_waxing:
+        sin_elongation = -sin_elongation
+    brightness = x[np.newaxis, :] * sin_elongation - z * cos_elongation
+    
+    # The square root lifts the dim cells near the terminator so thin crescents stay visible
+    levels = len(glyphs) - 1
+    shade = np.minimum(levels, 1 + (np.sqrt(np.clip(brightness, 0.0, None)) * levels).astype(np.intp))
+    index = np.where((r2 <= 1.0) & (brightness > 0.0), shade, 0)
+    return "\n".join("".join(row) for row in glyphs[index])
+
 class LunarDataProcessor:
     """
     Process and format lunar data for display in the terminal.
@@ -154,6 +216,9 @@ class LunarDataProcessor:
         """
         Create ASCII art visualization of the current moon phase.
         
+        Renders are memoized on the quantized illumination, waxing/waning and
+        size, so repeated refreshes of the same phase reuse the finished string.
+        
         Args:
             illumination: Percentage of moon illuminated
             phase_angle: Phase angle in degrees
@@ -166,61 +231,12 @@ class LunarDataProcessor:
         # Determine if waxing or waning
         is_waxing = 0 <= phase_angle <= 180
         
-        # Calculate normalized illumination (0-1)
-        norm_illumination = illumination / 100.0
-        
-        # Characters for different densities
-        if self.enable_color:
-            filled = "█"
-            partial = ["▏", "▎", "▍", "▌", "▋", "▊", "▉"]
-            empty = " "
-        else:
-            filled = "#"
-            partial = [".", ":", "-", "=", "+", "*"]
-            empty = " "
-        
-        # Create the visualization
-        lines = []
-        
-        for y in range(height):
-            line = []
-            for x in range(width):
-                # Calculate position relative to center
-                nx = (x / width) * 2 - 1  # -1 to 1
-                ny = (y / height) * 2 - 1  # -1 to 1
-                
-                # Distance from center (0 to 1)
-                dist = math.sqrt(nx*nx + ny*ny)
-                
-                if dist > 1:
-                    # Outside the moon
-                    line.append(" ")
-                else:
-                    # Inside the moon
-                    # Calculate angle from center
-                    angle = math.atan2(ny, nx)
-                    angle_deg = math.degrees(angle) % 360
-                    
-                    # Determine if this part should be illuminated
-                    if is_waxing:
-                        is_lit = angle_deg >= 90 and angle_deg <= 270
-                    else:
-                        is_lit = angle_deg <= 90 or angle_deg >= 270
-                    
-                    # Apply illumination percentage
-                    if is_lit:
-                        if norm_illumination >= 0.99:
-                            line.append(filled)
-                        elif norm_illumination <= 0.01:
-                            line.append(empty)
-                        else:
-                            # Partial illumination
-                            idx = min(len(partial) - 1, 
-                                     int(norm_illumination * len(partial)))
-                            line.append(partial[idx])
-                    else:
-                        line.append(empty)
-            
-            lines.append("".join(line))
-        
-        return "\n".join(lines)
\ No newline at end of file
+        level = round(min(max(illumination, 0.0), 100.0) / ASCII_MOON_ILLUMINATION_STEP)
+        key = (level, is_waxing, width, height, self.enable_color)
+        art = _ascii_moon_cache.get(key)
+        if art is None:
+            glyphs = _SHADE_GLYPHS if self.enable_color else _ASCII_GLYPHS
+            art = _render_ascii_moon(level * ASCII_MOON_ILLUMINATION_STEP / 100.0, is_waxing,
+                                     width, height, glyphs)
+            _ascii_moon_cache.set(key, art)
+        return art
\ No newline at end of file
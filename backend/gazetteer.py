@@ -0,0 +1,263 @@
+# backend/gazetteer.py
+
+import csv
+import mmap
+import os
+import struct
+from typing import Dict, Any, List, Optional
+
+from backend.geocode_cache import normalize_location_query
+
+# Index file layout (little-endian):
+#   header | place records | key records (sorted) | string pool
+# Keys are normalized place names ("los angeles", "los angeles ca", ...)
+# sorted bytewise, so every key sharing a prefix sits in one contiguous run
+# that a binary search finds without decoding the rest of the index.
+_MAGIC = b"LGAZ"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")  # magic, version, reserved, place count, key count
+_PLACE = struct.Struct("<ddIII")  # latitude, longitude, population, address offset, address length
+_KEY = struct.Struct("<IHI")  # key offset, key length, place index
+
+def _place_keys(row: Dict[str, str]) -> List[str]:
+    """
+    Build the normalized lookup keys for one dataset row.
+
+    A place is findable by its name alone or followed by its region and/or
+    country, each spelled out or abbreviated ("Los Angeles, CA",
+    "Los Angeles, California, US", ...).
+
+    Args:
+        row: CSV row with name, admin, admin_code, country, country_code
+
+    Returns:
+        Distinct normalized keys
+    """
+    regions = [""] + [row[field] for field in ("admin", "admin_code") if row[field]]
+    countries = [""] + [row[field] for field in ("country", "country_code") if row[field]]
+
+    keys = []
+    for region in regions:
+        for country in countries:
+            key = normalize_location_query(" ".join((row["name"], region, country)))
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
+def _place_address(row: Dict[str, str]) -> str:
+    """Format a dataset row as a display address ("Los Angeles, California, United States")."""
+    parts = []
+    for part in (row["name"], row["admin"], row["country"]):
+        if part and part not in parts:
+            parts.append(part)
+    return ", ".join(parts)
+
+def build_index(source_path: str, index_path: str) -> int:
+    """
+    Compile the bundled city dataset into a memory-mappable prefix index.
+
+    The file is written to a temporary name and moved into place, so
+    processes that already mapped the old index keep a consistent view.
+
+    Args:
+        source_path: CSV file with name, admin, admin_code, country,
+            country_code, latitude, longitude and population columns
+        index_path: Where to write the index
+
+    Returns:
+        Number of places indexed
+    """
+    with open(source_path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    pool = bytearray()
+    places = []
+    keys = []
+    for index, row in enumerate(rows):
+        address = _place_address(row).encode("utf-8")
+        places.append((float(row["latitude"]), float(row["longitude"]),
+                       int(row["population"] or 0), len(pool), len(address)))
+        pool += address
+        for key in _place_keys(row):
+            keys.append((key.encode("utf-8"), index))
+
+    # Bytewise order for prefix runs; within one key, most populous place first
+    keys.sort(key=lambda entry: (entry[0], -places[entry[1]][2]))
+
+    key_records = []
+    for key, index in keys:
+        key_records.append((len(pool), len(key), index))
+        pool += key
+
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(places), len(key_records)))
+        for place in places:
+            f.write(_PLACE.pack(*place))
+        for record in key_records:
+            f.write(_KEY.pack(*record))
+        f.write(pool)
+    os.replace(tmp_path, index_path)
+
+    return len(places)
+
+class Gazetteer:
+    """
+    Offline place-name resolver backed by a memory-mapped prefix index.
+
+    Exact lookups and prefix suggestions are binary searches over the
+    sorted key table, comparing raw bytes straight out of the mapping, so
+    nothing is loaded into Python objects up front and the OS page cache
+    is shared between server workers.
+    """
+
+    def __init__(self, index_path: str):
+        """
+        Map an index built by build_index.
+
+        Args:
+            index_path: Path to the index file
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If the file is not a gazetteer index
+        """
+        self.index_path = index_path
+        with open(index_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"Not a gazetteer index: {index_path}")
+
+        magic, version, _, self._place_count, self._key_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"Not a gazetteer index: {index_path}")
+
+        self._places_offset = _HEADER.size
+        self._keys_offset = self._places_offset + self._place_count * _PLACE.size
+        self._pool_offset = self._keys_offset + self._key_count * _KEY.size
+        if len(self._map) < self._pool_offset:
+            self._map.close()
+            raise ValueError(f"Truncated gazetteer index: {index_path}")
+
+    @classmethod
+    def open(cls, index_path: str, source_path: Optional[str] = None) -> Optional["Gazetteer"]:
+        """
+        Map the index, (re)building it first when it is missing or stale.
+
+        Args:
+            index_path: Path to the index file
+            source_path: Optional CSV dataset the index is built from
+
+        Returns:
+            Gazetteer, or None if there is no usable index and it cannot be built
+        """
+        try:
+            if source_path is not None and os.path.exists(source_path) and (
+                    not os.path.exists(index_path)
+                    or os.path.getmtime(index_path) < os.path.getmtime(source_path)):
+                build_index(source_path, index_path)
+            return cls(index_path)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+    def _key_at(self, position: int) -> bytes:
+        offset, length, _ = _KEY.unpack_from(self._map, self._keys_offset + position * _KEY.size)
+        start = self._pool_offset + offset
+        return self._map[start:start + length]
+
+    def _place_index_at(self, position: int) -> int:
+        return _KEY.unpack_from(self._map, self._keys_offset + position * _KEY.size)[2]
+
+    def _lower_bound(self, target: bytes) -> int:
+        low, high = 0, self._key_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _place(self, index: int) -> Dict[str, Any]:
+        latitude, longitude, population, offset, length = _PLACE.unpack_from(
+            self._map, self._places_offset + index * _PLACE.size)
+        start = self._pool_offset + offset
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "address": self._map[start:start + length].decode("utf-8"),
+            "population": population
+        }
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a location name exactly (after normalization).
+
+        Ambiguous names ("Portland", "Birmingham") resolve to the most
+        populous match.
+
+        Args:
+            query: Location name (e.g., "Los Angeles, CA")
+
+        Returns:
+            Dictionary with latitude, longitude, and formatted address, or
+            None if the name is not in the gazetteer
+        """
+        target = normalize_location_query(query).encode("utf-8")
+        if not target:
+            return None
+
+        position = self._lower_bound(target)
+        if position < self._key_count and self._key_at(position) == target:
+            place = self._place(self._place_index_at(position))
+            del place["population"]
+            return place
+        return None
+
+    def suggest(self, prefix: str, limit: int = 8, max_scan: int = 512) -> List[Dict[str, Any]]:
+        """
+        List places whose name starts with the given text, most populous first.
+
+        Args:
+            prefix: Partial location name as typed by the user
+            limit: Maximum number of suggestions
+            max_scan: Maximum number of matching keys examined, bounding the
+                cost of very short prefixes
+
+        Returns:
+            List of dictionaries with latitude, longitude, address and population
+        """
+        target = normalize_location_query(prefix).encode("utf-8")
+        if not target or limit <= 0:
+            return []
+
+        seen = set()
+        start = self._lower_bound(target)
+        for position in range(start, min(self._key_count, start + max_scan)):
+            if not self._key_at(position).startswith(target):
+                break
+            seen.add(self._place_index_at(position))
+
+        places = [self._place(index) for index in seen]
+        places.sort(key=lambda place: place["population"], reverse=True)
+        return places[:limit]
+
+    def __len__(self) -> int:
+        return self._place_count
+
+    def close(self) -> None:
+        """Unmap the index."""
+        self._map.close()
+
+if __name__ == "__main__":
+    import config
+
+    count = build_index(config.GAZETTEER_SOURCE_PATH, config.GAZETTEER_INDEX_PATH)
+    print(f"Indexed {count} places into {config.GAZETTEER_INDEX_PATH}")
@@ -0,0 +1,144 @@
+# backend/geocode_cache.py
+
+import re
+import unicodedata
+from typing import Dict, Any, Optional, Tuple
+
+from backend.cache import LunarCache
+from backend.persistent_cache import PersistentCache
+
+# Stored in place of a result when the geocoder found nothing
+_NOT_FOUND = {"found": False}
+
+# A signed decimal number (kept whole, so coordinates keep their sign and
+# decimals), or a punctuation character (replaced by a space)
+_NUMBER_OR_PUNCTUATION = re.compile(r"((?<![\w.])-?\d+(?:\.\d+)?)|[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+# Combining marks are only dropped after Latin letters, where "São" and "Sao"
+# are the same word; in other scripts they can tell different words apart
+_LATIN_END = "\u0250"
+
+def _fold_latin_diacritics(text: str) -> str:
+    """Strip accents from Latin letters ("zürich" -> "zurich")."""
+    kept = []
+    base = ""
+    for char in unicodedata.normalize("NFD", text):
+        if unicodedata.combining(char):
+            if base < _LATIN_END:
+                continue
+        else:
+            base = char
+        kept.append(char)
+    return unicodedata.normalize("NFC", "".join(kept))
+
+def normalize_location_query(query: str) -> str:
+    """
+    Normalize a location query so trivially different spellings share a key.
+
+    "Los Angeles, CA", "los angeles ca" and "  LOS-ANGELES,  CA. " all map
+    to "los angeles ca", and accented Latin letters fold to plain ones
+    ("São Paulo" -> "sao paulo"). Minus signs and decimal points inside
+    numbers are kept, so "-33.86, 151.2" and "33.86, 151.2" stay different
+    queries.
+
+    Args:
+        query: Location name as typed by the user
+
+    Returns:
+        Normalized query
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    if not text.isascii():
+        text = _fold_latin_diacritics(text)
+    text = _NUMBER_OR_PUNCTUATION.sub(lambda match: f" {match.group(1) or ''} ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+class GeocodeCache:
+    """
+    Two-tier cache of geocoding results keyed on normalized queries.
+
+    A bounded in-memory LRU sits in front of an optional SQLite store that
+    persists across restarts and is shared between processes. Queries the
+    geocoder could not resolve are cached too (for a shorter time), so
+    repeated typos don't reach Nominatim either.
+    """
+
+    def __init__(self, persistent_cache: Optional[PersistentCache] = None,
+                 ttl: float = 30 * 24 * 3600, negative_ttl: float = 24 * 3600,
+                 max_entries: int = 1024):
+        """
+        Initialize the geocode cache.
+
+        Args:
+            persistent_cache: Optional on-disk store for results
+            ttl: Seconds a found location stays cached
+            negative_ttl: Seconds a "not found" result stays cached
+            max_entries: Maximum number of results kept in memory
+        """
+        self.persistent_cache = persistent_cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = LunarCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, query: str, memory_only: bool = False) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a query.
+
+        Args:
+            query: Location name (normalized internally)
+            memory_only: Skip the persistent store (a lookup that cannot block)
+
+        Returns:
+            Tuple of (hit, location data); location data is None for a
+            cached "not found" result or a miss
+        """
+        key = normalize_location_query(query)
+
+        value = self.memory.get(key)
+        if value is None and self.persistent_cache is not None and not memory_only:
+            entry = self.persistent_cache.get_with_ttl(key)
+            if entry is not None:
+                value, remaining_ttl = entry
+                self.memory.set(key, value, ttl=remaining_ttl)
+
+        if value is None:
+            return False, None
+        if value == _NOT_FOUND:
+            return True, None
+        return True, value
+
+    def set(self, query: str, location_data: Dict[str, Any]) -> None:
+        """
+        Cache a resolved location.
+
+        Args:
+            query: Location name (normalized internally)
+            location_data: Dictionary with latitude, longitude and address
+        """
+        self._store(normalize_location_query(query), location_data, self.ttl)
+
+    def set_not_found(self, query: str) -> None:
+        """
+        Cache the fact that a query could not be resolved.
+
+        Args:
+            query: Location name (normalized internally)
+        """
+        self._store(normalize_location_query(query), _NOT_FOUND, self.negative_ttl)
+
+    def _store(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        self.memory.set(key, value, ttl=ttl)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(key, value, ttl=ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            In-memory cache statistics, plus the persistent store's if enabled
+        """
+        stats = self.memory.stats()
+        if self.persistent_cache is not None:
+            stats["persistent"] = self.persistent_cache.stats()
+        return stats
@@ -0,0 +1,388 @@
+# backend/geocode_scheduler.py
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional
+
+class GeocodeDeadlineError(ValueError):
+    """Raised when a geocoding request cannot be served before its deadline."""
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens accrue at a fixed rate up to the bucket's capacity; each request
+    spends one. Not thread-safe on its own: the schedulers call it while
+    holding their lock (or from their single worker).
+    """
+
+    def __init__(self, rate: float, capacity: int = 1, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (the largest allowed burst)
+            clock: Monotonic time source in seconds
+
+        Raises:
+            ValueError: If rate or capacity is not positive
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """
+        Seconds until a token is available (0 if one is available now).
+
+        Returns:
+            Wait time in seconds
+        """
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def consume(self) -> None:
+        """Spend one token (callers wait for delay() to reach 0 first)."""
+        self._refill()
+        self._tokens -= 1
+
+class _Pending:
+    """A queued geocoding request shared by every caller asking for the same key."""
+
+    __slots__ = ("key", "client", "fn", "future", "deadline")
+
+    def __init__(self, key: Hashable, client: Hashable, fn: Callable[[], Any], future: Any,
+                 deadline: Optional[float]):
+        self.key = key
+        self.client = client
+        self.fn = fn
+        self.future = future
+        self.deadline = deadline
+
+class _FairQueue:
+    """
+    Round-robin queue of pending requests.
+
+    Each client gets its own FIFO and the worker serves clients in turn,
+    so one client submitting many lookups cannot starve the others. Also
+    tracks pending requests by key for de-duplication.
+    """
+
+    def __init__(self, bucket: TokenBucket, clock: Callable[[], float]):
+        self.bucket = bucket
+        self._clock = clock
+        self._clients: "OrderedDict[Hashable, Deque[_Pending]]" = OrderedDict()
+        self._pending: Dict[Hashable, _Pending] = {}
+        self._running: Optional[_Pending] = None
+        self._counters = {"submitted": 0, "coalesced": 0, "rejected": 0, "expired": 0, "completed": 0}
+
+    def _estimated_start(self, client: Hashable, position: int) -> float:
+        """
+        Earliest time the request at the given position in a client's FIFO can start.
+
+        With round-robin service, every other client gets at most
+        position + 1 turns first; each turn costs one token.
+        """
+        ahead = position
+        for other, queue in self._clients.items():
+            if other != client:
+                ahead += min(len(queue), position + 1)
+        return self._clock() + self.bucket.delay() + ahead / self.bucket.rate
+
+    def admit(self, key: Hashable, client: Hashable, fn: Callable[[], Any],
+              deadline: Optional[float], new_future: Callable[[], Any]) -> _Pending:
+        """
+        Join the pending request for key, or queue a new one.
+
+        Raises:
+            GeocodeDeadlineError: If the request could not start before the deadline
+        """
+        self._counters["submitted"] += 1
+        entry = self._pending.get(key)
+
+        if entry is not None:
+            if entry is not self._running and deadline is not None:
+                position = self._clients[entry.client].index(entry)
+                if self._estimated_start(entry.client, position) > deadline:
+                    self._counters["rejected"] += 1
+                    raise GeocodeDeadlineError("Geocoding queue is too long to meet the deadline")
+            if entry.deadline is not None:
+                entry.deadline = None if deadline is None else max(entry.deadline, deadline)
+            self._counters["coalesced"] += 1
+            return entry
+
+        queue = self._clients.get(client)
+        position = len(queue) if queue is not None else 0
+        if deadline is not None and self._estimated_start(client, position) > deadline:
+            self._counters["rejected"] += 1
+            raise GeocodeDeadlineError("Geocoding queue is too long to meet the deadline")
+
+        entry = _Pending(key, client, fn, new_future(), deadline)
+        if queue is None:
+            queue = self._clients[client] = deque()
+        queue.append(entry)
+        self._pending[key] = entry
+        return entry
+
+    def __bool__(self) -> bool:
+        return bool(self._clients)
+
+    def pop(self) -> _Pending:
+        """Take the next request, rotating to the next client."""
+        client, queue = next(iter(self._clients.items()))
+        entry = queue.popleft()
+        del self._clients[client]
+        if queue:
+            self._clients[client] = queue
+        return entry
+
+    def start(self, entry: _Pending) -> None:
+        """Mark entry as running; callers asking for its key join it without a queue check."""
+        self._running = entry
+
+    def expired(self, entry: _Pending, delay: float) -> bool:
+        """Whether every caller waiting on entry will have given up before it can start."""
+        return entry.deadline is not None and self._clock() + delay > entry.deadline
+
+    def finish(self, entry: _Pending, counter: str) -> None:
+        """Forget a request that completed or expired."""
+        self._pending.pop(entry.key, None)
+        if self._running is entry:
+            self._running = None
+        self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats["queued"] = sum(len(queue) for queue in self._clients.values())
+        stats["clients"] = len(self._clients)
+        stats["rate"] = self.bucket.rate
+        return stats
+
+def _deadline_error(entry: _Pending) -> GeocodeDeadlineError:
+    return GeocodeDeadlineError(f"Geocoding deadline passed before {entry.key!r} could be looked up")
+
+class GeocodeScheduler:
+    """
+    Central queue that paces geocoder calls from many threads.
+
+    A single worker thread takes requests in round-robin order across
+    clients and starts each one only when the token bucket allows, so the
+    process as a whole stays under the geocoder's rate limit. Identical
+    pending queries share one call. Callers may give a timeout; a request
+    that cannot start in time fails immediately with GeocodeDeadlineError
+    instead of waiting in the queue.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate: Maximum geocoder calls per second
+            burst: Calls allowed back-to-back after an idle period
+            clock: Monotonic time source in seconds
+            sleep: Function used to wait for tokens
+        """
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Condition()
+        self._queue = _FairQueue(TokenBucket(rate, burst, clock), clock)
+        self._bucket = self._queue.bucket
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None,
+               client: Hashable = None) -> Any:
+        """
+        Run fn through the rate-limited queue and wait for its result.
+
+        Args:
+            key: Deduplication key (normally the normalized query)
+            fn: Zero-argument function performing the geocoder call
+            timeout: Seconds the caller is willing to wait (None waits indefinitely)
+            client: Identity used for fair queueing (e.g. a client address)
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            GeocodeDeadlineError: If the result cannot be produced within timeout
+            Exception: Whatever fn raised
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+
+        with self._lock:
+            entry = self._queue.admit(key, client, fn, deadline, Future)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="geocode-scheduler", daemon=True)
+                self._worker.start()
+            self._lock.notify()
+
+        try:
+            return entry.future.result(None if deadline is None else max(0.0, deadline - self._clock()))
+        except FutureTimeoutError:
+            raise _deadline_error(entry) from None
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._lock.wait()
+                entry = self._queue.pop()
+
+                delay = self._bucket.delay()
+                if self._queue.expired(entry, delay):
+                    self._queue.finish(entry, "expired")
+                    entry.future.set_exception(_deadline_error(entry))
+                    continue
+                self._queue.start(entry)
+
+            if delay > 0:
+                self._sleep(delay)
+
+            with self._lock:
+                self._bucket.consume()
+
+            try:
+                entry.future.set_result(entry.fn())
+            except BaseException as e:
+                entry.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._queue.finish(entry, "completed")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the queue counters.
+
+        Returns:
+            Dictionary with submitted, coalesced, rejected, expired and
+            completed counts, current queue length and client count, and
+            the configured rate
+        """
+        with self._lock:
+            return self._queue.stats()
+
+class AsyncGeocodeScheduler:
+    """
+    Asyncio variant of GeocodeScheduler.
+
+    The worker is a task on the running loop, started on first use. A
+    waiter timing out or being cancelled does not cancel the shared lookup,
+    so its result still reaches any cache the lookup writes to.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate: Maximum geocoder calls per second
+            burst: Calls allowed back-to-back after an idle period
+            clock: Monotonic time source in seconds
+        """
+        self._clock = clock
+        self._queue = _FairQueue(TokenBucket(rate, burst, clock), clock)
+        self._bucket = self._queue.bucket
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, key: Hashable, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None,
+                     client: Hashable = None) -> Any:
+        """
+        Await fn through the rate-limited queue.
+
+        Args:
+            key: Deduplication key (normally the normalized query)
+            fn: Zero-argument coroutine function performing the geocoder call
+            timeout: Seconds the caller is willing to wait (None waits indefinitely)
+            client: Identity used for fair queueing (e.g. a client address)
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            GeocodeDeadlineError: If the result cannot be produced within timeout
+            Exception: Whatever fn raised
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        loop = asyncio.get_running_loop()
+
+        def new_future():
+            future = loop.create_future()
+            # Nobody may be left to read the outcome once every waiter timed out
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            return future
+
+        entry = self._queue.admit(key, client, fn, deadline, new_future)
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        self._wakeup.set()
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(entry.future),
+                None if deadline is None else max(0.0, deadline - self._clock())
+            )
+        except asyncio.TimeoutError:
+            raise _deadline_error(entry) from None
+
+    async def _run(self) -> None:
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            entry = self._queue.pop()
+
+            delay = self._bucket.delay()
+            if self._queue.expired(entry, delay):
+                self._queue.finish(entry, "expired")
+                entry.future.set_exception(_deadline_error(entry))
+                continue
+            self._queue.start(entry)
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._bucket.consume()
+
+            try:
+                entry.future.set_result(await entry.fn())
+            except Exception as e:
+                entry.future.set_exception(e)
+            finally:
+                self._queue.finish(entry, "completed")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the queue counters.
+
+        Returns:
+            Dictionary with submitted, coalesced, rejected, expired and
+            completed counts, current queue length and client count, and
+            the configured rate
+        """
+        return self._queue.stats()
+
+    async def close(self) -> None:
+        """Stop the worker task."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,96 @@
+# backend/http_caching.py
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Payloads that are already compressed or must not be buffered
+EXCLUDED_CONTENT_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/octet-stream",)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an entity tag (weak comparison).
+
+    Args:
+        if_none_match: Header value (may list several tags, or be "*")
+        etag: Entity tag of the current representation
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows an encoding (ignoring q=0 entries)."""
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        if name.strip() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+class BrotliResponder(IdentityResponder):
+    """Starlette compression responder producing a Brotli stream."""
+
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 5, *,
+                 exclude_content_types=EXCLUDED_CONTENT_TYPES):
+        super().__init__(app, minimum_size, exclude_content_types=exclude_content_types)
+        self.quality = quality
+        self.compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self.compressor is None:
+            self.compressor = brotli.Compressor(quality=self.quality)
+        data = self.compressor.process(body)
+        # Flush each streamed chunk so NDJSON lines reach the client promptly
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Response compression preferring Brotli, falling back to gzip.
+
+    Brotli is used when the optional brotli package is installed and the
+    client accepts it. Responses that already carry a Content-Encoding
+    (such as precompressed static assets) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 6,
+                 brotli_quality: int = 5):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            minimum_size: Smallest body (in bytes) worth compressing
+            compresslevel: gzip level (1-9)
+            brotli_quality: Brotli quality (0-11)
+        """
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel,
+                         exclude_content_types=EXCLUDED_CONTENT_TYPES)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] == "http" and brotli is not None
+                and accepts_encoding(Headers(scope=scope).get("Accept-Encoding", ""), "br")):
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality,
+                                        exclude_content_types=self.exclude_content_types)
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
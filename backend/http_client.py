@@ -0,0 +1,147 @@
+# backend/http_client.py
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.metrics import observe_upstream
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+def create_session(pool_size: int = 10, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a keep-alive HTTP session with a bounded connection pool.
+
+    Retries are handled by get_with_retries rather than urllib3 so that
+    Retry-After and jittered backoff behave the same for every status code.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host
+        headers: Default headers sent with every request
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def compute_backoff(attempt: int, base: float, cap: float) -> float:
+    """
+    Full-jitter exponential backoff delay.
+
+    Args:
+        attempt: Zero-based retry attempt number
+        base: Delay scale for the first retry in seconds
+        cap: Upper bound on the delay in seconds
+
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def retry_delay(attempt: int, retry_after: Optional[str], base: float, cap: float) -> Optional[float]:
+    """
+    Decide how long to wait before retrying.
+
+    Args:
+        attempt: Zero-based retry attempt number
+        retry_after: Retry-After header of the failed response, if any
+        base: Backoff delay scale in seconds
+        cap: Longest delay worth waiting in seconds
+
+    Returns:
+        Seconds to wait, or None if the server asked for a longer pause than
+        cap and the request should not be retried
+    """
+    server_delay = parse_retry_after(retry_after)
+    if server_delay is None:
+        return compute_backoff(attempt, base, cap)
+    if server_delay > cap:
+        return None
+    # Small jitter so clients told the same Retry-After don't return in lockstep
+    return server_delay + random.uniform(0, base)
+
+def get_with_retries(session: requests.Session, url: str,
+                     timeout: Tuple[float, float] = (3.05, 10.0),
+                     max_retries: int = 3, backoff_base: float = 0.5,
+                     backoff_max: float = 10.0,
+                     sleep: Callable[[float], None] = time.sleep,
+                     service: str = "http") -> requests.Response:
+    """
+    Issue a GET request, retrying on connection errors, 429 and 5xx responses.
+
+    Args:
+        session: Session whose connection pool is used
+        url: Request URL
+        timeout: (connect, read) timeouts in seconds
+        max_retries: Number of retries after the first attempt
+        backoff_base: Backoff delay scale in seconds
+        backoff_max: Longest single delay in seconds
+        sleep: Sleep function (overridable for testing)
+        service: Upstream name recorded in the request metrics
+
+    Returns:
+        The final response (which may still carry an error status)
+
+    Raises:
+        requests.RequestException: If the last attempt failed without a response
+    """
+    attempt = 0
+    while True:
+        try:
+            with observe_upstream(service) as call:
+                response = session.get(url, timeout=timeout)
+                call.status = response.status_code
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+            sleep(compute_backoff(attempt, backoff_base, backoff_max))
+            attempt += 1
+            continue
+
+        if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+            return response
+
+        delay = retry_delay(attempt, response.headers.get("Retry-After"), backoff_base, backoff_max)
+        if delay is None:
+            return response
+
+        response.close()
+        sleep(delay)
+        attempt += 1
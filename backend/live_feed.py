@@ -0,0 +1,187 @@
+# backend/live_feed.py
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.ephemeris_batch import moon_positions_batch
+from utils.lunar_math import LunarMath
+
+class LiveFeedFullError(Exception):
+    """Raised when the feed already has its maximum number of subscribers."""
+
+class Subscription:
+    """
+    One client's view of its group's feed.
+
+    Only the latest message is kept: a slow client skips ticks instead of
+    building up a backlog.
+    """
+
+    def __init__(self, group: "_Group"):
+        self.group = group
+        self._message: Optional[bytes] = None
+        self._ready = asyncio.Event()
+
+    def _deliver(self, message: bytes) -> None:
+        self._message = message
+        self._ready.set()
+
+    async def get(self) -> bytes:
+        """Wait for the next message (returns at once if one is already waiting)."""
+        await self._ready.wait()
+        self._ready.clear()
+        return self._message
+
+class _Group:
+    """Subscribers sharing one grid cell, and the last message computed for it."""
+
+    __slots__ = ("cell", "latitude", "longitude", "subscribers", "message")
+
+    def __init__(self, cell: Tuple[int, int], latitude: float, longitude: float):
+        self.cell = cell
+        self.latitude = latitude
+        self.longitude = longitude
+        self.subscribers: Set[Subscription] = set()
+        self.message: Optional[bytes] = None
+
+class LiveFeedHub:
+    """
+    Pushes the Moon's position and orientation to many clients.
+
+    Subscribers are grouped by grid cell. A single ticker task computes the
+    state for every active cell in one vectorized pass per interval, formats
+    each cell's Server-Sent Events message once, and hands the same bytes to
+    every subscriber in that cell, so the cost of a tick depends on the
+    number of distinct cells, not the number of connections.
+    """
+
+    def __init__(self, interval: float = 5.0, grid_size: float = 0.01, max_subscribers: int = 10000):
+        """
+        Initialize the hub.
+
+        Args:
+            interval: Seconds between updates
+            grid_size: Cell size in degrees subscribers are snapped to
+            max_subscribers: Maximum number of concurrent subscribers
+        """
+        self.interval = interval
+        self.grid_size = grid_size
+        self.max_subscribers = max_subscribers
+        self._groups: Dict[Tuple[int, int], _Group] = {}
+        self._subscriber_count = 0
+        self._ticks = 0
+        self._ticker: Optional[asyncio.Task] = None
+
+    def _group_for(self, latitude: float, longitude: float) -> _Group:
+        cell = (round(latitude / self.grid_size), round(longitude / self.grid_size))
+        group = self._groups.get(cell)
+        if group is None:
+            group = self._groups[cell] = _Group(cell, cell[0] * self.grid_size, cell[1] * self.grid_size)
+        return group
+
+    def _compute(self, groups) -> None:
+        """Compute and store the current message of every given group in one pass."""
+        now = datetime.now(timezone.utc)
+        latitudes = np.array([group.latitude for group in groups])
+        longitudes = np.array([group.longitude for group in groups])
+        state = moon_positions_batch(np.datetime64(now.replace(tzinfo=None), "ms"), latitudes, longitudes)
+        position_angles = LunarMath.calculate_orientation_array(latitudes, state["azimuth"], state["altitude"])
+
+        timestamp = now.isoformat()
+        for index, group in enumerate(groups):
+            payload = json.dumps({
+                "position": {
+                    "altitude": float(state["altitude"][index]),
+                    "azimuth": float(state["azimuth"][index]),
+                    "right_ascension": float(state["right_ascension"][index]) / 15.0,
+                    "declination": float(state["declination"][index])
+                },
+                "orientation": {
+                    "position_angle": float(position_angles[index])
+                },
+                "timestamp": timestamp
+            })
+            group.message = f"event: position\ndata: {payload}\n\n".encode("utf-8")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._groups:
+            await asyncio.sleep(self.interval - loop.time() % self.interval)
+            groups = list(self._groups.values())
+            if not groups:
+                break
+            self._compute(groups)
+            self._ticks += 1
+            for group in groups:
+                for subscription in group.subscribers:
+                    subscription._deliver(group.message)
+
+    def subscribe(self, latitude: float, longitude: float) -> Subscription:
+        """
+        Join the feed for a location (call unsubscribe when the client leaves).
+
+        The first message is available immediately; later ones arrive every
+        interval. Must be called from the event loop.
+
+        Args:
+            latitude: Observer latitude
+            longitude: Observer longitude
+
+        Returns:
+            Subscription to read messages from
+
+        Raises:
+            LiveFeedFullError: If max_subscribers clients are already connected
+        """
+        if self._subscriber_count >= self.max_subscribers:
+            raise LiveFeedFullError("Too many live feed subscribers")
+
+        group = self._group_for(latitude, longitude)
+        if group.message is None:
+            self._compute([group])
+
+        subscription = Subscription(group)
+        subscription._deliver(group.message)
+        group.subscribers.add(subscription)
+        self._subscriber_count += 1
+
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.get_running_loop().create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Leave the feed; the group is dropped with its last subscriber."""
+        group = subscription.group
+        if subscription not in group.subscribers:
+            return
+        group.subscribers.discard(subscription)
+        self._subscriber_count -= 1
+        if not group.subscribers and self._groups.get(group.cell) is group:
+            del self._groups[group.cell]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the feed.
+
+        Returns:
+            Dictionary with subscriber and group counts, ticks sent and the interval
+        """
+        return {
+            "subscribers": self._subscriber_count,
+            "groups": len(self._groups),
+            "ticks": self._ticks,
+            "interval": self.interval
+        }
+
+    async def close(self) -> None:
+        """Stop the ticker task."""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
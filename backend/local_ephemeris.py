@@ -0,0 +1,149 @@
+# backend/local_ephemeris.py
+
+import math
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from backend.lunar_data import PHASE_EMOJIS
+from utils.ephemeris import AU_KM, datetime_to_jd, moon_state, phase_name
+
+MOON_RADIUS_KM = 1737.4
+SPEED_OF_LIGHT_KM_S = 299792.458
+
+class LocalEphemerisService:
+    """
+    Lunar data provider that computes everything locally.
+
+    Drop-in replacement for LunarDataService: get_moon_data returns the same
+    result dictionary, computed from the analytic series in utils.ephemeris
+    instead of a network call.
+    """
+
+    def __init__(self, elevation: float = 0.0):
+        """
+        Initialize the local provider.
+
+        Args:
+            elevation: Observer height above sea level in metres
+        """
+        self.elevation = elevation
+
+    def get_moon_data(self, latitude: float, longitude: float, date: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Get comprehensive moon data for a specific location and time.
+
+        Args:
+            latitude: Observer latitude
+            longitude: Observer longitude
+            date: Observation time (defaults to current time; naive values
+                are taken as local time)
+
+        Returns:
+            Dictionary with moon data including phase, position, etc.
+        """
+        if date is None:
+            date = datetime.now()
+
+        state = moon_state(datetime_to_jd(date), latitude, longitude, self.elevation)
+        return self._build_result(state, latitude, longitude, date.strftime("%Y-%m-%d"))
+
+    def get_state_version(self, date: datetime) -> Optional[str]:
+        """
+        Identify the data results for a given time are built from.
+
+        The local provider computes from fixed series, so the hour alone
+        identifies it (see LunarDataService.get_state_version).
+
+        Args:
+            date: Observation time
+
+        Returns:
+            Version string
+        """
+        return f"local_{date.strftime('%Y-%m-%d_%H')}"
+
+    def _build_result(self, state: Dict[str, Dict[str, float]], latitude: float, longitude: float,
+                      formatted_date: str) -> Dict[str, Any]:
+        """
+        Shape an ephemeris state like the Astronomy API result dictionary.
+
+        Args:
+            state: Result of utils.ephemeris.moon_state
+            latitude: Observer latitude
+            longitude: Observer longitude
+            formatted_date: Observation date as YYYY-MM-DD
+
+        Returns:
+            Dictionary with moon data including phase, position, etc.
+        """
+        geo = state["geocentric"]
+        topo = state["topocentric"]
+
+        name = phase_name(geo["elongation"])
+        distance_km = geo["distance_km"]
+
+        return {
+            "phase": {
+                "name": name,
+                "emoji": PHASE_EMOJIS.get(name, "🌙"),
+                "illumination": geo["illumination"] * 100,
+                "age": (geo["elongation"] / 360) * 29.53,
+                "angle": geo["elongation"]
+            },
+            "distance": {
+                "km": distance_km,
+                "au": distance_km / AU_KM,
+                "light_seconds": distance_km / SPEED_OF_LIGHT_KM_S
+            },
+            "position": {
+                "altitude": topo["altitude"],
+                "azimuth": topo["azimuth"],
+                "right_ascension": topo["right_ascension"] / 15,
+                "declination": topo["declination"],
+                "parallax": topo["parallax"],
+                "geocentric": {
+                    "right_ascension": geo["right_ascension"] / 15,
+                    "declination": geo["declination"]
+                }
+            },
+            "angular_diameter": math.degrees(2 * math.asin(MOON_RADIUS_KM / topo["distance_km"])),
+            "observer": {
+                "latitude": latitude,
+                "longitude": longitude,
+                "date": formatted_date
+            }
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics (the local provider keeps no cache).
+
+        Returns:
+            Dictionary naming the provider
+        """
+        return {"provider": "local"}
+
+    def close(self) -> None:
+        """Release resources (nothing to release for the local provider)."""
+
+class AsyncLocalEphemerisService(LocalEphemerisService):
+    """Awaitable interface to LocalEphemerisService for the FastAPI server."""
+
+    async def get_moon_data(self, latitude: float, longitude: float, date: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Get comprehensive moon data for a specific location and time.
+
+        The computation takes microseconds, so it runs inline on the loop.
+
+        Args:
+            latitude: Observer latitude
+            longitude: Observer longitude
+            date: Observation time (defaults to current time)
+
+        Returns:
+            Dictionary with moon data including phase, position, etc.
+        """
+        return super().get_moon_data(latitude, longitude, date)
+
+    async def close(self) -> None:
+        """Release resources (nothing to release for the local provider)."""
@@ -1,53 +1,150 @@
+import logging
 import requests
 from geopy.geocoders import Nominatim
 import sys
 import time
 from typing import Dict, Any, Tuple, Optional
 
+from backend.gazetteer import Gazetteer
+from backend.geocode_cache import GeocodeCache, normalize_location_query
+from backend.geocode_scheduler import GeocodeDeadlineError, GeocodeScheduler
+from backend.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
 class LocationService:
     """Service for handling location data and geocoding."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[GeocodeCache] = None,
+                 gazetteer: Optional[Gazetteer] = None, scheduler: Optional[GeocodeScheduler] = None,
+                 domain: str = "nominatim.openstreetmap.org", scheme: str = "https"):
         """
         Initialize the location service.
         
         Args:
             api_key: Optional API key for geocoding service
+            cache: Optional cache of geocoding results
+            gazetteer: Optional offline gazetteer consulted before the geocoder
+            scheduler: Queue pacing geocoder calls (defaults to 1 request/second)
+            domain: Host (and optional port) of the Nominatim server
+            scheme: "https", or "http" for a local stand-in
         """
         self.api_key = api_key
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.scheduler = scheduler if scheduler is not None else GeocodeScheduler()
         # Use Nominatim as default geocoder (no API key required)
-        self.geolocator = Nominatim(user_agent="lunar_observer")
+        self.geolocator = Nominatim(user_agent="lunar_observer", domain=domain, scheme=scheme)
         
-    def get_coordinates(self, location_name: str) -> Dict[str, Any]:
+    def get_coordinates(self, location_name: str, timeout: Optional[float] = None,
+                        client: Any = None) -> Dict[str, Any]:
         """
         Convert a location name to geographic coordinates.
         
         Args:
             location_name: Name of the location (e.g., "Los Angeles, CA")
+            timeout: Seconds to wait for a turn at the geocoder (None waits indefinitely)
+            client: Caller identity used to share the geocoder fairly
             
         Returns:
             Dictionary with latitude, longitude, and formatted address
             
         Raises:
             ValueError: If location cannot be found
+            GeocodeDeadlineError: If the geocoder cannot be reached within timeout
         """
+        if self.gazetteer is not None:
+            place = self.gazetteer.lookup(location_name)
+            if place is not None:
+                return place
+        
+        cached = self._lookup_cache(self.cache, location_name)
+        if cached is not None:
+            return cached
+        
         try:
-            print(f"Finding coordinates for {location_name}...", end="", flush=True)
+            # Identical pending queries share one geocoder call
+            location_data = self.scheduler.submit(
+                normalize_location_query(location_name),
+                lambda: self._geocode(location_name),
+                timeout=timeout,
+                client=client
+            )
+            return location_data
+        except GeocodeDeadlineError:
+            logger.warning("Geocoding deadline missed", extra={"location": location_name})
+            raise
+        except Exception as e:
+            logger.warning("Geocoding failed", extra={"location": location_name, "error": str(e)})
+            raise ValueError(f"Error finding location: {str(e)}")
+    
+    def _geocode(self, location_name: str) -> Dict[str, Any]:
+        """
+        Ask the geocoder for a location and cache the outcome.
+        
+        Args:
+            location_name: Name of the location
+            
+        Returns:
+            Dictionary with latitude, longitude, and formatted address
+            
+        Raises:
+            ValueError: If the geocoder found nothing
+        """
+        with observe_upstream("nominatim") as call:
             location = self.geolocator.geocode(location_name)
+            call.status = "ok" if location is not None else "not_found"
+        logger.info("Geocoded location", extra={"location": location_name, "status": call.status})
+        
+        if location is None:
+            if self.cache is not None:
+                self.cache.set_not_found(location_name)
+            raise ValueError(f"Location not found: {location_name}")
+        
+        location_data = self._to_location_data(location)
+        if self.cache is not None:
+            self.cache.set(location_name, location_data)
+        return location_data
+    
+    @staticmethod
+    def _lookup_cache(cache: Optional[GeocodeCache], location_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously geocoded location.
+        
+        Args:
+            cache: Geocode cache to consult (may be None)
+            location_name: Name of the location
             
-            if location is None:
-                raise ValueError(f"Location not found: {location_name}")
-                
-            print(" Done.")
+        Returns:
+            Cached location data, or None on a miss
             
-            return {
-                "latitude": location.latitude,
-                "longitude": location.longitude,
-                "address": location.address
-            }
-        except Exception as e:
-            print(f" Error: {str(e)}")
-            raise ValueError(f"Error finding location: {str(e)}")
+        Raises:
+            ValueError: If the location is cached as not found
+        """
+        if cache is None:
+            return None
+        
+        hit, location_data = cache.get(location_name)
+        if hit and location_data is None:
+            raise ValueError(f"Error finding location: Location not found: {location_name}")
+        return location_data
+    
+    @staticmethod
+    def _to_location_data(location: Any) -> Dict[str, Any]:
+        """
+        Convert a geopy Location into the service's location dictionary.
+        
+        Args:
+            location: Result returned by a geopy geocoder
+            
+        Returns:
+            Dictionary with latitude, longitude, and formatted address
+        """
+        return {
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "address": location.address
+        }
     
     def format_location_info(self, location_data: Dict[str, Any]) -> str:
         """
@@ -2,17 +2,52 @@
 
 import requests
 import json
+import logging
 import base64
-from datetime import datetime, timedelta
+import hashlib
+from datetime import date as date_type, datetime, timedelta, timezone
 import os
 import time
 import sys
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.cache import LunarCache
+from backend.http_client import create_session, get_with_retries
+from backend.persistent_cache import PersistentCache
+from backend.singleflight import SingleFlight
+from utils.ephemeris import datetime_to_jd, geocentric_from_topocentric, geocentric_rates, topocentric_state
+
+logger = logging.getLogger(__name__)
+
+# Emoji shown for each phase name returned by the API
+PHASE_EMOJIS = {
+    "New Moon": "🌑",
+    "Waxing Crescent": "🌒",
+    "First Quarter": "🌓",
+    "Waxing Gibbous": "🌔",
+    "Full Moon": "🌕",
+    "Waning Gibbous": "🌖",
+    "Last Quarter": "🌗",
+    "Waning Crescent": "🌘"
+}
 
 class LunarDataService:
-    """Service for retrieving lunar data from astronomy APIs."""
+    """
+    Service for retrieving lunar data from astronomy APIs.
     
-    def __init__(self, app_id: str, app_secret: str, base_url: str):
+    The API is queried for one observer, but what gets cached is the
+    observer-independent (geocentric) state for that hour: phase,
+    illumination, distance and the Moon's geocentric position. Altitude,
+    azimuth and parallax are then derived locally for each observer, so
+    one upstream call per hour serves every location.
+    """
+    
+    def __init__(self, app_id: str, app_secret: str, base_url: str,
+                 cache_duration: int = 3600, cache_max_entries: int = 4096,
+                 persistent_cache: Optional[PersistentCache] = None,
+                 pool_size: int = 10, connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0):
         """
         Initialize the lunar data service.
         
@@ -20,6 +55,15 @@ class LunarDataService:
             app_id: Application ID for the astronomy service
             app_secret: Application Secret for the astronomy service
             base_url: Base URL for the astronomy API
+            cache_duration: Seconds a cached result stays valid
+            cache_max_entries: Maximum number of cached results kept in memory
+            persistent_cache: Optional on-disk store shared with other processes
+            pool_size: Maximum number of keep-alive connections to the API
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait for the API to send a response
+            max_retries: Retries on connection errors, 429 and 5xx responses
+            backoff_base: Scale of the jittered exponential backoff in seconds
+            backoff_max: Longest single backoff (or Retry-After) honoured, in seconds
         """
         # Clean the credentials to remove any potential whitespace
         self.app_id = app_id.strip()
@@ -36,9 +80,34 @@ class LunarDataService:
             "Content-Type": "application/json"
         }
         
-        # Initialize cache
-        self.cache = {}
-        self.cache_duration = 3600  # 1 hour in seconds
+        # Pooled keep-alive session so repeat requests skip the TCP+TLS handshake
+        self.session = self._create_session(pool_size)
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        # Initialize cache (bounded LRU with TTL, safe to share across threads)
+        self.cache_duration = cache_duration
+        self.cache = LunarCache(max_entries=cache_max_entries, ttl=cache_duration)
+        
+        # Collapse concurrent misses for the same key into one upstream request
+        self._inflight = SingleFlight()
+        
+        # Second-tier cache that survives restarts and is shared by all workers
+        self.persistent_cache = persistent_cache
+        if self.persistent_cache is not None:
+            self._warm_start()
+    
+    def _create_session(self, pool_size: int):
+        """Create the HTTP client used for API requests."""
+        return create_session(pool_size=pool_size, headers=self.headers)
+    
+    def _warm_start(self) -> None:
+        """Compact the persistent store and preload the in-memory cache from it."""
+        self.persistent_cache.compact()
+        for key, value, remaining_ttl in self.persistent_cache.items(limit=self.cache.max_entries):
+            self.cache.set(key, value, ttl=remaining_ttl)
         
     def get_moon_data(self, latitude: float, longitude: float, date: Optional[datetime] = None) -> Dict[str, Any]:
         """
@@ -47,117 +116,437 @@ class LunarDataService:
         Args:
             latitude: Observer latitude
             longitude: Observer longitude
-            date: Observation time (defaults to current time)
+            date: Observation time (defaults to current time; naive values
+                are taken as local time)
             
         Returns:
             Dictionary with moon data including phase, position, etc.
         """
         if date is None:
             date = datetime.now()
+        
+        # The API is sampled (and the cache keyed) on whole UTC hours
+        utc_date = date.astimezone(timezone.utc)
             
-        # Create a cache key based on location and date
-        cache_key = f"{latitude}_{longitude}_{date.strftime('%Y-%m-%d_%H')}"
+        # Create a cache key based on the observation hour (shared by all observers)
+        cache_key = self._cache_key(utc_date)
         
         # Check if we have cached data
-        if cache_key in self.cache:
-            cache_time, cached_data = self.cache[cache_key]
-            if time.time() - cache_time < self.cache_duration:
-                return cached_data
+        geo_state = self._get_cached(cache_key)
+        if geo_state is None:
+            def load() -> Dict[str, Any]:
+                # A flight that finished after our lookup may have filled the cache already
+                cached = self._get_cached(cache_key)
+                if cached is not None:
+                    return cached
+                return self._fetch_moon_data(cache_key, latitude, longitude, utc_date)
+            
+            # Only one thread fetches a given hour; the others wait for its result
+            geo_state = self._inflight.do(cache_key, load)
+        
+        return self._observer_result(geo_state, latitude, longitude, date)
+    
+    def get_state_version(self, date: datetime) -> Optional[str]:
+        """
+        Identify the cached state that results for a given time are built from.
+        
+        Only the in-memory cache is consulted, so this never blocks or
+        triggers a fetch. The version changes whenever the cached value does.
+        
+        Args:
+            date: Observation time
+            
+        Returns:
+            Cache key plus a digest of the cached value, or None if the
+            hour is not cached in memory
+        """
+        cache_key = self._cache_key(date)
+        geo_state = self.cache.get(cache_key)
+        if geo_state is None:
+            return None
+        digest = hashlib.sha1(json.dumps(geo_state, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{cache_key}:{digest[:12]}"
+    
+    def _fetch_moon_data(self, cache_key: str, latitude: float, longitude: float,
+                         date: datetime) -> Dict[str, Any]:
+        """
+        Request moon data from the API and cache the geocentric state.
         
+        Args:
+            cache_key: Key the state is cached under
+            latitude: Latitude of the observer the API is queried for
+            longitude: Longitude of the observer the API is queried for
+            date: Observation time in UTC
+            
+        Returns:
+            Geocentric state (see _parse_moon_cell)
+        """
         # Format the date for API request
         formatted_date = date.strftime("%Y-%m-%d")
         
-        print("Fetching lunar data...", end="", flush=True)
-        
         try:
             # Build the URL for the API request
-            url = (f"{self.base_url}bodies/positions/moon"
-                f"?latitude={latitude}&longitude={longitude}"
-                f"&elevation=0&from_date={formatted_date}&to_date={formatted_date}"
-                f"&time=12:00:00")
+            url = self._build_url(latitude, longitude, formatted_date, formatted_date, date.hour)
             
             # Make the request
-            response = requests.get(url, headers=self.headers)
+            response = get_with_retries(
+                self.session, url,
+                timeout=self.timeout,
+                max_retries=self.max_retries,
+                backoff_base=self.backoff_base,
+                backoff_max=self.backoff_max,
+                service="astronomy_api"
+            )
             
             if response.status_code != 200:
-                print(f" Failed: {response.status_code}")
+                logger.warning("Astronomy API request failed",
+                               extra={"cache_key": cache_key, "status": response.status_code})
                 raise Exception(f"API request failed: {response.status_code}")
                 
             # Parse the response
             data = response.json()
-            print(" Done.")
-            
-            # Direct path to the moon data
-            moon_data = data["data"]["table"]["rows"][0]["cells"][0]
-            
-            # Extract phase information
-            phase_info = moon_data["extraInfo"]["phase"]
-            phase_name = phase_info["string"]
-            phase_angle = float(phase_info["angel"])
-            illumination = float(phase_info["fraction"]) * 100
-            
-            # Calculate lunar age (days)
-            lunar_cycle = 29.53
-            age = (phase_angle / 360) * lunar_cycle
-            
-            # Extract distance information
-            distance = moon_data["distance"]["fromEarth"]
-            distance_km = float(distance["km"])
-            distance_au = float(distance["au"])
-            
-            # Extract position information
-            position = moon_data["position"]
-            altitude = float(position["horizontal"]["altitude"]["degrees"])
-            azimuth = float(position["horizontal"]["azimuth"]["degrees"])
-            right_ascension = float(position["equatorial"]["rightAscension"]["hours"])
-            declination = float(position["equatorial"]["declination"]["degrees"])
-            
-            # Calculate angular diameter
-            avg_distance = 384400  # km
-            avg_angular_diameter = 0.5  # degrees
-            angular_diameter = avg_angular_diameter * (avg_distance / distance_km)
-            
-            # Create and return the result
-            result = {
-                "phase": {
-                    "name": phase_name,
-                    "emoji": self._get_phase_emoji(phase_name),
-                    "illumination": illumination,
-                    "age": age,
-                    "angle": phase_angle
-                },
-                "distance": {
-                    "km": distance_km,
-                    "au": distance_au,
-                    "light_seconds": distance_km / 299792.458
-                },
-                "position": {
-                    "altitude": altitude,
-                    "azimuth": azimuth,
-                    "right_ascension": right_ascension,
-                    "declination": declination
-                },
-                "angular_diameter": angular_diameter,
-                "observer": {
-                    "latitude": latitude,
-                    "longitude": longitude,
-                    "date": formatted_date
-                }
-            }
+            logger.info("Fetched lunar data", extra={"cache_key": cache_key})
+            
+            geo_state = self._parse_moon_data(data, latitude, longitude)
             
-            # Cache the result
-            self.cache[cache_key] = (time.time(), result)
+            # Cache the observer-independent part
+            self._store_cached(cache_key, geo_state)
             
-            return result
+            return geo_state
             
         except Exception as e:
-            print(f" Error: {str(e)}")
+            logger.exception("Lunar data request failed", extra={"cache_key": cache_key})
+            raise Exception(f"Failed to retrieve lunar data: {str(e)}")
+    
+    def _cache_key(self, date: datetime) -> str:
+        """Build the cache key for an observation hour (the UTC hour; naive values are local time)."""
+        return f"geo_{date.astimezone(timezone.utc).strftime('%Y-%m-%d_%H')}"
+    
+    def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result in the in-memory cache, then the persistent cache.
+        
+        Args:
+            cache_key: Key built by _cache_key
             
-            # For better debugging, show the specific error location
-            import traceback
-            traceback.print_exc()
+        Returns:
+            Cached geocentric state, or None on a miss
+        """
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+        
+        # Fall back to the shared on-disk cache (filled by other workers or previous runs)
+        if self.persistent_cache is not None:
+            entry = self.persistent_cache.get_with_ttl(cache_key)
+            if entry is not None:
+                cached_data, remaining_ttl = entry
+                self.cache.set(cache_key, cached_data, ttl=remaining_ttl)
+                return cached_data
+        
+        return None
+    
+    def _store_cached(self, cache_key: str, geo_state: Dict[str, Any],
+                      ttl: Optional[float] = None) -> None:
+        """
+        Write a geocentric state through to every cache tier.
+        
+        Args:
+            cache_key: Key built by _cache_key
+            geo_state: State returned by _parse_moon_cell
+            ttl: Seconds the entry stays valid (defaults to cache_duration)
+        """
+        self.cache.set(cache_key, geo_state, ttl=ttl)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(cache_key, geo_state, ttl=ttl)
+    
+    def _build_url(self, latitude: float, longitude: float, from_date: str, to_date: str,
+                   hour: int) -> str:
+        """
+        Build the moon positions request URL.
+        
+        The API returns one cell per day between from_date and to_date, all
+        at the same time of day.
+        
+        Args:
+            latitude: Observer latitude
+            longitude: Observer longitude
+            from_date: First day as YYYY-MM-DD
+            to_date: Last day as YYYY-MM-DD
+            hour: Hour of day to sample
             
-            raise Exception(f"Failed to retrieve lunar data: {str(e)}")
+        Returns:
+            Request URL
+        """
+        return (f"{self.base_url}bodies/positions/moon"
+            f"?latitude={latitude}&longitude={longitude}"
+            f"&elevation=0&from_date={from_date}&to_date={to_date}"
+            f"&time={hour:02d}:00:00")
+    
+    def prefetch_range(self, latitude: float, longitude: float, start: datetime, end: datetime,
+                       interval: timedelta = timedelta(hours=1)) -> int:
+        """
+        Fill the cache for every timestamp between start and end.
+        
+        Timestamps that share an hour of day are fetched together with one
+        multi-day request, so a week of hourly lookups costs 24 API calls
+        instead of 168 (and a daily series costs one). The cached states
+        serve every observer, not just the one given here.
+        
+        Args:
+            latitude: Latitude of the observer the API is queried for
+            longitude: Longitude of the observer the API is queried for
+            start: First timestamp
+            end: Last timestamp (inclusive)
+            interval: Spacing between timestamps
+            
+        Returns:
+            Number of cache entries written
+            
+        Raises:
+            ValueError: If the range or interval is invalid
+        """
+        filled = 0
+        for from_date, to_date, hour in self._plan_prefetch(start, end, interval):
+            url = self._build_url(latitude, longitude, from_date.strftime("%Y-%m-%d"),
+                                  to_date.strftime("%Y-%m-%d"), hour)
+            response = get_with_retries(
+                self.session, url,
+                timeout=self.timeout,
+                max_retries=self.max_retries,
+                backoff_base=self.backoff_base,
+                backoff_max=self.backoff_max,
+                service="astronomy_api"
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"API request failed: {response.status_code}")
+            
+            filled += self._store_range(response.json(), latitude, longitude, from_date, hour)
+        
+        return filled
+    
+    def _plan_prefetch(self, start: datetime, end: datetime,
+                       interval: timedelta) -> List[Tuple[date_type, date_type, int]]:
+        """
+        Group the uncached timestamps of a range into multi-day API requests.
+        
+        Args:
+            start: First timestamp (naive values are taken as local time)
+            end: Last timestamp (inclusive)
+            interval: Spacing between timestamps
+            
+        Returns:
+            List of (first UTC day, last UTC day, UTC hour of day) request spans
+            
+        Raises:
+            ValueError: If the range or interval is invalid
+        """
+        if interval <= timedelta(0):
+            raise ValueError("interval must be positive")
+        if end < start:
+            raise ValueError("end must not be before start")
+        
+        # UTC hour of day -> (first day, last day) still missing from the cache
+        spans: Dict[int, Tuple[date_type, date_type]] = {}
+        timestamp = start.astimezone(timezone.utc)
+        end = end.astimezone(timezone.utc)
+        while timestamp <= end:
+            if self._cache_key(timestamp) not in self.cache:
+                day = timestamp.date()
+                first, last = spans.get(timestamp.hour, (day, day))
+                spans[timestamp.hour] = (min(first, day), max(last, day))
+            timestamp += interval
+        
+        return [(first, last, hour) for hour, (first, last) in sorted(spans.items())]
+    
+    def _store_range(self, data: Dict[str, Any], latitude: float, longitude: float,
+                     from_date: date_type, hour: int) -> int:
+        """
+        Parse every row and cell of a multi-day response into the cache.
+        
+        Args:
+            data: Decoded JSON body of a moon positions response
+            latitude: Latitude of the observer the API was queried for
+            longitude: Longitude of the observer the API was queried for
+            from_date: First (UTC) day covered by the response
+            hour: UTC hour of day the response was sampled at
+            
+        Returns:
+            Number of cache entries written
+        """
+        filled = 0
+        now = datetime.now(timezone.utc)
+        for row in data["data"]["table"]["rows"]:
+            if row.get("entry", {}).get("id", "moon") != "moon":
+                continue
+            
+            # Cells are returned one per day, in order, starting at from_date
+            for offset, cell in enumerate(row["cells"]):
+                day = from_date + timedelta(days=offset)
+                timestamp = datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+                geo_state = self._parse_moon_cell(cell, latitude, longitude)
+                
+                # Keep future hours until they have been current for a full cache period
+                ttl = max((timestamp + timedelta(hours=1) - now).total_seconds(), 0) + self.cache_duration
+                self._store_cached(self._cache_key(timestamp), geo_state, ttl=ttl)
+                filled += 1
+        
+        return filled
+    
+    def _parse_moon_data(self, data: Dict[str, Any], latitude: float,
+                         longitude: float) -> Dict[str, Any]:
+        """
+        Convert an API response into the cached geocentric state.
+        
+        Args:
+            data: Decoded JSON body of a moon positions response
+            latitude: Latitude of the observer the API was queried for
+            longitude: Longitude of the observer the API was queried for
+            
+        Returns:
+            Geocentric state (see _parse_moon_cell)
+        """
+        # Direct path to the moon data
+        moon_data = data["data"]["table"]["rows"][0]["cells"][0]
+        return self._parse_moon_cell(moon_data, latitude, longitude)
+    
+    def _parse_moon_cell(self, moon_data: Dict[str, Any], latitude: float,
+                         longitude: float) -> Dict[str, Any]:
+        """
+        Extract the observer-independent state from one table cell.
+        
+        The API reports the position as seen by the observer it was queried
+        for; that observer's parallax is removed so the position can be
+        re-projected for anyone else (see _observer_result).
+        
+        Args:
+            moon_data: A cell from data.table.rows[].cells
+            latitude: Latitude of the observer the API was queried for
+            longitude: Longitude of the observer the API was queried for
+            
+        Returns:
+            Dictionary with phase and distance information plus the geocentric
+            right ascension, declination (degrees), distance, Greenwich
+            sidereal time and Julian day (UT) of the sampled instant, and the
+            rates of change of the position (see utils.ephemeris.geocentric_rates)
+        """
+        # Extract phase information
+        phase_info = moon_data["extraInfo"]["phase"]
+        
+        # Extract distance information
+        distance = moon_data["distance"]["fromEarth"]
+        distance_km = float(distance["km"])
+        
+        # Extract position information and remove the observer's parallax
+        position = moon_data["position"]
+        geocentric = geocentric_from_topocentric(
+            float(position["equatorial"]["rightAscension"]["hours"]) * 15,
+            float(position["equatorial"]["declination"]["degrees"]),
+            float(position["horizontal"]["altitude"]["degrees"]),
+            float(position["horizontal"]["azimuth"]["degrees"]),
+            distance_km,
+            latitude,
+            longitude
+        )
+        # The instant the sidereal time belongs to, and how fast the Moon is
+        # moving then, so the state can be carried to other times in the hour
+        geocentric["jd"] = datetime_to_jd(datetime.fromisoformat(moon_data["date"]))
+        geocentric.update(geocentric_rates(geocentric["jd"]))
+        
+        return {
+            "phase": {
+                "name": phase_info["string"],
+                "illumination": float(phase_info["fraction"]) * 100,
+                "angle": float(phase_info["angel"])
+            },
+            "distance": {
+                "km": distance_km,
+                "au": float(distance["au"])
+            },
+            **geocentric
+        }
+    
+    def _observer_result(self, geo_state: Dict[str, Any], latitude: float, longitude: float,
+                         date: datetime) -> Dict[str, Any]:
+        """
+        Build the result dictionary for one observer from a geocentric state.
+        
+        Args:
+            geo_state: State returned by _parse_moon_cell
+            latitude: Observer latitude
+            longitude: Observer longitude
+            date: Observation time
+            
+        Returns:
+            Dictionary with moon data including phase, position, etc.
+        """
+        phase_name = geo_state["phase"]["name"]
+        phase_angle = geo_state["phase"]["angle"]
+        
+        # Calculate lunar age (days)
+        lunar_cycle = 29.53
+        age = (phase_angle / 360) * lunar_cycle
+        
+        distance_km = geo_state["distance"]["km"]
+        
+        # Project the geocentric position for this observer, carrying the sky and
+        # the Moon from the sampled instant (the start of the UTC hour) to the
+        # requested time. States cached before the instant was recorded are
+        # used as sampled.
+        jd_ut = datetime_to_jd(date) if "jd" in geo_state else None
+        topo = topocentric_state(geo_state, latitude, longitude, jd_ut=jd_ut)
+        
+        # Calculate angular diameter
+        avg_distance = 384400  # km
+        avg_angular_diameter = 0.5  # degrees
+        angular_diameter = avg_angular_diameter * (avg_distance / distance_km)
+        
+        # Create and return the result
+        return {
+            "phase": {
+                "name": phase_name,
+                "emoji": self._get_phase_emoji(phase_name),
+                "illumination": geo_state["phase"]["illumination"],
+                "age": age,
+                "angle": phase_angle
+            },
+            "distance": {
+                "km": distance_km,
+                "au": geo_state["distance"]["au"],
+                "light_seconds": distance_km / 299792.458
+            },
+            "position": {
+                "altitude": topo["altitude"],
+                "azimuth": topo["azimuth"],
+                "right_ascension": topo["right_ascension"] / 15,
+                "declination": topo["declination"],
+                "parallax": topo["parallax"]
+            },
+            "angular_diameter": angular_diameter,
+            "observer": {
+                "latitude": latitude,
+                "longitude": longitude,
+                "date": date.strftime("%Y-%m-%d")
+            }
+        }
+    
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self.session.close()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics for the lunar data cache.
+        
+        Returns:
+            Dictionary with cache size, hit/miss/eviction counters and hit rate
+        """
+        stats = self.cache.stats()
+        stats["single_flight"] = self._inflight.stats()
+        if self.persistent_cache is not None:
+            stats["persistent"] = self.persistent_cache.stats()
+        return stats
     
     def _get_phase_emoji(self, phase_name: str) -> str:
         """
@@ -169,15 +558,4 @@ class LunarDataService:
         Returns:
             Emoji character representing the phase
         """
-        phase_emojis = {
-            "New Moon": "🌑",
-            "Waxing Crescent": "🌒",
-            "First Quarter": "🌓",
-            "Waxing Gibbous": "🌔",
-            "Full Moon": "🌕",
-            "Waning Gibbous": "🌖",
-            "Last Quarter": "🌗",
-            "Waning Crescent": "🌘"
-        }
-        
-        return phase_emojis.get(phase_name, "🌙")
\ No newline at end of file
+        return PHASE_EMOJIS.get(phase_name, "🌙")
\ No newline at end of file
@@ -0,0 +1,329 @@
+# backend/metrics.py
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits (sub-millisecond) to slow upstream calls
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+class _Value:
+    """A single counter or gauge series."""
+
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        """Count the enclosed block as in progress for its duration."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+class _HistogramValue:
+    """A single histogram series: cumulative bucket counts, sum and count."""
+
+    __slots__ = ("_lock", "bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self._lock = threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+class _Metric:
+    """A named metric family whose series are selected by label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_series(self):
+        return _Value()
+
+    def labels(self, **labels: Any):
+        """
+        Series for one combination of label values (created on first use).
+
+        Raises:
+            ValueError: If the label names do not match the metric's
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def _samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        for key, series in list(self._series.items()):
+            yield self.name, dict(zip(self.labelnames, key)), series.value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabelled series."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled series."""
+        self.labels().set(value)
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in the unlabelled series."""
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        for key, series in list(self._series.items()):
+            labels = dict(zip(self.labelnames, key))
+            with series._lock:
+                counts, total, count = list(series.counts), series.sum, series.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-compatible metrics registry.
+
+    Holds counters, gauges and histograms updated on the request path, plus
+    collector callbacks that turn counters kept elsewhere (cache statistics,
+    queue lengths) into metric families at scrape time. render() produces
+    the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """
+        Add a callback evaluated on every scrape.
+
+        Args:
+            collector: Function returning (name, type, help, samples) tuples,
+                where samples is a list of (labels, value) pairs
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Current values in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "lunar_http_requests_total", "HTTP requests served, by route, method and status code",
+    ["route", "method", "status"])
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "lunar_http_request_duration_seconds", "Time to serve an HTTP request, by route", ["route"])
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "lunar_http_requests_in_flight", "HTTP requests currently being served")
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "lunar_request_stage_duration_seconds",
+    "Time spent in each stage of the /lunar-data request path", ["stage"])
+
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "lunar_upstream_responses_total",
+    "Upstream calls by service and outcome (HTTP status code, or error)", ["service", "status"])
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "lunar_upstream_request_duration_seconds", "Time per upstream call attempt, by service", ["service"])
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge(
+    "lunar_upstream_requests_in_flight", "Upstream calls currently in progress, by service", ["service"])
+
+class UpstreamCall:
+    """Outcome of one upstream call, filled in by the code making it."""
+
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status: Any = "error"
+
+@contextmanager
+def observe_upstream(service: str) -> Iterator[UpstreamCall]:
+    """
+    Time one upstream call and count its outcome.
+
+    The block sets `status` on the yielded object (an HTTP status code or a
+    short word such as "not_found"); a block that raises counts as "error".
+
+    Args:
+        service: Upstream name used as the metric label
+    """
+    call = UpstreamCall()
+    in_flight = UPSTREAM_IN_FLIGHT.labels(service=service)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        in_flight.dec()
+        UPSTREAM_SECONDS.labels(service=service).observe(time.perf_counter() - started)
+        UPSTREAM_RESPONSES.labels(service=service, status=call.status).inc()
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them per route.
+
+    Requests are labelled with the route template ("/lunar-data/live"), not
+    the raw path, so query strings and path parameters cannot inflate the
+    number of series.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUESTS.labels(route=route, method=scope["method"], status=status).inc()
+            HTTP_REQUEST_SECONDS.labels(route=route).observe(time.perf_counter() - started)
@@ -0,0 +1,190 @@
+# backend/moon_atlas.py
+
+import io
+import mmap
+import os
+import struct
+from typing import Optional, Tuple
+
+from PIL import Image
+
+# Atlas file layout (little-endian):
+#   header | (frame count + 1) uint64 frame offsets | PNG frames
+# Frame i holds phase index i // rotation count and rotation index
+# i % rotation count; frame i spans offsets[i]..offsets[i + 1] from the
+# start of the file. Frames are stored PNG-encoded, ready to be sent.
+_MAGIC = b"LMAT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")  # magic, version, frame size (px), phase count, rotation count
+_OFFSET = struct.Struct("<Q")
+
+def build_atlas(renderer, atlas_path: str, size: int = 300, phase_count: int = 72,
+                rotation_count: int = 24, progress=None) -> int:
+    """
+    Pre-render the moon at evenly spaced elongations and position angles into one file.
+
+    All frames have zero libration. The file is written to a temporary
+    name and moved into place, so servers that already mapped the old
+    atlas keep a consistent view.
+
+    Args:
+        renderer: MoonRenderer used to draw the frames
+        atlas_path: Where to write the atlas
+        size: Width and height of every frame in pixels
+        phase_count: Elongations (phases), 360 / phase_count degrees apart
+        rotation_count: Position angles, 360 / rotation_count degrees apart
+        progress: Optional callable receiving (frames done, frame total)
+
+    Returns:
+        Number of frames written
+    """
+    total = phase_count * rotation_count
+    directory = os.path.dirname(atlas_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{atlas_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, size, phase_count, rotation_count))
+        table_offset = f.tell()
+        f.write(bytes(_OFFSET.size * (total + 1)))  # Filled in once the frame sizes are known
+
+        offsets = []
+        for phase_index in range(phase_count):
+            for rotation_index in range(rotation_count):
+                offsets.append(f.tell())
+                rgba = renderer.render(360.0 * phase_index / phase_count,
+                                       360.0 * rotation_index / rotation_count, 0.0, 0.0, size)
+                Image.fromarray(rgba, "RGBA").save(f, format="PNG", compress_level=6)
+                if progress is not None:
+                    progress(len(offsets), total)
+        offsets.append(f.tell())
+
+        f.seek(table_offset)
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+    os.replace(tmp_path, atlas_path)
+
+    return total
+
+class MoonAtlas:
+    """
+    Memory-mapped grid of pre-rendered moon images.
+
+    A lookup rounds the phase and position angles to the nearest frame and
+    returns a memoryview slice of the mapping: the PNG bytes go to the
+    client without being decoded, re-encoded or copied, and the OS page
+    cache is shared between server workers.
+    """
+
+    def __init__(self, atlas_path: str):
+        """
+        Map an atlas built by build_atlas.
+
+        Args:
+            atlas_path: Path to the atlas file
+
+        Raises:
+            ValueError: If the file is not a moon atlas
+        """
+        self.atlas_path = atlas_path
+        with open(atlas_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.size, self.phase_count, self.rotation_count = _HEADER.unpack_from(self._map, 0)
+        frame_count = self.phase_count * self.rotation_count
+        if magic != _MAGIC or version != _VERSION or frame_count == 0:
+            self._map.close()
+            raise ValueError(f"Not a moon atlas: {atlas_path}")
+        if len(self._map) < _HEADER.size + _OFFSET.size * (frame_count + 1):
+            self._map.close()
+            raise ValueError(f"Truncated moon atlas: {atlas_path}")
+
+        self._view = memoryview(self._map)
+        self._offsets = self._view[_HEADER.size:_HEADER.size + _OFFSET.size * (frame_count + 1)].cast("Q")
+        if self._offsets[-1] != len(self._map):
+            self.close()
+            raise ValueError(f"Truncated moon atlas: {atlas_path}")
+
+        self.phase_step = 360.0 / self.phase_count
+        self.rotation_step = 360.0 / self.rotation_count
+
+    @classmethod
+    def open(cls, atlas_path: str) -> Optional["MoonAtlas"]:
+        """
+        Map an atlas if one has been built.
+
+        Args:
+            atlas_path: Path to the atlas file
+
+        Returns:
+            MoonAtlas, or None if the file is missing or unreadable
+        """
+        try:
+            return cls(atlas_path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def nearest(self, elongation: float, position_angle: float) -> Tuple[int, int]:
+        """
+        Grid indices of the frame closest to the given angles.
+
+        Returns:
+            (phase index, rotation index)
+        """
+        phase_index = round((elongation % 360) / self.phase_step) % self.phase_count
+        rotation_index = round((position_angle % 360) / self.rotation_step) % self.rotation_count
+        return phase_index, rotation_index
+
+    def frame(self, phase_index: int, rotation_index: int) -> memoryview:
+        """
+        PNG bytes of one frame, as a zero-copy view into the mapping.
+
+        Args:
+            phase_index: Index along the phase axis
+            rotation_index: Index along the rotation axis
+
+        Returns:
+            memoryview of the encoded frame
+        """
+        index = phase_index * self.rotation_count + rotation_index
+        return self._view[self._offsets[index]:self._offsets[index + 1]]
+
+    def image(self, phase_index: int, rotation_index: int) -> Image.Image:
+        """Decoded frame as a PIL image."""
+        with Image.open(io.BytesIO(self.frame(phase_index, rotation_index))) as image:
+            return image.convert("RGBA")
+
+    def close(self) -> None:
+        """Unmap the atlas (views handed out earlier must be released first)."""
+        self._offsets.release()
+        self._view.release()
+        self._map.close()
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    import config
+    from backend.moon_renderer import MoonRenderer
+
+    parser = argparse.ArgumentParser(description="Pre-render the moon image atlas.")
+    parser.add_argument("--output", default=config.MOON_ATLAS_PATH, help="atlas file to write")
+    parser.add_argument("--size", type=int, default=config.MOON_ATLAS_SIZE, help="frame size in pixels")
+    parser.add_argument("--phases", type=int, default=config.MOON_ATLAS_PHASES, help="phase angle steps")
+    parser.add_argument("--rotations", type=int, default=config.MOON_ATLAS_ROTATIONS, help="position angle steps")
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("no --output given and config.MOON_ATLAS_PATH is not set")
+
+    def report(done: int, total: int) -> None:
+        if done % 50 == 0 or done == total:
+            sys.stdout.write(f"\r{done}/{total} frames")
+            sys.stdout.flush()
+
+    started = time.perf_counter()
+    renderer = MoonRenderer(source_path=config.MOON_IMAGE_SOURCE, max_size=max(args.size, 1))
+    frames = build_atlas(renderer, args.output, args.size, args.phases, args.rotations, progress=report)
+    print(f"\nRendered {frames} frames ({os.path.getsize(args.output) / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - started:.1f}s -> {args.output}")
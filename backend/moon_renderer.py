@@ -0,0 +1,291 @@
+# backend/moon_renderer.py
+
+import io
+import math
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from backend.cache import LunarCache
+from backend.moon_atlas import MoonAtlas
+from backend.singleflight import SingleFlight
+
+# Brightness of the night side (earthshine) relative to full sunlight
+EARTHSHINE = 0.06
+# Width of the soft terminator, as the cosine of the sun's incidence angle
+TERMINATOR_SOFTNESS = 0.04
+# Pixels brighter than this (0-255 luminance) belong to the Moon in the source image
+_DISK_THRESHOLD = 25
+
+def _find_disk(luminance: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Locate the Moon's disk in a photograph on a dark background.
+
+    The radius comes from the larger bounding-box side; along an axis where
+    the disk runs off the image, the centre is measured from the side that
+    is still inside it.
+
+    Args:
+        luminance: 2-D array of pixel luminance (0-255)
+
+    Returns:
+        (centre x, centre y, radius) in pixels
+    """
+    rows = np.nonzero((luminance > _DISK_THRESHOLD).any(axis=1))[0]
+    cols = np.nonzero((luminance > _DISK_THRESHOLD).any(axis=0))[0]
+    if rows.size == 0:
+        raise ValueError("No moon disk found in the source image")
+
+    top, bottom = rows[0], rows[-1] + 1
+    left, right = cols[0], cols[-1] + 1
+    radius = max(bottom - top, right - left) / 2
+
+    def centre(low: int, high: int, limit: int) -> float:
+        if high - low >= 2 * radius - 1 or (low > 0 and high < limit):
+            return (low + high) / 2
+        return low + radius if low > 0 else high - radius
+
+    height, width = luminance.shape
+    return centre(left, right, width), centre(top, bottom, height), radius
+
+def _sample_bilinear(texture: np.ndarray, tx: np.ndarray, ty: np.ndarray) -> np.ndarray:
+    """
+    Sample an (H, W, C) texture at fractional pixel coordinates.
+
+    Args:
+        texture: Float texture
+        tx: Column coordinates (pixel centres at integer + 0.5)
+        ty: Row coordinates
+
+    Returns:
+        Array of shape tx.shape + (C,)
+    """
+    height, width = texture.shape[:2]
+    tx = np.clip(tx - 0.5, 0, width - 1)
+    ty = np.clip(ty - 0.5, 0, height - 1)
+    x0 = np.minimum(tx.astype(np.intp), width - 2)
+    y0 = np.minimum(ty.astype(np.intp), height - 2)
+    fx = (tx - x0)[..., np.newaxis]
+    fy = (ty - y0)[..., np.newaxis]
+
+    top = texture[y0, x0] * (1 - fx) + texture[y0, x0 + 1] * fx
+    bottom = texture[y0 + 1, x0] * (1 - fx) + texture[y0 + 1, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+class MoonRenderer:
+    """
+    Render the Moon photograph as it currently appears.
+
+    The photograph in resources/moon.png (a full moon, north up) is treated
+    as an orthographic view of a sphere. Each output pixel is mapped back
+    onto that sphere, so the terminator for any phase angle is the correct
+    ellipse, libration turns the sphere to show past the mean limb, and the
+    position angle rotates the finished disk. All of it is evaluated as
+    array math over the whole image at once.
+
+    Encoded PNGs are cached on parameters rounded to the steps given at
+    construction, so viewers of the same moon share one render. With a
+    pre-rendered MoonAtlas, requests it covers are answered with the
+    nearest atlas frame and never rendered at all.
+    """
+
+    def __init__(self, source_path: str = "resources/moon.png", cache_max_entries: int = 256,
+                 cache_ttl: float = 24 * 3600, angle_step: float = 1.0, libration_step: float = 0.25,
+                 max_size: int = 1024, atlas: Optional[MoonAtlas] = None, atlas_max_libration: float = 3.0):
+        """
+        Load the source image and set up the cache.
+
+        Args:
+            source_path: Photograph of the full moon on a dark background
+            cache_max_entries: Maximum number of encoded images kept in memory
+            cache_ttl: Seconds an encoded image is kept
+            angle_step: Rounding step for the phase and position angles (degrees)
+            libration_step: Rounding step for the libration angles (degrees)
+            max_size: Largest output size in pixels
+            atlas: Optional pre-rendered frames (zero libration) served when they fit
+            atlas_max_libration: Largest libration angle (degrees) the atlas
+                frames stand in for; beyond it images are rendered live
+        """
+        with Image.open(source_path) as image:
+            rgb = np.asarray(image.convert("RGB"), dtype=np.float32)
+        self.texture = rgb
+        self.centre_x, self.centre_y, self.radius = _find_disk(rgb.mean(axis=2))
+
+        self.angle_step = angle_step
+        self.libration_step = libration_step
+        self.max_size = max_size
+        self.cache = LunarCache(max_entries=cache_max_entries, ttl=cache_ttl)
+        self._inflight = SingleFlight()
+
+        self.atlas = atlas
+        self.atlas_max_libration = atlas_max_libration
+        self._atlas_lock = threading.Lock()
+        self._atlas_hits = 0
+
+    def _atlas_covers(self, libration_longitude: float, libration_latitude: float, size: int) -> bool:
+        """Whether the atlas has a frame close enough to stand in for these parameters."""
+        return (self.atlas is not None and size == self.atlas.size
+                and abs(libration_longitude) <= self.atlas_max_libration
+                and abs(libration_latitude) <= self.atlas_max_libration)
+
+    def render(self, elongation: float, position_angle: float = 0.0, libration_longitude: float = 0.0,
+               libration_latitude: float = 0.0, size: int = 400) -> np.ndarray:
+        """
+        Render the Moon for one set of parameters (uncached, unrounded).
+
+        Args:
+            elongation: Moon minus Sun ecliptic longitude in degrees (0 new,
+                90 first quarter, 180 full, 270 last quarter), the phase.angle
+                of the moon data; not the Sun-Moon-Earth phase angle
+            position_angle: Counterclockwise rotation of the disk in degrees
+            libration_longitude: Libration in longitude in degrees (positive
+                shows more of the eastern limb, on the right)
+            libration_latitude: Libration in latitude in degrees (positive
+                shows more of the northern limb)
+            size: Width and height of the output in pixels
+
+        Returns:
+            (size, size, 4) uint8 RGBA array, transparent outside the disk
+        """
+        if not 1 <= size <= self.max_size:
+            raise ValueError(f"size must be between 1 and {self.max_size}")
+
+        # Output pixel centres in disk radii, x to the right and y downwards
+        radius = max(size / 2 - 1, 0.5)
+        coords = (np.arange(size, dtype=np.float32) + 0.5 - size / 2) / radius
+        u = coords[np.newaxis, :]
+        v = coords[:, np.newaxis]
+
+        # Undo the on-screen rotation to get coordinates in the Moon's own frame
+        rotation = math.radians(position_angle)
+        cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+        x = u * cos_r - v * sin_r
+        y = u * sin_r + v * cos_r
+        r2 = x * x + y * y
+        z = np.sqrt(np.clip(1.0 - r2, 0.0, None))
+
+        # Sunlight: from the right while waxing and the left while waning, behind the Moon when new
+        sun = math.radians(elongation)
+        incidence = x * math.sin(sun) - z * math.cos(sun)
+        t = np.clip(incidence / (2 * TERMINATOR_SOFTNESS) + 0.5, 0.0, 1.0)
+        light = EARTHSHINE + (1.0 - EARTHSHINE) * t * t * (3.0 - 2.0 * t)
+
+        # Libration turns the sphere about its vertical and horizontal axes before projecting
+        lon, lat = math.radians(libration_longitude), math.radians(libration_latitude)
+        x_turned = x * math.cos(lon) + z * math.sin(lon)
+        z_turned = z * math.cos(lon) - x * math.sin(lon)
+        y_turned = y * math.cos(lat) - z_turned * math.sin(lat)
+
+        rgb = _sample_bilinear(self.texture, self.centre_x + x_turned * self.radius,
+                               self.centre_y + y_turned * self.radius)
+        rgb *= light[..., np.newaxis]
+
+        # Antialiased edge one pixel wide
+        alpha = np.clip((1.0 - np.sqrt(r2)) * radius + 0.5, 0.0, 1.0) * 255.0
+        rgba = np.empty((size, size, 4), dtype=np.uint8)
+        rgba[..., :3] = np.clip(rgb + 0.5, 0, 255)
+        rgba[..., 3] = alpha + 0.5
+        return rgba
+
+    def quantize(self, elongation: float, position_angle: float = 0.0, libration_longitude: float = 0.0,
+                 libration_latitude: float = 0.0, size: int = 400) -> Tuple[float, float, float, float, int]:
+        """
+        Round parameters to the grid they are rendered (or looked up) on.
+
+        Requests the atlas covers snap to its nearest frame, otherwise the
+        angles are rounded to the cache steps. Parameters with the same
+        result produce the same image.
+
+        Returns:
+            (elongation, position_angle, libration_longitude, libration_latitude, size)
+        """
+        if self._atlas_covers(libration_longitude, libration_latitude, size):
+            phase_index, rotation_index = self.atlas.nearest(elongation, position_angle)
+            return (phase_index * self.atlas.phase_step, rotation_index * self.atlas.rotation_step,
+                    0.0, 0.0, int(size))
+
+        def snap(value: float, step: float) -> float:
+            return round(round(value / step) * step, 6) + 0.0
+
+        return (
+            snap(elongation % 360, self.angle_step) % 360,
+            snap(position_angle % 360, self.angle_step) % 360,
+            snap(libration_longitude, self.libration_step),
+            snap(libration_latitude, self.libration_step),
+            int(size)
+        )
+
+    def png(self, elongation: float, position_angle: float = 0.0, libration_longitude: float = 0.0,
+            libration_latitude: float = 0.0, size: int = 400) -> Union[bytes, memoryview]:
+        """
+        Rendered image as PNG bytes, from the atlas or the cache when possible.
+
+        Parameters are rounded with quantize() first; concurrent requests
+        for the same rounded parameters share a single render.
+
+        Returns:
+            PNG-encoded RGBA image (a zero-copy view for atlas frames)
+        """
+        if self._atlas_covers(libration_longitude, libration_latitude, size):
+            with self._atlas_lock:
+                self._atlas_hits += 1
+            return self.atlas.frame(*self.atlas.nearest(elongation, position_angle))
+
+        key = self.quantize(elongation, position_angle, libration_longitude, libration_latitude, size)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        def render_png() -> bytes:
+            # A render that finished after our lookup may have filled the cache already
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            buffer = io.BytesIO()
+            Image.fromarray(self.render(*key), "RGBA").save(buffer, format="PNG", compress_level=6)
+            encoded = buffer.getvalue()
+            self.cache.set(key, encoded)
+            return encoded
+
+        return self._inflight.do(key, render_png)
+
+    def image(self, lunar_data: Dict[str, Any], size: int = 400) -> Image.Image:
+        """
+        Rendered image for a /lunar-data style dictionary.
+
+        Uses phase.angle (the elongation), and orientation.position_angle and
+        libration.longitude/latitude when present.
+
+        Args:
+            lunar_data: Lunar data dictionary
+            size: Width and height in pixels
+
+        Returns:
+            PIL RGBA image
+        """
+        libration = lunar_data.get("libration", {})
+        params = (
+            lunar_data["phase"]["angle"],
+            lunar_data.get("orientation", {}).get("position_angle", 0.0),
+            libration.get("longitude", 0.0),
+            libration.get("latitude", 0.0),
+            size
+        )
+        if self._atlas_covers(*params[2:]):
+            with self._atlas_lock:
+                self._atlas_hits += 1
+            return self.atlas.image(*self.atlas.nearest(*params[:2]))
+        return Image.fromarray(self.render(*params), "RGBA")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Counters of the encoded image cache, plus atlas usage."""
+        atlas = None
+        if self.atlas is not None:
+            atlas = {
+                "frames": self.atlas.phase_count * self.atlas.rotation_count,
+                "size": self.atlas.size,
+                "hits": self._atlas_hits
+            }
+        return {**self.cache.stats(), "atlas": atlas}
@@ -0,0 +1,208 @@
+# backend/persistent_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+class PersistentCache:
+    """
+    SQLite-backed key/value store with TTL eviction.
+
+    The database runs in WAL mode so any number of processes (uvicorn workers,
+    the GUI, reloads) can read and write the same file concurrently. Values
+    are stored as JSON. Entries are grouped by namespace so several services
+    can share one database file.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace  TEXT NOT NULL,
+            key        TEXT NOT NULL,
+            value      TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_expiry
+            ON cache_entries (namespace, expires_at);
+    """
+
+    def __init__(self, path: str, namespace: str = "default", ttl: float = 3600,
+                 max_entries: int = 100000, compact_every: int = 500):
+        """
+        Initialize the persistent cache.
+
+        Args:
+            path: Path of the SQLite database file (created if missing)
+            namespace: Logical partition of the database used by this cache
+            ttl: Default time-to-live of an entry in seconds
+            max_entries: Maximum number of entries kept in this namespace
+            compact_every: Run compaction after this many writes
+        """
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writes_since_compact = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.executescript(self._SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The decoded value, or None if missing or expired
+        """
+        entry = self.get_with_ttl(key)
+        return None if entry is None else entry[0]
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a key along with its remaining lifetime.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (decoded value, remaining TTL in seconds), or None if
+            missing or expired
+        """
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache_entries "
+            "WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (self.namespace, key, now)
+        ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds (defaults to the cache TTL)
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), expires_at)
+        )
+
+        with self._write_lock:
+            self._writes_since_compact += 1
+            due = self._writes_since_compact >= self.compact_every
+            if due:
+                self._writes_since_compact = 0
+        if due:
+            self.compact()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a key.
+
+        Args:
+            key: Cache key
+        """
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        )
+
+    def compact(self) -> int:
+        """
+        Delete expired entries and trim the namespace to max_entries.
+
+        Entries closest to expiry are dropped first when over the cap.
+
+        Returns:
+            Number of entries removed
+        """
+        conn = self._connection()
+        removed = conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time())
+        ).rowcount
+
+        removed += conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            "  SELECT key FROM cache_entries WHERE namespace = ?"
+            "  ORDER BY expires_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.namespace, self.namespace, self.max_entries)
+        ).rowcount
+
+        # Fold the WAL back into the main file so it doesn't grow unbounded
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return removed
+
+    def items(self, limit: Optional[int] = None) -> Iterator[Tuple[str, Any, float]]:
+        """
+        Iterate over live entries, most recently written first.
+
+        Args:
+            limit: Maximum number of entries to yield
+
+        Yields:
+            Tuples of (key, value, remaining TTL in seconds)
+        """
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT key, value, expires_at FROM cache_entries "
+            "WHERE namespace = ? AND expires_at > ? ORDER BY expires_at DESC LIMIT ?",
+            (self.namespace, now, -1 if limit is None else limit)
+        )
+        for key, value, expires_at in rows:
+            yield key, json.loads(value), expires_at - now
+
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at > ?",
+            (self.namespace, time.time())
+        ).fetchone()
+        return row[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the store.
+
+        Returns:
+            Dictionary with the database path, namespace and live entry count
+        """
+        return {
+            "path": self.path,
+            "namespace": self.namespace,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl
+        }
@@ -0,0 +1,148 @@
+# backend/rise_set.py
+
+from datetime import date as date_type, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.cache import LunarCache
+from utils.rise_set import solve_rise_set
+
+_UNIX_EPOCH_JD = 2440587.5
+
+def _jd_to_iso(jd: float) -> Optional[str]:
+    """Format a UT Julian day as an ISO 8601 UTC timestamp (None for NaN)."""
+    if jd != jd:
+        return None
+    seconds = round((jd - _UNIX_EPOCH_JD) * 86400.0)
+    return (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+def local_solar_date(longitude: float, when: Optional[datetime] = None) -> date_type:
+    """
+    Calendar date at an observer's local mean solar time.
+
+    Args:
+        longitude: Observer longitude in degrees (east positive)
+        when: Moment to convert (defaults to now; naive values are local time)
+
+    Returns:
+        The observer's date
+    """
+    if when is None:
+        when = datetime.now(timezone.utc)
+    elif when.tzinfo is None:
+        when = when.astimezone()
+    return (when.astimezone(timezone.utc) + timedelta(hours=longitude / 15.0)).date()
+
+class RiseSetService:
+    """
+    Moonrise, moonset and transit times with a per-(grid cell, date) cache.
+
+    Observers are snapped to the centre of a grid cell (0.1 degrees by
+    default, which moves event times by well under a minute), so nearby
+    users share cache entries. Cache misses from one call are solved
+    together in a single batched pass of utils.rise_set.solve_rise_set.
+    """
+
+    def __init__(self, grid_size: float = 0.1, cache_max_entries: int = 65536,
+                 cache_ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the service.
+
+        Args:
+            grid_size: Cell size in degrees observers are snapped to
+            cache_max_entries: Maximum number of (cell, date) results kept
+            cache_ttl: Seconds a result stays cached (results never change,
+                so this only bounds memory held for idle cells)
+        """
+        self.grid_size = grid_size
+        self.cache = LunarCache(max_entries=cache_max_entries, ttl=cache_ttl)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Grid cell indices of a location."""
+        return round(latitude / self.grid_size), round(longitude / self.grid_size)
+
+    def get_times(self, latitude: float, longitude: float,
+                  day: Optional[date_type] = None) -> Dict[str, Any]:
+        """
+        Rise, set and transit for one observer on one day.
+
+        Args:
+            latitude: Observer latitude
+            longitude: Observer longitude
+            day: Local (mean solar) date (defaults to the observer's today)
+
+        Returns:
+            Dictionary with date, rise, set and transit (ISO 8601 UTC or
+            None), transit_altitude, always_up and always_down
+        """
+        if day is None:
+            day = local_solar_date(longitude)
+        return self.get_times_batch([(latitude, longitude)], [day])[0][0]
+
+    def get_times_batch(self, locations: Sequence[Tuple[float, float]],
+                        days: Sequence[date_type]) -> List[List[Dict[str, Any]]]:
+        """
+        Rise, set and transit for every combination of locations and days.
+
+        Args:
+            locations: (latitude, longitude) pairs
+            days: Local (mean solar) dates
+
+        Returns:
+            One list per location with one result dictionary per day
+            (see get_times)
+        """
+        cells = [self._cell(latitude, longitude) for latitude, longitude in locations]
+        keys = [[f"{cell[0]}_{cell[1]}_{day.isoformat()}" for day in days] for cell in cells]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, Tuple[Tuple[int, int], date_type]] = {}
+        for cell, cell_keys in zip(cells, keys):
+            for day, key in zip(days, cell_keys):
+                if key in results or key in missing:
+                    continue
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[key] = cached
+                else:
+                    missing[key] = (cell, day)
+
+        if missing:
+            results.update(self._solve(missing))
+
+        return [[results[key] for key in cell_keys] for cell_keys in keys]
+
+    def _solve(self, missing: Dict[str, Tuple[Tuple[int, int], date_type]]) -> Dict[str, Dict[str, Any]]:
+        """Solve and cache uncached (cell, date) pairs in one batch."""
+        pairs = list(missing.values())
+        latitudes = np.array([cell[0] * self.grid_size for cell, _ in pairs])
+        longitudes = np.array([cell[1] * self.grid_size for cell, _ in pairs])
+        days = np.array([day.isoformat() for _, day in pairs], dtype="datetime64[D]")
+
+        solved = solve_rise_set(latitudes, longitudes, days)
+
+        results = {}
+        for index, (key, (_, day)) in enumerate(missing.items()):
+            transit_altitude = float(solved["transit_altitude"][index])
+            result = {
+                "date": day.isoformat(),
+                "rise": _jd_to_iso(float(solved["rise"][index])),
+                "set": _jd_to_iso(float(solved["set"][index])),
+                "transit": _jd_to_iso(float(solved["transit"][index])),
+                "transit_altitude": None if transit_altitude != transit_altitude else transit_altitude,
+                "always_up": bool(solved["always_up"][index]),
+                "always_down": bool(solved["always_down"][index])
+            }
+            self.cache.set(key, result)
+            results[key] = result
+        return results
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics for the rise/set cache.
+
+        Returns:
+            Dictionary with cache size, hit/miss/eviction counters and hit rate
+        """
+        return self.cache.stats()
@@ -0,0 +1,124 @@
+# backend/singleflight.py
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class _Call:
+    """An in-progress call that concurrent callers for the same key wait on."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution (threads).
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block until it finishes and receive the same result or
+    exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers sharing key.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument function performing the work
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            Exception: Whatever fn raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the deduplication counters.
+
+        Returns:
+            Dictionary with the number of calls in flight and calls coalesced
+        """
+        with self._lock:
+            return {"in_flight": len(self._calls), "coalesced": self._coalesced}
+
+class AsyncSingleFlight:
+    """
+    Collapse concurrent awaits for the same key into one execution (asyncio).
+
+    The shared work runs as its own task, so a waiter being cancelled (for
+    example a client disconnecting) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all concurrent callers sharing key.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument coroutine function performing the work
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            Exception: Whatever fn raised, re-raised in every waiting caller
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self._coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the deduplication counters.
+
+        Returns:
+            Dictionary with the number of calls in flight and calls coalesced
+        """
+        return {"in_flight": len(self._tasks), "coalesced": self._coalesced}
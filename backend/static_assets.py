@@ -0,0 +1,172 @@
+# backend/static_assets.py
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend.http_caching import accepts_encoding, brotli, etag_matches
+
+# Only web file types are served; data files (phase tables, the gazetteer
+# dataset) and Python sources in the mounted directories stay private
+_SERVED_SUFFIXES = (".html", ".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico",
+                    ".woff", ".woff2")
+_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Entity tag suffix of each content coding, so every variant has its own strong ETag
+_ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz", None: ""}
+
+# src="..." / href="..." attributes in HTML documents
+_REFERENCE_PATTERN = re.compile(r'((?:src|href)=")([^"]+)(")')
+
+class StaticAsset:
+    """One file held in memory with its precompressed variants."""
+
+    __slots__ = ("url", "hashed_url", "content", "gzip", "brotli", "digest", "media_type")
+
+    def __init__(self, url: str, content: bytes, media_type: str):
+        self.url = url
+        self.content = content
+        self.media_type = media_type
+
+        self.digest = hashlib.sha256(content).hexdigest()[:16]
+        stem, suffix = os.path.splitext(url)
+        self.hashed_url = f"{stem}.{self.digest}{suffix}"
+
+        self.gzip = None
+        self.brotli = None
+        if media_type.startswith(_COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                self.gzip = compressed
+            if brotli is not None:
+                compressed = brotli.compress(content, quality=11)
+                if len(compressed) < len(content):
+                    self.brotli = compressed
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """Strong entity tag of the asset in one content coding (None for identity)."""
+        return f'"{self.digest}{_ETAG_SUFFIXES[encoding]}"'
+
+class StaticAssets:
+    """
+    In-memory static file server with content-hashed URLs.
+
+    Every web file (by extension) under the mounted directories is read and
+    compressed once at startup. Each asset is reachable at its plain URL (revalidated through
+    its ETag) and at a content-hashed URL ("/utils/script.<hash>.js") that
+    browsers may cache forever, since any change to the file changes the
+    URL. HTML pages have their references rewritten to the hashed URLs.
+    """
+
+    def __init__(self, mounts: Dict[str, str], max_file_size: int = 4 * 1024 * 1024):
+        """
+        Load the mounted directories.
+
+        Args:
+            mounts: URL prefix ("/static") to directory ("resources")
+            max_file_size: Larger files are skipped, as are files whose
+                extension is not in _SERVED_SUFFIXES
+        """
+        self._assets: Dict[str, StaticAsset] = {}
+        self._hashed: Dict[str, StaticAsset] = {}
+
+        for prefix, directory in mounts.items():
+            for root, dirs, files in os.walk(directory):
+                dirs[:] = [name for name in dirs if name != "__pycache__"]
+                for name in files:
+                    path = os.path.join(root, name)
+                    if not name.lower().endswith(_SERVED_SUFFIXES) or os.path.getsize(path) > max_file_size:
+                        continue
+                    relative = os.path.relpath(path, directory).replace(os.sep, "/")
+                    with open(path, "rb") as f:
+                        self.add(f"{prefix}/{relative}", f.read())
+
+    def add(self, url: str, content: bytes, media_type: Optional[str] = None) -> StaticAsset:
+        """
+        Register content under a URL (and its hashed URL).
+
+        Args:
+            url: Plain URL path
+            content: Response body
+            media_type: Content type (guessed from the URL when omitted)
+
+        Returns:
+            The new StaticAsset
+        """
+        if media_type is None:
+            media_type = mimetypes.guess_type(url)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+
+        asset = StaticAsset(url, content, media_type)
+        self._assets[url] = asset
+        self._hashed[asset.hashed_url] = asset
+        return asset
+
+    def url_for(self, url: str) -> str:
+        """Content-hashed URL of an asset (the URL itself if it is unknown)."""
+        asset = self._assets.get(url)
+        return asset.hashed_url if asset is not None else url
+
+    def add_page(self, url: str, path: str) -> StaticAsset:
+        """
+        Register an HTML page with its asset references pointing at hashed URLs.
+
+        Args:
+            url: URL path the page is served at
+            path: HTML file to load
+
+        Returns:
+            The new StaticAsset
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        html = _REFERENCE_PATTERN.sub(lambda m: m.group(1) + self.url_for(m.group(2)) + m.group(3), html)
+        return self.add(url, html.encode("utf-8"), "text/html")
+
+    def get(self, url: str) -> Optional[StaticAsset]:
+        """Look up an asset by plain or hashed URL."""
+        return self._assets.get(url) or self._hashed.get(url)
+
+    def response(self, request: Request, asset: StaticAsset) -> Response:
+        """
+        Serve an asset, honouring If-None-Match and Accept-Encoding.
+
+        Args:
+            request: Incoming request
+            asset: Asset to serve
+
+        Returns:
+            200 response with the best encoding the client accepts, or 304
+        """
+        accept_encoding = request.headers.get("accept-encoding", "")
+        encoding, body = None, asset.content
+        if asset.brotli is not None and accepts_encoding(accept_encoding, "br"):
+            encoding, body = "br", asset.brotli
+        elif asset.gzip is not None and accepts_encoding(accept_encoding, "gzip"):
+            encoding, body = "gzip", asset.gzip
+
+        immutable = request.url.path == asset.hashed_url
+        headers = {
+            "ETag": asset.etag(encoding),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding"
+        }
+
+        # A cached copy in any coding decodes to the same content, so it is still current
+        if_none_match = request.headers.get("if-none-match", "")
+        if any(etag_matches(if_none_match, asset.etag(variant)) for variant in _ETAG_SUFFIXES):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=asset.media_type, headers=headers)
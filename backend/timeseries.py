@@ -0,0 +1,91 @@
+# backend/timeseries.py
+
+import re
+from datetime import datetime, timezone
+from typing import Iterator
+
+import numpy as np
+
+from utils.ephemeris_batch import moon_positions_batch
+
+_STEP_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_STEP_PATTERN = re.compile(r"^\s*(\d+)\s*([smhd]?)\s*$")
+
+def parse_step(step: str) -> int:
+    """
+    Parse a sampling interval such as "90s", "15m", "1h" or "1d".
+
+    Args:
+        step: Integer followed by an optional unit (seconds when omitted)
+
+    Returns:
+        Interval in seconds
+
+    Raises:
+        ValueError: If the interval is malformed or not positive
+    """
+    match = _STEP_PATTERN.match(step.lower())
+    if match is None or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid step {step!r}; use e.g. 60s, 15m, 1h or 1d")
+    return int(match.group(1)) * _STEP_UNITS[match.group(2) or "s"]
+
+def _to_datetime64(moment: datetime) -> np.datetime64:
+    """Convert a datetime (naive values are taken as UTC) to datetime64 seconds."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(moment.replace(microsecond=0), "s")
+
+def count_samples(start: datetime, end: datetime, step_seconds: int) -> int:
+    """Number of samples in [start, end] at the given interval."""
+    span = int((_to_datetime64(end) - _to_datetime64(start)) / np.timedelta64(1, "s"))
+    return span // step_seconds + 1 if span >= 0 else 0
+
+def iter_timeseries(latitude: float, longitude: float, start: datetime, end: datetime,
+                    step_seconds: int, chunk_size: int = 4096) -> Iterator[bytes]:
+    """
+    Lunar state for one observer over a time range as newline-delimited JSON.
+
+    The range is evaluated chunk_size samples at a time with the vectorized
+    ephemeris, and each chunk is serialized before the next is computed, so
+    memory use depends on the chunk size rather than the length of the range.
+
+    Args:
+        latitude: Observer latitude
+        longitude: Observer longitude
+        start: First sample time (naive values are taken as UTC)
+        end: Last possible sample time, inclusive
+        step_seconds: Sampling interval in seconds
+        chunk_size: Samples computed and yielded together
+
+    Yields:
+        One bytes object per chunk holding one JSON line per sample with
+        time, altitude, azimuth, right_ascension (hours), declination,
+        distance_km, illumination (percent), phase_angle and elongation
+    """
+    first = _to_datetime64(start)
+    total = count_samples(start, end, step_seconds)
+    step = np.timedelta64(step_seconds, "s")
+
+    for offset in range(0, total, chunk_size):
+        times = first + np.arange(offset, min(total, offset + chunk_size)) * step
+        state = moon_positions_batch(times, latitude, longitude)
+
+        rows = zip(
+            np.datetime_as_string(times, unit="s").tolist(),
+            state["altitude"].tolist(),
+            state["azimuth"].tolist(),
+            (state["right_ascension"] / 15.0).tolist(),
+            state["declination"].tolist(),
+            state["distance_km"].tolist(),
+            (state["illumination"] * 100.0).tolist(),
+            state["phase_angle"].tolist(),
+            state["elongation"].tolist()
+        )
+        yield "".join(
+            f'{{"time":"{time}Z","altitude":{altitude:.4f},"azimuth":{azimuth:.4f},'
+            f'"right_ascension":{right_ascension:.5f},"declination":{declination:.4f},'
+            f'"distance_km":{distance:.1f},"illumination":{illumination:.2f},'
+            f'"phase_angle":{phase_angle:.4f},"elongation":{elongation:.4f}}}\n'
+            for (time, altitude, azimuth, right_ascension, declination, distance, illumination,
+                 phase_angle, elongation) in rows
+        ).encode("utf-8")
@@ -13,8 +13,85 @@ DEFAULT_LONGITUDE = -118.2437
 TERMINAL_WIDTH = 80  # Characters wide for terminal output formatting
 ENABLE_COLOR_OUTPUT = True  # Enable ANSI color codes in terminal output
 
+# Lunar data provider: "api" (Astronomy API) or "local" (built-in ephemeris, no network)
+LUNAR_DATA_PROVIDER = "api"
+
 # API endpoints
 ASTRONOMY_API_BASE_URL = "https://api.astronomyapi.com/api/v2/"
+GEOCODER_DOMAIN = "nominatim.openstreetmap.org"  # Nominatim host (and optional port)
+GEOCODER_SCHEME = "https"  # "http" when pointing at a local stand-in such as tests/standin_server.py
+
+# HTTP client settings for the Astronomy API
+HTTP_POOL_SIZE = 10  # Keep-alive connections held open to the API
+HTTP_ASYNC_POOL_SIZE = 100  # Keep-alive connections for the async web server client
+HTTP_CONNECT_TIMEOUT = 3.05  # Seconds to establish a connection
+HTTP_READ_TIMEOUT = 10.0  # Seconds to wait for a response
+HTTP_MAX_RETRIES = 3  # Retries on connection errors, 429 and 5xx responses
+HTTP_BACKOFF_BASE = 0.5  # Base delay for jittered exponential backoff (seconds)
+HTTP_BACKOFF_MAX = 10.0  # Longest single backoff or Retry-After honoured (seconds)
 
 # Application settings
-CACHE_DURATION = 3600  # Cache lunar data for 1 hour (in seconds)
\ No newline at end of file
+CACHE_DURATION = 3600  # Cache lunar data for 1 hour (in seconds)
+CACHE_MAX_ENTRIES = 4096  # Maximum number of lunar data results kept in memory
+
+# Optional on-disk cache shared by all server workers and the GUI (None disables it)
+PERSISTENT_CACHE_PATH = None  # e.g. "cache/lunar_cache.sqlite3"
+PERSISTENT_CACHE_MAX_ENTRIES = 100000  # Maximum number of results kept on disk
+
+# Geocoding cache (Nominatim's usage policy asks clients to cache results)
+GEOCODE_CACHE_PATH = "cache/geocode_cache.sqlite3"  # None keeps the cache in memory only
+GEOCODE_CACHE_TTL = 30 * 24 * 3600  # Keep resolved locations for 30 days (in seconds)
+GEOCODE_NEGATIVE_TTL = 24 * 3600  # Keep "location not found" results for 1 day (in seconds)
+GEOCODE_CACHE_MAX_ENTRIES = 10000  # Maximum number of geocoding results kept
+
+# Geocoder request pacing (Nominatim's usage policy allows at most 1 request per second)
+GEOCODE_RATE_LIMIT = 1.0  # Geocoder calls per second across the whole process
+GEOCODE_BURST = 1  # Calls allowed back-to-back after an idle period
+GEOCODE_DEADLINE = 5.0  # Seconds a web request may wait for the geocoder before failing fast
+
+# Offline gazetteer consulted before Nominatim (None disables it)
+GAZETTEER_SOURCE_PATH = "resources/gazetteer/cities.csv"  # Bundled city dataset
+GAZETTEER_INDEX_PATH = "cache/gazetteer.idx"  # Prefix index built from the dataset on first start
+GAZETTEER_SUGGEST_LIMIT = 8  # Maximum number of autocomplete suggestions returned
+
+# Moonrise / moonset / transit solver
+RISE_SET_GRID_SIZE = 0.1  # Degrees; observers in the same cell share cached results
+RISE_SET_CACHE_MAX_ENTRIES = 65536  # Maximum number of (cell, date) results kept in memory
+RISE_SET_MAX_DAYS = 366  # Longest range accepted by /lunar-data/rise-set
+
+# POST /lunar-data/batch
+BATCH_MAX_ITEMS = 100  # Maximum number of locations in one batch request
+BATCH_CONCURRENCY = 20  # Locations geocoded or fetched at the same time per batch
+
+# GET /lunar-data/timeseries
+TIMESERIES_CHUNK_SIZE = 4096  # Samples computed and streamed together
+TIMESERIES_MAX_POINTS = 10_000_000  # Longest series accepted (a decade at one-minute steps is ~5.3M)
+
+# GET /lunar-data/live (Server-Sent Events)
+LIVE_FEED_INTERVAL = 5.0  # Seconds between position updates
+LIVE_FEED_GRID_SIZE = 0.01  # Degrees; subscribers in the same cell share one computation
+LIVE_FEED_MAX_SUBSCRIBERS = 10000  # Maximum number of concurrent live connections
+
+# GET /moon-image.png
+MOON_IMAGE_SOURCE = "resources/moon.png"  # Full-moon photograph the images are rendered from
+MOON_IMAGE_DEFAULT_SIZE = 300  # Width and height in pixels when the request gives none
+MOON_IMAGE_MAX_SIZE = 1024  # Largest image rendered on request
+MOON_IMAGE_ANGLE_STEP = 1.0  # Degrees; phase and position angles are rounded to this before rendering
+MOON_IMAGE_LIBRATION_STEP = 0.25  # Degrees; libration angles are rounded to this before rendering
+MOON_IMAGE_CACHE_MAX_ENTRIES = 512  # Encoded images kept in memory
+
+# Pre-rendered moon images, built offline with `python -m backend.moon_atlas` (None disables)
+MOON_ATLAS_PATH = "cache/moon_atlas.bin"  # Served from a memory map when present, rendered live otherwise
+MOON_ATLAS_SIZE = MOON_IMAGE_DEFAULT_SIZE  # Frame size; requests at other sizes are rendered live
+MOON_ATLAS_PHASES = 72  # Phase angle steps (5 degrees apart)
+MOON_ATLAS_ROTATIONS = 24  # Position angle steps (15 degrees apart); ~200 MB at 300 px
+MOON_ATLAS_MAX_LIBRATION = 3.0  # Degrees; larger librations are rendered live (atlas frames have none)
+
+# HTTP caching and compression
+LUNAR_DATA_MAX_AGE = 60  # Seconds browsers may reuse a /lunar-data response (also its ETag time bucket)
+COMPRESSION_MINIMUM_SIZE = 500  # Smallest response body (in bytes) worth compressing
+STATIC_PRELOAD = True  # Serve /static and /utils from memory with hashed URLs (False reads from disk)
+
+# Logging
+LOG_LEVEL = "INFO"  # Minimum level logged by the backend
+LOG_JSON = False  # One JSON object per line (for log shippers) instead of key=value text
@@ -6,12 +6,21 @@ from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
 import os
 import threading
+from datetime import datetime
 from typing import Dict, Any, Optional
 
 # Import backend modules
 from backend.location_service import LocationService
 from backend.lunar_data import LunarDataService
+from backend.local_ephemeris import LocalEphemerisService
+from backend.gazetteer import Gazetteer
+from backend.geocode_cache import GeocodeCache
+from backend.geocode_scheduler import GeocodeScheduler
+from backend.persistent_cache import PersistentCache
 from backend.data_processor import LunarDataProcessor
+from backend.moon_atlas import MoonAtlas
+from backend.moon_renderer import MoonRenderer
+from utils.lunar_math import LunarMath, julian_day
 import config
 
 class LunarObserverGUI:
@@ -27,16 +36,64 @@ class LunarObserverGUI:
         self.root.configure(bg='#0f0f23')
         
         # Initialize services
-        self.location_service = LocationService()
-        self.lunar_service = LunarDataService(
-            app_id=config.ASTRONOMY_APP_ID,
-            app_secret=config.ASTRONOMY_APP_SECRET,
-            base_url=config.ASTRONOMY_API_BASE_URL
-        )
+        geocode_store = None
+        if config.GEOCODE_CACHE_PATH:
+            geocode_store = PersistentCache(
+                config.GEOCODE_CACHE_PATH,
+                namespace="geocode",
+                ttl=config.GEOCODE_CACHE_TTL,
+                max_entries=config.GEOCODE_CACHE_MAX_ENTRIES
+            )
+        gazetteer = None
+        if config.GAZETTEER_INDEX_PATH:
+            gazetteer = Gazetteer.open(config.GAZETTEER_INDEX_PATH, config.GAZETTEER_SOURCE_PATH)
+        self.location_service = LocationService(cache=GeocodeCache(
+            persistent_cache=geocode_store,
+            ttl=config.GEOCODE_CACHE_TTL,
+            negative_ttl=config.GEOCODE_NEGATIVE_TTL,
+            max_entries=config.GEOCODE_CACHE_MAX_ENTRIES
+        ), gazetteer=gazetteer, scheduler=GeocodeScheduler(
+            rate=config.GEOCODE_RATE_LIMIT,
+            burst=config.GEOCODE_BURST
+        ), domain=config.GEOCODER_DOMAIN, scheme=config.GEOCODER_SCHEME)
+        if config.LUNAR_DATA_PROVIDER == "local":
+            # Compute lunar data locally instead of calling the Astronomy API
+            self.lunar_service = LocalEphemerisService()
+        else:
+            persistent_cache = None
+            if config.PERSISTENT_CACHE_PATH:
+                persistent_cache = PersistentCache(
+                    config.PERSISTENT_CACHE_PATH,
+                    namespace="lunar_data",
+                    ttl=config.CACHE_DURATION,
+                    max_entries=config.PERSISTENT_CACHE_MAX_ENTRIES
+                )
+            self.lunar_service = LunarDataService(
+                app_id=config.ASTRONOMY_APP_ID,
+                app_secret=config.ASTRONOMY_APP_SECRET,
+                base_url=config.ASTRONOMY_API_BASE_URL,
+                cache_duration=config.CACHE_DURATION,
+                cache_max_entries=config.CACHE_MAX_ENTRIES,
+                persistent_cache=persistent_cache,
+                pool_size=config.HTTP_POOL_SIZE,
+                connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+                read_timeout=config.HTTP_READ_TIMEOUT,
+                max_retries=config.HTTP_MAX_RETRIES,
+                backoff_base=config.HTTP_BACKOFF_BASE,
+                backoff_max=config.HTTP_BACKOFF_MAX
+            )
         self.data_processor = LunarDataProcessor(
             terminal_width=80,
             enable_color=False
         )
+        try:
+            self.moon_renderer = MoonRenderer(
+                source_path=config.MOON_IMAGE_SOURCE,
+                atlas=MoonAtlas.open(config.MOON_ATLAS_PATH) if config.MOON_ATLAS_PATH else None,
+                atlas_max_libration=config.MOON_ATLAS_MAX_LIBRATION
+            )
+        except (OSError, ValueError):
+            self.moon_renderer = None  # Without the photograph only the placeholder can be shown
         
         # Variables
         self.current_lunar_data = None
@@ -425,32 +482,38 @@ class LunarObserverGUI:
             self.show_error(f"Error updating display: {str(e)}")
     
     def render_custom_moon_image(self):
-        """Call render.py to create a custom moon image and display it."""
+        """Render the moon for the current phase, orientation and libration and display it."""
         try:
-            if not self.current_lunar_data:
+            if not self.current_lunar_data or self.moon_renderer is None:
                 return
             
-            # Import and call render.py
-            import render
+            lunar_data = self.current_lunar_data
+            location_data = self.current_location_data
+            position = lunar_data["position"]
+            
+            # Same derived values the web server adds to /lunar-data
+            libration = LunarMath.calculate_libration(
+                julian_day(datetime.now()),
+                location_data["longitude"],
+                location_data["latitude"]
+            )
+            position_angle = LunarMath.calculate_orientation(
+                location_data["latitude"],
+                position["azimuth"],
+                position["altitude"]
+            )
             
-            # Call the render function with lunar data
-            rendered_image_path = render.render_moon(self.current_lunar_data)
+            pil_image = self.moon_renderer.image({
+                **lunar_data,
+                "libration": libration,
+                "orientation": {"position_angle": position_angle}
+            }, size=config.MOON_IMAGE_DEFAULT_SIZE)
             
-            if rendered_image_path and os.path.exists(rendered_image_path):
-                # Load the rendered image
-                pil_image = Image.open(rendered_image_path)
-                pil_image.thumbnail((400, 400), Image.Resampling.LANCZOS)
-                
-                # Update the display
-                self.moon_image = ImageTk.PhotoImage(pil_image)
-                self.moon_image_label.configure(image=self.moon_image)
-                self.status_var.set("Custom moon image rendered and displayed")
-            else:
-                self.status_var.set("Custom rendering failed - using default image")
+            # Update the display
+            self.moon_image = ImageTk.PhotoImage(pil_image)
+            self.moon_image_label.configure(image=self.moon_image)
+            self.status_var.set("Moon image rendered for the current phase")
                 
-        except ImportError:
-            # render.py doesn't exist yet
-            self.status_var.set("render.py not found - using default moon image")
         except Exception as e:
             self.status_var.set(f"Rendering error: {str(e)} - using default image")
     
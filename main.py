@@ -1,93 +1,561 @@
 # main.py - FastAPI Web Server Entry Point
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, model_validator
 import uvicorn
+import asyncio
+import hashlib
+import logging
 import os
-from datetime import datetime
-from typing import Dict, Any
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Union
 
 # Import backend modules
-from backend.location_service import LocationService
-from backend.lunar_data import LunarDataService
+from backend.async_location_service import AsyncLocationService
+from backend.async_lunar_data import AsyncLunarDataService
+from backend.gazetteer import Gazetteer
+from backend.geocode_cache import GeocodeCache
+from backend.geocode_scheduler import AsyncGeocodeScheduler, GeocodeDeadlineError
+from backend.http_caching import CompressionMiddleware, etag_matches
+from backend.live_feed import LiveFeedFullError, LiveFeedHub
+from backend.local_ephemeris import AsyncLocalEphemerisService
+from backend.metrics import REGISTRY, STAGE_SECONDS, MetricsMiddleware
+from backend.moon_atlas import MoonAtlas
+from backend.moon_renderer import MoonRenderer
+from backend.persistent_cache import PersistentCache
+from backend.rise_set import RiseSetService, local_solar_date
+from backend.static_assets import StaticAssets
+from backend.structured_logging import configure_logging
+from backend.timeseries import count_samples, iter_timeseries, parse_step
 from utils.lunar_math import LunarMath, julian_day, get_next_phase_info
 import config
 
-app = FastAPI(title="Lunar Phase Calculator", version="1.0.0")
+configure_logging(config.LOG_LEVEL, json_format=config.LOG_JSON)
+logger = logging.getLogger(__name__)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="resources"), name="static")
-app.mount("/utils", StaticFiles(directory="utils"), name="utils")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close pooled upstream connections when the server shuts down."""
+    yield
+    await live_feed.close()
+    await lunar_service.close()
+    await location_service.close()
+
+app = FastAPI(title="Lunar Phase Calculator", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(CompressionMiddleware, minimum_size=config.COMPRESSION_MINIMUM_SIZE)
+# Added last so it is outermost and times compression too
+app.add_middleware(MetricsMiddleware)
+
+async def serve_static_asset(request: Request, path: str):
+    """Serve a preloaded static file by its plain or content-hashed URL."""
+    asset = static_assets.get(request.url.path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return static_assets.response(request, asset)
+
+# Serve static files from memory, or straight from disk while developing
+static_assets = None
+index_page = None
+if config.STATIC_PRELOAD:
+    static_assets = StaticAssets({"/static": "resources", "/utils": "utils"})
+    index_page = static_assets.add_page("/", "utils/index.html")
+    for prefix in ("/static", "/utils"):
+        app.add_api_route(f"{prefix}/{{path:path}}", serve_static_asset, methods=["GET", "HEAD"],
+                          include_in_schema=False)
+else:
+    app.mount("/static", StaticFiles(directory="resources"), name="static")
+    app.mount("/utils", StaticFiles(directory="utils"), name="utils")
 
 # Initialize services
-location_service = LocationService()
-lunar_service = LunarDataService(
-    app_id=config.ASTRONOMY_APP_ID,
-    app_secret=config.ASTRONOMY_APP_SECRET,
-    base_url=config.ASTRONOMY_API_BASE_URL
+geocode_store = None
+if config.GEOCODE_CACHE_PATH:
+    geocode_store = PersistentCache(
+        config.GEOCODE_CACHE_PATH,
+        namespace="geocode",
+        ttl=config.GEOCODE_CACHE_TTL,
+        max_entries=config.GEOCODE_CACHE_MAX_ENTRIES
+    )
+geocode_cache = GeocodeCache(
+    persistent_cache=geocode_store,
+    ttl=config.GEOCODE_CACHE_TTL,
+    negative_ttl=config.GEOCODE_NEGATIVE_TTL,
+    max_entries=config.GEOCODE_CACHE_MAX_ENTRIES
+)
+gazetteer = None
+if config.GAZETTEER_INDEX_PATH:
+    gazetteer = Gazetteer.open(config.GAZETTEER_INDEX_PATH, config.GAZETTEER_SOURCE_PATH)
+    if gazetteer is None:
+        logger.warning("No gazetteer index, resolving every location with the geocoder",
+                       extra={"path": config.GAZETTEER_INDEX_PATH})
+location_service = AsyncLocationService(
+    cache=geocode_cache,
+    gazetteer=gazetteer,
+    scheduler=AsyncGeocodeScheduler(rate=config.GEOCODE_RATE_LIMIT, burst=config.GEOCODE_BURST),
+    domain=config.GEOCODER_DOMAIN,
+    scheme=config.GEOCODER_SCHEME
+)
+if config.LUNAR_DATA_PROVIDER == "local":
+    # Compute lunar data locally instead of calling the Astronomy API
+    lunar_service = AsyncLocalEphemerisService()
+else:
+    persistent_cache = None
+    if config.PERSISTENT_CACHE_PATH:
+        persistent_cache = PersistentCache(
+            config.PERSISTENT_CACHE_PATH,
+            namespace="lunar_data",
+            ttl=config.CACHE_DURATION,
+            max_entries=config.PERSISTENT_CACHE_MAX_ENTRIES
+        )
+    lunar_service = AsyncLunarDataService(
+        app_id=config.ASTRONOMY_APP_ID,
+        app_secret=config.ASTRONOMY_APP_SECRET,
+        base_url=config.ASTRONOMY_API_BASE_URL,
+        cache_duration=config.CACHE_DURATION,
+        cache_max_entries=config.CACHE_MAX_ENTRIES,
+        persistent_cache=persistent_cache,
+        pool_size=config.HTTP_ASYNC_POOL_SIZE,
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+        read_timeout=config.HTTP_READ_TIMEOUT,
+        max_retries=config.HTTP_MAX_RETRIES,
+        backoff_base=config.HTTP_BACKOFF_BASE,
+        backoff_max=config.HTTP_BACKOFF_MAX
+    )
+
+rise_set_service = RiseSetService(
+    grid_size=config.RISE_SET_GRID_SIZE,
+    cache_max_entries=config.RISE_SET_CACHE_MAX_ENTRIES
+)
+live_feed = LiveFeedHub(
+    interval=config.LIVE_FEED_INTERVAL,
+    grid_size=config.LIVE_FEED_GRID_SIZE,
+    max_subscribers=config.LIVE_FEED_MAX_SUBSCRIBERS
+)
+moon_atlas = None
+if config.MOON_ATLAS_PATH:
+    moon_atlas = MoonAtlas.open(config.MOON_ATLAS_PATH)
+    if moon_atlas is None:
+        logger.info("No moon atlas, rendering moon images on demand", extra={"path": config.MOON_ATLAS_PATH})
+moon_renderer = MoonRenderer(
+    source_path=config.MOON_IMAGE_SOURCE,
+    cache_max_entries=config.MOON_IMAGE_CACHE_MAX_ENTRIES,
+    angle_step=config.MOON_IMAGE_ANGLE_STEP,
+    libration_step=config.MOON_IMAGE_LIBRATION_STEP,
+    max_size=config.MOON_IMAGE_MAX_SIZE,
+    atlas=moon_atlas,
+    atlas_max_libration=config.MOON_ATLAS_MAX_LIBRATION
 )
 
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
+async def read_root(request: Request):
     """Serve the main HTML page."""
+    if index_page is not None:
+        return static_assets.response(request, index_page)
     with open("utils/index.html", "r", encoding="utf-8") as f:
         return HTMLResponse(content=f.read())
 
-@app.get("/lunar-data")
-async def get_lunar_data(location: str = "Los Angeles, CA"):
-    """API endpoint to get comprehensive lunar data."""
-    try:
-        # Get coordinates for the location
-        location_data = location_service.get_coordinates(location)
+def _client_id(request: Request) -> Optional[str]:
+    """Identity used to share the geocoder fairly between clients."""
+    return request.client.host if request.client else None
+
+async def build_lunar_response(location_data: Dict[str, Any], current_time: datetime) -> Dict[str, Any]:
+    """
+    Fetch lunar data for a resolved location and add the derived values.
+    
+    Args:
+        location_data: Dictionary with latitude, longitude, and address
+        current_time: Moment the libration, phase and rise/set values refer to
         
-        # Get lunar data from astronomy API
-        lunar_data = lunar_service.get_moon_data(
+    Returns:
+        Response dictionary served by /lunar-data
+    """
+    # Get lunar data from astronomy API
+    with STAGE_SECONDS.labels(stage="lunar_data").time():
+        lunar_data = await lunar_service.get_moon_data(
             latitude=location_data["latitude"],
             longitude=location_data["longitude"]
         )
-        
-        # Calculate additional data
-        current_time = datetime.now()
-        jd = julian_day(current_time)
-        
-        # Calculate libration
+    
+    # Calculate additional data
+    jd = julian_day(current_time)
+    
+    # Calculate libration
+    with STAGE_SECONDS.labels(stage="libration").time():
         libration = LunarMath.calculate_libration(
             jd, 
             location_data["longitude"], 
             location_data["latitude"]
         )
-        
-        # Calculate orientation effects
+    
+    # Calculate orientation effects
+    with STAGE_SECONDS.labels(stage="orientation").time():
         orientation_angle = LunarMath.calculate_orientation(
             location_data["latitude"],
             lunar_data["position"]["azimuth"],
             lunar_data["position"]["altitude"]
         )
+    
+    # Get next phase information
+    with STAGE_SECONDS.labels(stage="next_phase").time():
+        next_phase = get_next_phase_info(lunar_data["phase"]["angle"], current_time)
+    
+    # Moonrise, moonset and transit for the observer's current day (a cache miss
+    # solves a whole day of positions, so keep it off the event loop)
+    with STAGE_SECONDS.labels(stage="rise_set").time():
+        rise_set = await run_in_threadpool(
+            rise_set_service.get_times,
+            location_data["latitude"],
+            location_data["longitude"],
+            local_solar_date(location_data["longitude"], current_time)
+        )
+    
+    # Compile comprehensive response
+    return {
+        **lunar_data,  # Include all original lunar data
+        "libration": libration,
+        "orientation": {
+            "position_angle": orientation_angle,
+        },
+        "next_phase": next_phase,
+        "rise_set": rise_set,
+        "observer": {
+            **lunar_data["observer"],
+            "location": location_data["address"]
+        },
+        "timestamp": current_time.isoformat(),
+        "julian_day": jd
+    }
+
+def lunar_data_etag(location_data: Dict[str, Any], bucket: int, state_version: str) -> str:
+    """
+    Weak ETag for a location's lunar data within one LUNAR_DATA_MAX_AGE time bucket.
+    
+    state_version (see get_state_version on the lunar services) names the
+    cached lunar state the response is built from, so the tag changes when
+    that state is refetched or replaced, not only when the bucket rolls over.
+    """
+    key = (f"{location_data['latitude']:.6f},{location_data['longitude']:.6f},"
+           f"{location_data['address']},{bucket},{state_version}")
+    return 'W/"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+@app.get("/lunar-data")
+async def get_lunar_data(request: Request, location: str = "Los Angeles, CA"):
+    """API endpoint to get comprehensive lunar data."""
+    try:
+        # Get coordinates for the location
+        with STAGE_SECONDS.labels(stage="geocode").time():
+            location_data = await location_service.get_coordinates(
+                location,
+                timeout=config.GEOCODE_DEADLINE,
+                client=_client_id(request)
+            )
+        
+        # Responses within one time bucket are interchangeable, so clients revalidate per bucket
+        current_time = datetime.now()
+        bucket, elapsed = divmod(time.time(), config.LUNAR_DATA_MAX_AGE)
+        cache_control = f"public, max-age={max(1, int(config.LUNAR_DATA_MAX_AGE - elapsed))}"
         
-        # Get next phase information
-        next_phase = get_next_phase_info(lunar_data["phase"]["angle"])
+        # A 304 is only possible while the lunar state is already in memory
+        state_version = lunar_service.get_state_version(current_time)
+        if state_version is not None:
+            etag = lunar_data_etag(location_data, int(bucket), state_version)
+            if etag_matches(request.headers.get("if-none-match", ""), etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
         
-        # Compile comprehensive response
-        response_data = {
-            **lunar_data,  # Include all original lunar data
-            "libration": libration,
-            "orientation": {
-                "position_angle": orientation_angle,
-            },
-            "next_phase": next_phase,
-            "observer": {
-                **lunar_data["observer"],
-                "location": location_data["address"]
-            },
-            "timestamp": current_time.isoformat(),
-            "julian_day": jd
-        }
+        response_data = await build_lunar_response(location_data, current_time)
         
-        return JSONResponse(content=response_data)
+        # Tag the state the response was actually built from
+        state_version = lunar_service.get_state_version(current_time) or state_version
+        headers = {"Cache-Control": cache_control}
+        if state_version is not None:
+            headers["ETag"] = lunar_data_etag(location_data, int(bucket), state_version)
+        with STAGE_SECONDS.labels(stage="serialization").time():
+            return JSONResponse(content=response_data, headers=headers)
         
+    except GeocodeDeadlineError as e:
+        # The geocoder queue is backed up; tell the client to retry later
+        logger.warning("Geocoder queue over deadline", extra={"location": location})
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.warning("Lunar data request failed", extra={"location": location, "error": str(e)})
+        raise HTTPException(status_code=400, detail=str(e))
+
+class BatchLocation(BaseModel):
+    """One entry of a batch request: a place name, or coordinates with an optional label."""
+    
+    location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    name: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def check_target(self) -> "BatchLocation":
+        if self.location is None and (self.latitude is None or self.longitude is None):
+            raise ValueError("each item needs a location or both latitude and longitude")
+        return self
+
+class BatchRequest(BaseModel):
+    """Body of POST /lunar-data/batch; items may also be plain location names."""
+    
+    items: List[Union[str, BatchLocation]] = Field(..., min_length=1, max_length=config.BATCH_MAX_ITEMS)
+
+@app.post("/lunar-data/batch")
+async def get_lunar_data_batch(request: Request, batch: BatchRequest):
+    """API endpoint returning lunar data for many locations in one round trip."""
+    current_time = datetime.now()
+    client = _client_id(request)
+    semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+    
+    async def resolve(item: Union[str, BatchLocation]) -> Dict[str, Any]:
+        if isinstance(item, str):
+            item = BatchLocation(location=item)
+        if item.location is None:
+            return {
+                "latitude": item.latitude,
+                "longitude": item.longitude,
+                "address": item.name or f"{item.latitude:.4f}, {item.longitude:.4f}"
+            }
+        async with semaphore:
+            return await location_service.get_coordinates(item.location, timeout=config.GEOCODE_DEADLINE,
+                                                          client=client)
+    
+    async def fetch(location_data: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await build_lunar_response(location_data, current_time)
+    
+    # Resolve every location concurrently (the geocoder queue paces any misses)
+    resolved = await asyncio.gather(*(resolve(item) for item in batch.items), return_exceptions=True)
+    
+    # Solve rise/set for all resolved locations in one batch, then fetch concurrently
+    locations = [location for location in resolved if not isinstance(location, Exception)]
+    if locations:
+        days = sorted({local_solar_date(location["longitude"], current_time) for location in locations})
+        await run_in_threadpool(
+            rise_set_service.get_times_batch,
+            [(location["latitude"], location["longitude"]) for location in locations],
+            days
+        )
+    fetched = await asyncio.gather(
+        *(fetch(location) for location in locations),
+        return_exceptions=True
+    )
+    
+    results = []
+    outcomes = iter(fetched)
+    for item, location in zip(batch.items, resolved):
+        query = item if isinstance(item, str) else item.model_dump(exclude_none=True)
+        outcome = location if isinstance(location, Exception) else next(outcomes)
+        if isinstance(outcome, GeocodeDeadlineError):
+            results.append({"query": query, "status": 503, "error": str(outcome)})
+        elif isinstance(outcome, Exception):
+            results.append({"query": query, "status": 400, "error": str(outcome)})
+        else:
+            results.append({"query": query, "status": 200, "data": outcome})
+    
+    return JSONResponse(content={
+        "timestamp": current_time.isoformat(),
+        "succeeded": sum(1 for result in results if result["status"] == 200),
+        "failed": sum(1 for result in results if result["status"] != 200),
+        "results": results
+    })
+
+@app.get("/lunar-data/rise-set")
+async def get_rise_set(request: Request, location: str = "Los Angeles, CA",
+                       start: Optional[date] = None, days: int = 7):
+    """API endpoint listing moonrise, moonset and transit times for consecutive days."""
+    if not 1 <= days <= config.RISE_SET_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {config.RISE_SET_MAX_DAYS}")
+    
+    try:
+        location_data = await location_service.get_coordinates(
+            location,
+            timeout=config.GEOCODE_DEADLINE,
+            client=_client_id(request)
+        )
+    except GeocodeDeadlineError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    if start is None:
+        start = local_solar_date(location_data["longitude"])
+    day_list = [start + timedelta(days=offset) for offset in range(days)]
+    
+    # Long ranges take a few milliseconds to solve; keep them off the event loop
+    times = await run_in_threadpool(
+        rise_set_service.get_times_batch,
+        [(location_data["latitude"], location_data["longitude"])],
+        day_list
+    )
+    
+    return JSONResponse(content={
+        "location": location_data["address"],
+        "latitude": location_data["latitude"],
+        "longitude": location_data["longitude"],
+        "days": times[0]
+    })
+
+@app.get("/lunar-data/timeseries")
+async def get_timeseries(request: Request, lat: float, lon: float, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None, step: str = "1h"):
+    """API endpoint streaming lunar state over a time range as newline-delimited JSON."""
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="lat must be within [-90, 90] and lon within [-180, 180]")
+    try:
+        step_seconds = parse_step(step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if start is None:
+        start = datetime.now(timezone.utc)
+    if end is None:
+        end = start + timedelta(days=1)
+    samples = count_samples(start, end, step_seconds)
+    if not 1 <= samples <= config.TIMESERIES_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"start..end at this step must give between 1 and {config.TIMESERIES_MAX_POINTS} samples"
+        )
+    
+    chunks = iter_timeseries(lat, lon, start, end, step_seconds, chunk_size=config.TIMESERIES_CHUNK_SIZE)
+    
+    async def stream():
+        # Compute one chunk at a time off the event loop, stopping when the client goes away
+        while not await request.is_disconnected():
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/lunar-data/live")
+async def get_live_feed(lat: float, lon: float):
+    """API endpoint pushing the Moon's position and orientation as Server-Sent Events."""
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="lat must be within [-90, 90] and lon within [-180, 180]")
+    try:
+        subscription = live_feed.subscribe(lat, lon)
+    except LiveFeedFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    
+    async def events():
+        # The stream is cancelled when the client disconnects, which unsubscribes it
+        try:
+            yield f"retry: {int(config.LIVE_FEED_INTERVAL * 1000)}\n\n".encode("utf-8")
+            while True:
+                yield await subscription.get()
+        finally:
+            live_feed.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/moon-image.png")
+async def get_moon_image(request: Request, elongation: float, position_angle: float = 0.0,
+                         libration_longitude: float = 0.0, libration_latitude: float = 0.0,
+                         size: int = config.MOON_IMAGE_DEFAULT_SIZE):
+    """API endpoint rendering the Moon photograph for an elongation, orientation and libration."""
+    if not 16 <= size <= config.MOON_IMAGE_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"size must be between 16 and {config.MOON_IMAGE_MAX_SIZE}")
+    if not (abs(libration_longitude) <= 15 and abs(libration_latitude) <= 15):
+        raise HTTPException(status_code=400, detail="libration angles must be within [-15, 15] degrees")
+    
+    # Parameters that round to the same grid point (or atlas frame) get the same image, and so the same ETag
+    key = moon_renderer.quantize(elongation, position_angle, libration_longitude, libration_latitude, size)
+    headers = {
+        "ETag": '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20] + '"',
+        "Cache-Control": "public, max-age=86400"
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    image = await run_in_threadpool(moon_renderer.png, *key)
+    return Response(content=image, media_type="image/png", headers=headers)
+
+@app.get("/locations/suggest")
+async def suggest_locations(q: str = "", limit: int = config.GAZETTEER_SUGGEST_LIMIT):
+    """API endpoint returning gazetteer places whose name starts with the query."""
+    suggestions = []
+    if gazetteer is not None:
+        limit = max(0, min(limit, config.GAZETTEER_SUGGEST_LIMIT))
+        suggestions = [
+            {
+                "name": place["address"],
+                "latitude": place["latitude"],
+                "longitude": place["longitude"]
+            }
+            for place in gazetteer.suggest(q, limit=limit)
+        ]
+    return JSONResponse(content={"query": q, "suggestions": suggestions})
+
+def collect_cache_stats() -> Dict[str, Any]:
+    """Snapshot of every service's counters (counts the SQLite stores, so call it off the loop)."""
+    return {
+        **lunar_service.get_cache_stats(),
+        "geocode": geocode_cache.stats(),
+        "geocode_queue": location_service.scheduler.stats(),
+        "rise_set": rise_set_service.get_cache_stats(),
+        "live_feed": live_feed.stats(),
+        "moon_image": moon_renderer.get_cache_stats()
+    }
+
+@app.get("/cache-stats")
+async def get_cache_stats():
+    """API endpoint exposing lunar data, geocoding and rise/set cache counters."""
+    return JSONResponse(content=await run_in_threadpool(collect_cache_stats))
+
+def collect_service_metrics():
+    """
+    Expose the services' own cache and queue counters as metric families.
+    
+    The persistent stores are counted with a SQLite query, so the registry
+    is only rendered off the event loop (see get_metrics).
+    """
+    caches = {
+        "lunar_data": lunar_service.get_cache_stats(),
+        "geocode": geocode_cache.stats(),
+        "rise_set": rise_set_service.get_cache_stats(),
+        "moon_image": moon_renderer.get_cache_stats()
+    }
+    lookups, sizes = [], []
+    for name, stats in caches.items():
+        if "hits" not in stats:
+            continue  # The local ephemeris provider keeps no cache
+        lookups.append(({"cache": name, "result": "hit"}, stats["hits"]))
+        lookups.append(({"cache": name, "result": "miss"}, stats["misses"]))
+        sizes.append(({"cache": name}, stats["size"]))
+    yield "lunar_cache_lookups_total", "counter", "Cache lookups by cache and result", lookups
+    yield "lunar_cache_entries", "gauge", "Entries currently held by each in-memory cache", sizes
+    
+    queue = location_service.scheduler.stats()
+    yield "lunar_geocode_queue_length", "gauge", "Geocoding requests waiting for a rate-limit token", [({}, queue["queued"])]
+    yield "lunar_geocode_queue_rejected_total", "counter", "Geocoding requests rejected or expired against their deadline", [
+        ({"reason": "rejected"}, queue["rejected"]),
+        ({"reason": "expired"}, queue["expired"])
+    ]
+    
+    feed = live_feed.stats()
+    yield "lunar_live_feed_subscribers", "gauge", "Connected live feed clients", [({}, feed["subscribers"])]
+    
+    atlas = moon_renderer.get_cache_stats()["atlas"]
+    if atlas is not None:
+        yield "lunar_moon_atlas_hits_total", "counter", "Moon images served from the pre-rendered atlas", [({}, atlas["hits"])]
+
+REGISTRY.register_collector(collect_service_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint."""
+    return Response(content=await run_in_threadpool(REGISTRY.render), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     print("🌙 Starting Lunar Phase Calculator...")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# bench_libration.py - Scalar vs vectorized libration and orientation
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from utils.lunar_math import LunarMath
+
+def best_of(fn, repeats=5):
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    """Compare scalar and array versions over a month of minute-spaced samples."""
+    samples = 30 * 24 * 60
+    julian_days = 2460000.5 + np.arange(samples) / 1440.0
+    longitude, latitude = -118.2437, 34.0522
+
+    rng = np.random.default_rng(42)
+    azimuths = rng.uniform(0, 360, samples)
+    altitudes = rng.uniform(-90, 90, samples)
+
+    # Correctness: array results must match the scalar ones
+    array_lib = LunarMath.calculate_libration_array(julian_days, longitude, latitude)
+    array_pa = LunarMath.calculate_orientation_array(latitude, azimuths, altitudes)
+    max_lib_error = 0.0
+    max_pa_error = 0.0
+    for i in range(0, samples, 97):
+        scalar = LunarMath.calculate_libration(julian_days[i], longitude, latitude)
+        for key, value in scalar.items():
+            max_lib_error = max(max_lib_error, abs(array_lib[key][i] - value))
+        pa = LunarMath.calculate_orientation(latitude, azimuths[i], altitudes[i])
+        diff = abs(array_pa[i] - pa) % 360
+        max_pa_error = max(max_pa_error, min(diff, 360 - diff))
+
+    print(f"Samples: {samples:,}")
+    print(f"Max libration difference:   {max_lib_error:.3e} deg")
+    print(f"Max orientation difference: {max_pa_error:.3e} deg")
+
+    scalar_lib = best_of(lambda: [LunarMath.calculate_libration(jd, longitude, latitude)
+                                  for jd in julian_days.tolist()], repeats=3)
+    vector_lib = best_of(lambda: LunarMath.calculate_libration_array(julian_days, longitude, latitude))
+    scalar_pa = best_of(lambda: [LunarMath.calculate_orientation(latitude, az, alt)
+                                 for az, alt in zip(azimuths.tolist(), altitudes.tolist())], repeats=3)
+    vector_pa = best_of(lambda: LunarMath.calculate_orientation_array(latitude, azimuths, altitudes))
+
+    print(f"\n{'Function':<24}{'scalar (s)':>12}{'array (s)':>12}{'speedup':>10}")
+    print(f"{'calculate_libration':<24}{scalar_lib:>12.4f}{vector_lib:>12.4f}{scalar_lib / vector_lib:>9.1f}x")
+    print(f"{'calculate_orientation':<24}{scalar_pa:>12.4f}{vector_pa:>12.4f}{scalar_pa / vector_pa:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# run_benchmarks.py - Benchmark suite for the math, formatting and request paths
+
+"""
+Time the hot paths and compare them against a stored baseline.
+
+    python tests/benchmarks/run_benchmarks.py
+    python tests/benchmarks/run_benchmarks.py --save tests/benchmarks/baselines/baseline.json
+    python tests/benchmarks/run_benchmarks.py --compare tests/benchmarks/baselines/baseline.json
+    python tests/benchmarks/run_benchmarks.py -k lunar_math
+
+Each benchmark is calibrated so one sample runs for at least --min-time
+seconds, then sampled --repeat times; per-call statistics are reported in
+microseconds. --compare exits with status 1 when any benchmark's fastest
+sample got slower than the baseline's by more than --threshold (the minimum
+is the statistic least disturbed by other load on the machine).
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+BASELINE_FORMAT = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+
+# name -> setup function returning the zero-argument callable to time
+BENCHMARKS: List[Tuple[str, Callable[[], Callable[[], Any]]]] = []
+
+def benchmark(name: str):
+    """Register a setup function under a benchmark name."""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+# Fixed inputs so runs are comparable across versions
+SAMPLE_TIME = datetime(2025, 5, 21, 12, 0, 0)
+SAMPLE_JD = 2460817.291667
+LATITUDE, LONGITUDE = 34.0522, -118.2437
+
+def _sample_lunar_data() -> Dict[str, Any]:
+    from backend.local_ephemeris import LocalEphemerisService
+    return LocalEphemerisService().get_moon_data(LATITUDE, LONGITUDE, SAMPLE_TIME)
+
+@benchmark("lunar_math.julian_day")
+def setup_julian_day():
+    from utils.lunar_math import julian_day
+    return lambda: julian_day(SAMPLE_TIME)
+
+@benchmark("lunar_math.calculate_libration")
+def setup_calculate_libration():
+    from utils.lunar_math import LunarMath
+    return lambda: LunarMath.calculate_libration(SAMPLE_JD, LONGITUDE, LATITUDE)
+
+@benchmark("lunar_math.get_next_phase_info")
+def setup_next_phase_table():
+    from utils.lunar_math import get_next_phase_info
+    return lambda: get_next_phase_info(123.4, SAMPLE_TIME)
+
+@benchmark("lunar_math.get_next_phase_info.estimate")
+def setup_next_phase_estimate():
+    from utils.lunar_math import get_next_phase_info
+    return lambda: get_next_phase_info(123.4)
+
+@benchmark("data_processor.format_lunar_data")
+def setup_format_lunar_data():
+    from backend.data_processor import LunarDataProcessor
+    processor = LunarDataProcessor(terminal_width=80, enable_color=True)
+    lunar_data = _sample_lunar_data()
+    return lambda: processor.format_lunar_data(lunar_data)
+
+@benchmark("data_processor.ascii_moon_80x24")
+def setup_ascii_moon():
+    from backend.data_processor import LunarDataProcessor
+    processor = LunarDataProcessor(terminal_width=80, enable_color=True)
+    return lambda: processor._create_ascii_moon_visualization(63.5, 123.4, 80, 24)
+
+@benchmark("data_processor.ascii_moon_80x24.uncached")
+def setup_ascii_moon_uncached():
+    from backend.data_processor import _SHADE_GLYPHS, _render_ascii_moon
+    return lambda: _render_ascii_moon(0.635, True, 80, 24, _SHADE_GLYPHS)
+
+@benchmark("moon_renderer.render_400")
+def setup_moon_render():
+    from backend.moon_renderer import MoonRenderer
+    renderer = MoonRenderer(os.path.join(ROOT, "resources", "moon.png"))
+    return lambda: renderer.render(123.4, 10.0, 3.0, -2.0, 400)
+
+def _lunar_data_client():
+    """TestClient for the FastAPI app with the Astronomy API replaced by canned payloads."""
+    import httpx
+    from fastapi.testclient import TestClient
+
+    from fake_upstream import positions_payload
+
+    # main.py resolves its static and cache paths against the working directory
+    os.chdir(ROOT)
+    import config
+    config.LUNAR_DATA_PROVIDER = "api"
+    import main
+
+    # Keep per-request logging out of the timings
+    logging.getLogger("backend").setLevel(logging.WARNING)
+    logging.getLogger("main").setLevel(logging.WARNING)
+
+    today = datetime.now(timezone.utc).date()
+    payload = positions_payload(LATITUDE, LONGITUDE, today, today, SAMPLE_TIME.hour)
+
+    async def fake_get(url, timeout=None):
+        return httpx.Response(200, json=payload, request=httpx.Request("GET", url))
+
+    main.lunar_service.session.get = fake_get
+    return main, TestClient(main.app)
+
+@benchmark("main.lunar_data.cached")
+def setup_lunar_data_cached():
+    _, client = _lunar_data_client()
+    client.get("/lunar-data", params={"location": "Tokyo"}).raise_for_status()
+
+    def run():
+        client.get("/lunar-data", params={"location": "Tokyo"})
+    return run
+
+@benchmark("main.lunar_data.upstream")
+def setup_lunar_data_upstream():
+    main, client = _lunar_data_client()
+
+    def run():
+        # Evict the hour's state so every request goes through the (mocked) API call and parsing
+        main.lunar_service.cache.delete(main.lunar_service._cache_key(datetime.now()))
+        client.get("/lunar-data", params={"location": "Tokyo"})
+    return run
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """
+    Time a callable.
+
+    Args:
+        fn: Zero-argument callable
+        repeat: Number of samples
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Per-call statistics in microseconds
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2
+
+    per_call = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": min(per_call),
+        "median_us": statistics.median(per_call),
+        "mean_us": statistics.fmean(per_call),
+        "stdev_us": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat
+    }
+
+def environment() -> Dict[str, Any]:
+    """Describe the code version and machine the results came from."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> bool:
+    """
+    Print a comparison against a baseline.
+
+    Returns:
+        True if no benchmark regressed beyond the threshold
+    """
+    ok = True
+    print(f"\nCompared with {baseline['environment'].get('commit') or 'baseline'} "
+          f"({baseline['environment'].get('timestamp')}), threshold {threshold:.0%}")
+    print(f"{'Benchmark (min us)':<44}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<44}{'-':>12}{result['min_us']:>12.2f}{'new':>9}")
+            continue
+        change = result["min_us"] / previous["min_us"] - 1
+        verdict = ""
+        if change > threshold:
+            verdict = "  REGRESSION"
+            ok = False
+        elif change < -threshold / (1 + threshold):
+            verdict = "  faster"
+        print(f"{name:<44}{previous['min_us']:>12.2f}{result['min_us']:>12.2f}{change:>+9.1%}{verdict}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7, help="samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per sample")
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help="compare against a baseline (default: the bundled one)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'Benchmark':<44}{'median (us)':>12}{'min (us)':>12}{'stdev':>9}")
+    for name, setup in BENCHMARKS:
+        if args.pattern not in name:
+            continue
+        result = measure(setup(), args.repeat, args.min_time)
+        results[name] = result
+        print(f"{name:<44}{result['median_us']:>12.2f}{result['min_us']:>12.2f}{result['stdev_us']:>9.2f}")
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"format": BASELINE_FORMAT, "environment": environment(), "results": results},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# conftest.py - Shared pytest setup: import path and test doubles
+
+import os
+import sys
+import time
+
+import pytest
+
+# Make the application packages importable however pytest is started
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+class FakeClock:
+    """Manually advanced time source; sleep() advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A fake monotonic clock starting at 0."""
+    return FakeClock()
+
+@pytest.fixture
+def pacific_time(monkeypatch):
+    """Run the test with the host clock in a non-UTC time zone."""
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
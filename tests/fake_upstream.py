@@ -0,0 +1,92 @@
+# fake_upstream.py - Astronomy API response bodies computed from the local ephemeris
+
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.ephemeris import AU_KM, datetime_to_jd, moon_state, phase_name
+
+def moon_cell(latitude: float, longitude: float, when: datetime) -> Dict[str, Any]:
+    """
+    One bodies/positions/moon cell, shaped like the real API's (numbers as strings).
+
+    Args:
+        latitude: Observer latitude
+        longitude: Observer longitude
+        when: Observation time (naive values are taken as UTC)
+
+    Returns:
+        Cell dictionary as found under data.table.rows[0].cells
+    """
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    state = moon_state(datetime_to_jd(when), latitude, longitude)
+    geo = state["geocentric"]
+    topo = state["topocentric"]
+
+    return {
+        "date": when.isoformat(timespec="milliseconds"),
+        "id": "moon",
+        "name": "Moon",
+        "distance": {
+            "fromEarth": {
+                "au": f"{geo['distance_km'] / AU_KM:.8f}",
+                "km": f"{geo['distance_km']:.3f}"
+            }
+        },
+        "position": {
+            "horizontal": {
+                "altitude": {"degrees": f"{topo['altitude']:.4f}"},
+                "azimuth": {"degrees": f"{topo['azimuth']:.4f}"}
+            },
+            "equatorial": {
+                "rightAscension": {"hours": f"{topo['right_ascension'] / 15:.6f}"},
+                "declination": {"degrees": f"{topo['declination']:.4f}"}
+            },
+            "constellation": {"id": "", "short": "", "name": ""}
+        },
+        "extraInfo": {
+            "elongation": f"{geo['elongation'] % 360:.3f}",
+            "magnitude": "-10.0",
+            "phase": {
+                "angel": f"{geo['elongation'] % 360:.3f}",
+                "fraction": f"{geo['illumination']:.4f}",
+                "string": phase_name(geo["elongation"])
+            }
+        }
+    }
+
+def positions_payload(latitude: float, longitude: float, from_date: date, to_date: date,
+                      hour: int = 0) -> Dict[str, Any]:
+    """
+    Full bodies/positions/moon response: one cell per day at the same time of day.
+
+    Args:
+        latitude: Observer latitude
+        longitude: Observer longitude
+        from_date: First day
+        to_date: Last day (inclusive)
+        hour: UTC hour sampled on each day
+
+    Returns:
+        Response body dictionary
+    """
+    cells: List[Dict[str, Any]] = []
+    day = from_date
+    while day <= to_date:
+        cells.append(moon_cell(latitude, longitude, datetime(day.year, day.month, day.day, hour)))
+        day += timedelta(days=1)
+
+    return {
+        "data": {
+            "dates": {"from": from_date.isoformat(), "to": to_date.isoformat()},
+            "observer": {"location": {"latitude": latitude, "longitude": longitude, "elevation": 0}},
+            "table": {
+                "header": [cell["date"] for cell in cells],
+                "rows": [{"entry": {"id": "moon", "name": "Moon"}, "cells": cells}]
+            }
+        }
+    }
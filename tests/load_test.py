@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# load_test.py - Open-loop load generator for /lunar-data
+
+"""
+Drive /lunar-data at a fixed request rate and report throughput and latency.
+
+Against a server that is already running:
+
+    python tests/load_test.py --url http://127.0.0.1:8000 --rps 200 --duration 30
+
+Or start the stand-in upstreams and the app pointed at them first:
+
+    python tests/load_test.py --launch --rps 200 --duration 30
+    python tests/load_test.py --launch --set CACHE_DURATION=0 -- --api-latency 0.2 --api-429-rate 0.05
+
+Arguments after "--" are passed to tests/standin_server.py. --set overrides a
+config.py constant in the launched app (values are Python literals; setting
+CACHE_DURATION=0 sends every request upstream).
+
+Requests are sent on a fixed schedule whatever the server's speed (an open
+loop), and each latency is measured from the moment its request was due
+rather than when it was actually sent, so a stalled server shows up as high
+latency instead of as a quietly reduced request rate.
+"""
+
+import argparse
+import ast
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Names the gazetteer resolves offline; --unique-rate mixes in names only the geocoder knows
+DEFAULT_LOCATIONS = ["Los Angeles, CA", "Tokyo", "London", "Paris", "Sydney", "Cairo",
+                     "New York", "Mumbai", "Sao Paulo", "Reykjavik"]
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+async def run_load(url: str, rps: float, duration: float, locations: List[str], unique_rate: float,
+                   max_in_flight: int, timeout: float, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Send GET /lunar-data requests on a fixed schedule.
+
+    Args:
+        url: Base URL of the app
+        rps: Target requests per second
+        duration: Seconds to keep sending
+        locations: Location names picked at random for each request
+        unique_rate: Fraction of requests asking for a never-seen location
+        max_in_flight: Requests allowed in flight before new ones are dropped
+        timeout: Per-request timeout in seconds
+        seed: Seed for the location choice
+
+    Returns:
+        Summary with counts, throughput and latency percentiles (ms)
+    """
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    in_flight = 0
+    dropped = 0
+
+    async def one_request(client: httpx.AsyncClient, due: float, location: str) -> None:
+        nonlocal in_flight
+        try:
+            response = await client.get("/lunar-data", params={"location": location})
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        finally:
+            latencies.append(time.perf_counter() - due)
+            in_flight -= 1
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        tasks = []
+        total = int(rps * duration)
+        started = time.perf_counter()
+        for i in range(total):
+            due = started + i / rps
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if in_flight >= max_in_flight:
+                dropped += 1
+                continue
+            if rng.random() < unique_rate:
+                location = f"Loadtest Place {i}"
+            else:
+                location = rng.choice(locations)
+            in_flight += 1
+            tasks.append(asyncio.create_task(one_request(client, due, location)))
+
+        sent_for = time.perf_counter() - started
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "target_rps": rps,
+        "duration": round(sent_for, 3),
+        "sent": len(tasks),
+        "dropped": dropped,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "throughput_rps": round(statuses[200] / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p90": round(percentile(latencies, 0.90) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else float("nan")
+        }
+    }
+
+def _wait_until_up(url: str, deadline: float = 30.0) -> None:
+    """Poll a URL until it answers, or raise after the deadline."""
+    stop = time.monotonic() + deadline
+    while True:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            if time.monotonic() > stop:
+                raise RuntimeError(f"{url} did not come up within {deadline:.0f}s")
+            time.sleep(0.2)
+
+def launch(app_port: int, standin_port: int, overrides: Dict[str, Any],
+           standin_args: List[str]) -> List[subprocess.Popen]:
+    """
+    Start the stand-in upstreams and the app configured to use them.
+
+    Args:
+        app_port: Port for the app
+        standin_port: Port for tests/standin_server.py
+        overrides: Extra config.py constants to set in the app
+        standin_args: Extra command-line arguments for the stand-in
+
+    Returns:
+        The started processes (stand-in first)
+    """
+    standin = subprocess.Popen([sys.executable, os.path.join(ROOT, "tests", "standin_server.py"),
+                                "--port", str(standin_port), *standin_args])
+    settings = {
+        "ASTRONOMY_API_BASE_URL": f"http://127.0.0.1:{standin_port}/api/v2/",
+        "GEOCODER_DOMAIN": f"127.0.0.1:{standin_port}",
+        "GEOCODER_SCHEME": "http",
+        "LUNAR_DATA_PROVIDER": "api",
+        # The stand-in has no usage policy to respect, so let the geocoder queue run freely
+        "GEOCODE_RATE_LIMIT": 1e6,
+        "GEOCODE_BURST": 1000,
+        # Start from empty caches so earlier runs do not skew this one
+        "GEOCODE_CACHE_PATH": None,
+        "PERSISTENT_CACHE_PATH": None,
+        "LOG_LEVEL": "WARNING",
+        **overrides
+    }
+    code = ("import config\n"
+            f"for name, value in {settings!r}.items():\n"
+            "    setattr(config, name, value)\n"
+            "import uvicorn\n"
+            f"uvicorn.run('main:app', host='127.0.0.1', port={app_port}, log_level='warning')\n")
+    app = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT)
+
+    processes = [standin, app]
+    try:
+        _wait_until_up(f"http://127.0.0.1:{standin_port}/stats")
+        _wait_until_up(f"http://127.0.0.1:{app_port}/cache-stats")
+    except RuntimeError:
+        for process in processes:
+            process.terminate()
+        raise
+    return processes
+
+def print_report(result: Dict[str, Any]) -> None:
+    """Print a run summary."""
+    latency = result["latency_ms"]
+    print(f"target          {result['target_rps']:.1f} req/s for {result['duration']:.1f}s")
+    print(f"sent            {result['sent']} (dropped {result['dropped']} at the in-flight limit)")
+    print(f"statuses        {', '.join(f'{k}: {v}' for k, v in result['statuses'].items())}")
+    print(f"throughput      {result['throughput_rps']:.1f} successful req/s")
+    print(f"latency (ms)    p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    if "upstream" in result:
+        print(f"upstream        {json.dumps(result['upstream'])}")
+
+def main():
+    argv = sys.argv[1:]
+    standin_args: List[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, standin_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description="Load-test /lunar-data at a fixed request rate.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of a running app")
+    parser.add_argument("--rps", type=float, default=50.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to send requests for")
+    parser.add_argument("--location", action="append", dest="locations",
+                        help="location to request (repeatable; default: a set of major cities)")
+    parser.add_argument("--unique-rate", type=float, default=0.0,
+                        help="fraction of requests for never-seen locations (exercises the geocoder)")
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="outstanding requests before new ones are dropped")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, help="seed the location choice")
+    parser.add_argument("--json", metavar="PATH", help="also write the summary as JSON")
+    parser.add_argument("--launch", action="store_true",
+                        help="start the stand-in upstreams and the app before the run")
+    parser.add_argument("--app-port", type=int, default=8900, help="app port with --launch")
+    parser.add_argument("--standin-port", type=int, default=8901, help="stand-in port with --launch")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a config.py constant in the launched app")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        overrides[name] = ast.literal_eval(value)
+
+    processes: List[subprocess.Popen] = []
+    url = args.url
+    if args.launch:
+        processes = launch(args.app_port, args.standin_port, overrides, standin_args)
+        url = f"http://127.0.0.1:{args.app_port}"
+
+    try:
+        result = asyncio.run(run_load(url, args.rps, args.duration, args.locations or DEFAULT_LOCATIONS,
+                                      args.unique_rate, args.max_in_flight, args.timeout, args.seed))
+        if args.launch:
+            result["upstream"] = httpx.get(f"http://127.0.0.1:{args.standin_port}/stats").json()
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# standin_server.py - Local stand-in for the Astronomy API and Nominatim, for load testing
+
+"""
+Serve the two upstream APIs the app depends on, without quota or rate limits.
+
+    python tests/standin_server.py --port 8901 --api-latency 0.08 --api-429-rate 0.02
+
+GET /api/v2/bodies/positions/moon answers with the same payload shape as the
+Astronomy API (computed from the local ephemeris, see fake_upstream.py) and
+GET /search answers like Nominatim's JSON format, with coordinates derived
+from a hash of the query. Each service can be given its own latency, error
+rate (500) and rate-limit rate (429 with Retry-After). GET /stats reports
+how many requests each service received and what it answered.
+
+Point the app at it with:
+
+    ASTRONOMY_API_BASE_URL = "http://127.0.0.1:8901/api/v2/"
+    GEOCODER_DOMAIN = "127.0.0.1:8901"
+    GEOCODER_SCHEME = "http"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from fake_upstream import positions_payload
+
+class FaultProfile:
+    """Latency and failure injection for one stand-in service."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: int = 1, rng: Optional[random.Random] = None):
+        """
+        Args:
+            latency: Base response delay in seconds
+            jitter: Extra delay drawn uniformly from [0, jitter] seconds
+            error_rate: Fraction of requests answered with 500
+            rate_limit_rate: Fraction of requests answered with 429
+            retry_after: Retry-After value sent with 429 responses (seconds)
+            rng: Random source (seed it for reproducible runs)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = rng or random.Random()
+        self.responses: Counter = Counter()
+
+    async def apply(self) -> Optional[Response]:
+        """
+        Wait out the configured latency and maybe fail the request.
+
+        Returns:
+            An injected error response, or None to answer normally
+        """
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self.responses[429] += 1
+            return JSONResponse({"message": "Too Many Requests"}, status_code=429,
+                                headers={"Retry-After": str(self.retry_after)})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.responses[500] += 1
+            return JSONResponse({"message": "Internal Server Error"}, status_code=500)
+        return None
+
+@lru_cache(maxsize=4096)
+def _positions_body(latitude: float, longitude: float, from_date: str, to_date: str, hour: int) -> bytes:
+    """Encoded positions payload; repeated queries are replayed instead of recomputed."""
+    payload = positions_payload(latitude, longitude, date.fromisoformat(from_date),
+                                date.fromisoformat(to_date), hour)
+    return json.dumps(payload).encode("utf-8")
+
+def _search_result(query: str) -> Dict[str, str]:
+    """Nominatim-style place for a query, at coordinates derived from its hash."""
+    digest = hashlib.sha1(query.strip().lower().encode("utf-8")).digest()
+    latitude = int.from_bytes(digest[:4], "big") / 2**32 * 120 - 60
+    longitude = int.from_bytes(digest[4:8], "big") / 2**32 * 360 - 180
+    return {
+        "place_id": str(int.from_bytes(digest[8:12], "big")),
+        "lat": f"{latitude:.7f}",
+        "lon": f"{longitude:.7f}",
+        "display_name": f"{query.strip()}, Stand-in",
+        "class": "place",
+        "type": "city",
+        "importance": 0.5
+    }
+
+def create_app(api: FaultProfile, geocoder: FaultProfile) -> Starlette:
+    """
+    Build the stand-in ASGI app.
+
+    Args:
+        api: Fault profile of the Astronomy API endpoint
+        geocoder: Fault profile of the Nominatim endpoint
+
+    Returns:
+        Starlette application
+    """
+    async def moon_positions(request: Request) -> Response:
+        if not request.headers.get("authorization", "").startswith("Basic "):
+            api.responses[401] += 1
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+
+        injected = await api.apply()
+        if injected is not None:
+            return injected
+
+        params = request.query_params
+        try:
+            latitude = float(params["latitude"])
+            longitude = float(params["longitude"])
+            from_date = date.fromisoformat(params["from_date"]).isoformat()
+            to_date = date.fromisoformat(params["to_date"]).isoformat()
+            hour = int(params.get("time", "00:00:00").split(":")[0])
+        except (KeyError, ValueError):
+            api.responses[400] += 1
+            return JSONResponse({"message": "Invalid query parameters"}, status_code=400)
+
+        api.responses[200] += 1
+        return Response(_positions_body(latitude, longitude, from_date, to_date, hour),
+                        media_type="application/json")
+
+    async def search(request: Request) -> Response:
+        injected = await geocoder.apply()
+        if injected is not None:
+            return injected
+
+        query = request.query_params.get("q", "")
+        geocoder.responses[200] += 1
+        return JSONResponse([_search_result(query)] if query.strip() else [])
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse({
+            "astronomy_api": {str(status): count for status, count in sorted(api.responses.items())},
+            "nominatim": {str(status): count for status, count in sorted(geocoder.responses.items())}
+        })
+
+    return Starlette(routes=[
+        Route("/api/v2/bodies/positions/moon", moon_positions),
+        Route("/search", search),
+        Route("/stats", stats)
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Astronomy API / Nominatim stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--seed", type=int, help="seed the fault injection for reproducible runs")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    for service, latency in (("api", 0.05), ("geocoder", 0.1)):
+        parser.add_argument(f"--{service}-latency", type=float, default=latency,
+                            help=f"base {service} response delay in seconds")
+        parser.add_argument(f"--{service}-jitter", type=float, default=0.0,
+                            help=f"extra random {service} delay, up to this many seconds")
+        parser.add_argument(f"--{service}-error-rate", type=float, default=0.0,
+                            help=f"fraction of {service} requests answered with 500")
+        parser.add_argument(f"--{service}-429-rate", type=float, default=0.0,
+                            help=f"fraction of {service} requests answered with 429")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    api = FaultProfile(args.api_latency, args.api_jitter, args.api_error_rate,
+                       args.api_429_rate, args.retry_after, rng)
+    geocoder = FaultProfile(args.geocoder_latency, args.geocoder_jitter, args.geocoder_error_rate,
+                            args.geocoder_429_rate, args.retry_after, rng)
+    uvicorn.run(create_app(api, geocoder), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
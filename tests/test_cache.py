@@ -0,0 +1,113 @@
+# test_cache.py - LunarCache (striped LRU with per-entry TTL)
+
+import threading
+
+import pytest
+
+from backend.cache import LunarCache
+
+def test_evicts_least_recently_used_at_capacity():
+    cache = LunarCache(max_entries=3, stripes=1)
+    for key in "abc":
+        cache.set(key, key.upper())
+
+    assert cache.get("a") == "A"  # "b" is now the least recently used
+    cache.set("d", "D")
+
+    assert "b" not in cache
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 3
+
+def test_overwrite_does_not_evict():
+    cache = LunarCache(max_entries=2, stripes=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 3)
+
+    assert cache.get("a") == 3
+    assert cache.get("b") == 2
+    assert cache.stats()["evictions"] == 0
+
+def test_entries_expire_after_ttl(clock):
+    cache = LunarCache(max_entries=8, ttl=10, stripes=1, clock=clock)
+    cache.set("key", "value")
+
+    clock.now = 9.9
+    assert cache.get("key") == "value"
+    clock.now = 10.0
+    assert "key" not in cache
+    assert cache.get("key", "gone") == "gone"
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["size"] == 0
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = LunarCache(max_entries=8, ttl=10, stripes=1, clock=clock)
+    cache.set("short", 1, ttl=2)
+    cache.set("long", 2, ttl=100)
+    cache.set("default", 3)
+
+    clock.now = 5
+    assert cache.get("short") is None
+    assert cache.get("default") == 3
+
+    clock.now = 50
+    assert cache.get("default") is None
+    assert cache.get("long") == 2
+
+def test_purge_expired_drops_only_expired_entries(clock):
+    cache = LunarCache(max_entries=8, ttl=10, stripes=1, clock=clock)
+    cache.set("old", 1, ttl=1)
+    cache.set("new", 2)
+
+    clock.now = 5
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
+
+def test_stats_count_hits_and_misses():
+    cache = LunarCache(max_entries=16, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    assert "a" in cache  # Membership tests are not counted as lookups
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+    assert stats["max_entries"] == 16
+    assert stats["ttl"] == 60
+
+def test_capacity_is_shared_across_stripes():
+    cache = LunarCache(max_entries=10, stripes=4)
+    for i in range(100):
+        cache.set(i, i)
+
+    assert len(cache) <= 10
+    assert cache.stats()["stripes"] == 4
+
+def test_rejects_invalid_sizes():
+    with pytest.raises(ValueError):
+        LunarCache(max_entries=0)
+    with pytest.raises(ValueError):
+        LunarCache(stripes=0)
+
+def test_concurrent_writers_respect_capacity():
+    cache = LunarCache(max_entries=64, stripes=8)
+
+    def writer(offset: int) -> None:
+        for i in range(500):
+            cache.set(offset + i, i)
+            cache.get(offset + i // 2)
+
+    threads = [threading.Thread(target=writer, args=(n * 1000,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["size"] <= 64
+    assert stats["hits"] + stats["misses"] == 8 * 500
@@ -0,0 +1,167 @@
+# test_caching.py - Lunar data and geocode caching, run with: python -m pytest tests
+
+import asyncio
+import threading
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from fake_upstream import positions_payload
+
+from backend.async_location_service import AsyncLocationService
+from backend.cache import LunarCache
+from backend.geocode_cache import GeocodeCache, normalize_location_query
+from backend.geocode_scheduler import AsyncGeocodeScheduler
+from backend.local_ephemeris import LocalEphemerisService
+from backend.lunar_data import LunarDataService
+from backend.persistent_cache import PersistentCache
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        pass
+
+class FakeSession:
+    """Answers moon positions requests from the local ephemeris."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        params = {name: values[0] for name, values in parse_qs(urlparse(url).query).items()}
+        return FakeResponse(positions_payload(
+            float(params["latitude"]), float(params["longitude"]),
+            date.fromisoformat(params["from_date"]), date.fromisoformat(params["to_date"]),
+            int(params["time"].split(":")[0])
+        ))
+
+    def close(self):
+        pass
+
+def make_service(clock, cache_duration: int = 3600) -> LunarDataService:
+    service = LunarDataService("app-id", "app-secret", "https://api.example/v2/",
+                               cache_duration=cache_duration)
+    service.cache = LunarCache(max_entries=4096, ttl=cache_duration, clock=clock)
+    service.session = FakeSession()
+    return service
+
+def test_prefetched_future_hours_outlive_default_ttl(pacific_time, clock):
+    service = make_service(clock, cache_duration=3600)
+    start = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    end = start + timedelta(days=6, hours=23)
+
+    assert service.prefetch_range(34.05, -118.24, start, end) == 7 * 24
+    assert service.session.calls == 24
+
+    # Entries land under the UTC hours they were sampled at, so lookups by local time hit
+    for when in (start, start + timedelta(days=3, hours=7, minutes=30), end):
+        service.get_moon_data(-33.87, 151.21, when)
+    assert service.session.calls == 24
+
+    # Well past the default TTL, but the last hour has not even started yet
+    clock.now = 3 * 24 * 3600.0
+    assert service._get_cached(service._cache_key(end)) is not None
+
+    # Once that hour has been over for a full cache period it expires as usual
+    clock.now = (end + timedelta(hours=1) - datetime.now(timezone.utc)).total_seconds() + 3600 + 60
+    assert service._get_cached(service._cache_key(end)) is None
+
+def test_flight_leader_rechecks_cache(clock):
+    service = make_service(clock)
+    when = datetime(2025, 5, 21, 12, 30)
+    service.get_moon_data(34.05, -118.24, when)
+    assert service.session.calls == 1
+
+    # This caller's first lookup missed just before another flight filled the cache
+    lookup = service._get_cached
+    lookups = []
+
+    def stale_then_fresh(cache_key):
+        lookups.append(cache_key)
+        return None if len(lookups) == 1 else lookup(cache_key)
+
+    service._get_cached = stale_then_fresh
+    service.get_moon_data(-33.86, 151.2, when)
+    assert len(lookups) == 2
+    assert service.session.calls == 1
+
+def test_cached_states_match_local_ephemeris_off_utc(pacific_time, clock):
+    service = make_service(clock)
+    local = LocalEphemerisService()
+    when = datetime(2025, 5, 21, 12, 40)  # Pacific daylight time, 19:40 UTC
+
+    assert service._cache_key(when) == "geo_2025-05-21_19"
+    for latitude, longitude in ((34.05, -118.24), (-33.87, 151.21), (51.51, -0.13)):
+        result = service.get_moon_data(latitude, longitude, when)
+        expected = local.get_moon_data(latitude, longitude, when)
+        assert result["position"]["altitude"] == pytest.approx(expected["position"]["altitude"], abs=0.05)
+        assert result["position"]["azimuth"] == pytest.approx(expected["position"]["azimuth"], abs=0.05)
+        assert result["observer"]["date"] == "2025-05-21"
+    assert service.session.calls == 1
+
+def test_location_queries_share_keys_across_spellings():
+    assert normalize_location_query("  LOS-ANGELES,  CA. ") == normalize_location_query("Los Angeles, CA")
+
+def test_coordinate_queries_keep_hemisphere():
+    keys = {normalize_location_query(query)
+            for query in ("-33.86, 151.2", "33.86, 151.2", "33.86,-151.2", "-33.86,-151.2")}
+    assert len(keys) == 4
+
+    cache = GeocodeCache()
+    cache.set("-33.86, 151.2", {"latitude": -33.86, "longitude": 151.2})
+    assert cache.get("33.86, 151.2") == (False, None)
+    assert cache.get("-33.86,151.2")[1]["latitude"] == -33.86
+
+class OffLoopPersistentCache(PersistentCache):
+    """PersistentCache that fails if it is used from the given (event loop) thread."""
+
+    loop_thread = None
+
+    def get_with_ttl(self, key):
+        assert threading.get_ident() != self.loop_thread, "SQLite read on the event loop"
+        return super().get_with_ttl(key)
+
+    def set(self, key, value, ttl=None):
+        assert threading.get_ident() != self.loop_thread, "SQLite write on the event loop"
+        return super().set(key, value, ttl)
+
+class FakeGeolocator:
+    def __init__(self):
+        self.calls = 0
+
+    async def geocode(self, query):
+        self.calls += 1
+        if query == "Nowhere":
+            return None
+        return type("Location", (), {"latitude": -33.87, "longitude": 151.21, "address": query})()
+
+def test_async_geocode_keeps_sqlite_off_loop(tmp_path):
+    async def scenario():
+        OffLoopPersistentCache.loop_thread = threading.get_ident()
+        store = OffLoopPersistentCache(str(tmp_path / "geocode.db"), namespace="geocode")
+        service = AsyncLocationService(cache=GeocodeCache(persistent_cache=store),
+                                       scheduler=AsyncGeocodeScheduler(rate=1000, burst=10))
+        service.geolocator = FakeGeolocator()
+
+        place = await service.get_coordinates("Sydney")
+        with pytest.raises(ValueError):
+            await service.get_coordinates("Nowhere")
+
+        # A fresh in-memory tier forces lookups through to SQLite
+        service.cache = GeocodeCache(persistent_cache=store)
+        assert await service.get_coordinates("sydney") == place
+        with pytest.raises(ValueError):
+            await service.get_coordinates("nowhere")
+        assert service.geolocator.calls == 2
+        await service.scheduler.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+# test_gazetteer.py - Memory-mapped place-name index: exact lookups and prefix suggestions
+
+import csv
+import os
+
+import pytest
+
+from backend.gazetteer import Gazetteer, build_index
+
+_COLUMNS = ("name", "admin", "admin_code", "country", "country_code", "latitude", "longitude", "population")
+
+PLACES = [
+    ("Portland", "Oregon", "OR", "United States", "US", 45.5152, -122.6784, 652503),
+    ("Portland", "Maine", "ME", "United States", "US", 43.6591, -70.2568, 68408),
+    ("São Paulo", "São Paulo", "SP", "Brazil", "BR", -23.5505, -46.6333, 12325232),
+    ("Zürich", "Zürich", "ZH", "Switzerland", "CH", 47.3769, 8.5417, 421878),
+    ("Porto", "Porto", "", "Portugal", "PT", 41.1579, -8.6291, 231800),
+] + [
+    (f"Springfield {n}", "", "", "United States", "US", 39.0 + n / 100, -90.0, 1000 * n)
+    for n in range(1, 41)
+]
+
+def _write_source(path, places=PLACES) -> str:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(_COLUMNS)
+        writer.writerows(places)
+    return str(path)
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    source = _write_source(tmp_path / "cities.csv")
+    index = str(tmp_path / "gazetteer.idx")
+    assert build_index(source, index) == len(PLACES)
+
+    gazetteer = Gazetteer(index)
+    yield gazetteer
+    gazetteer.close()
+
+def test_lookup_exact_name_with_region_and_country(gazetteer):
+    place = gazetteer.lookup("Portland, ME")
+    assert (place["latitude"], place["longitude"]) == (43.6591, -70.2568)
+    assert place["address"] == "Portland, Maine, United States"
+    assert gazetteer.lookup("Portland, Maine, US")["address"] == place["address"]
+
+def test_ambiguous_name_resolves_to_most_populous(gazetteer):
+    assert gazetteer.lookup("Portland")["address"] == "Portland, Oregon, United States"
+
+def test_lookup_ignores_case_punctuation_and_latin_diacritics(gazetteer):
+    expected = gazetteer.lookup("São Paulo")
+    assert expected["address"] == "São Paulo, Brazil"
+    for spelling in ("sao paulo", "SAO PAULO", "são-paulo.", "  Sao   Paulo, SP "):
+        assert gazetteer.lookup(spelling) == expected
+    assert gazetteer.lookup("ZURICH, switzerland") == gazetteer.lookup("Zürich")
+
+def test_lookup_misses_return_none(gazetteer):
+    assert gazetteer.lookup("Portla") is None  # Prefixes are suggestions, not matches
+    assert gazetteer.lookup("Atlantis") is None
+    assert gazetteer.lookup("  ,. ") is None
+
+def test_suggest_lists_prefix_matches_most_populous_first(gazetteer):
+    suggestions = gazetteer.suggest("port")
+    assert [place["address"] for place in suggestions] == [
+        "Portland, Oregon, United States", "Porto, Portugal", "Portland, Maine, United States"
+    ]
+    assert [place["address"] for place in gazetteer.suggest("PORTLAND M")] == ["Portland, Maine, United States"]
+    assert gazetteer.suggest("sao")[0]["population"] == 12325232
+    assert gazetteer.suggest("xyz") == []
+    assert gazetteer.suggest("") == []
+
+def test_suggest_respects_limit(gazetteer):
+    suggestions = gazetteer.suggest("springfield", limit=3)
+    assert [place["address"] for place in suggestions] == [
+        "Springfield 40, United States", "Springfield 39, United States", "Springfield 38, United States"
+    ]
+    assert gazetteer.suggest("springfield", limit=0) == []
+
+def test_suggest_scans_at_most_max_scan_keys(gazetteer):
+    # Every Springfield has three keys ("springfield 7", "springfield 7 us", ...),
+    # so the first 10 matching keys cover at most 4 places
+    capped = gazetteer.suggest("springfield", limit=100, max_scan=10)
+    assert 0 < len(capped) <= 4
+    assert len(gazetteer.suggest("springfield", limit=100, max_scan=1000)) == 40
+
+def test_missing_index_file(tmp_path):
+    missing = str(tmp_path / "missing.idx")
+    with pytest.raises(OSError):
+        Gazetteer(missing)
+    assert Gazetteer.open(missing) is None
+    assert Gazetteer.open(missing, str(tmp_path / "missing.csv")) is None
+
+def test_open_builds_missing_index_from_source(tmp_path):
+    source = _write_source(tmp_path / "cities.csv")
+    index = str(tmp_path / "nested" / "gazetteer.idx")
+
+    gazetteer = Gazetteer.open(index, source)
+    assert os.path.exists(index)
+    assert len(gazetteer) == len(PLACES)
+    assert gazetteer.lookup("zurich")["address"] == "Zürich, Switzerland"
+    gazetteer.close()
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"LGAZ",
+    b"not an index at all, just text",
+    b"LGAZ\x01\x00\x00\x00\xff\xff\x00\x00\x01\x00\x00\x00",  # Header promises 65535 places
+])
+def test_corrupt_index_is_rejected(tmp_path, content):
+    index = tmp_path / "gazetteer.idx"
+    index.write_bytes(content)
+    with pytest.raises(ValueError):
+        Gazetteer(str(index))
+    assert Gazetteer.open(str(index)) is None
@@ -0,0 +1,146 @@
+# test_geocode_scheduler.py - Token bucket, fair queueing and deadlines of the geocoder queue
+
+import threading
+import time
+
+import pytest
+
+from backend.geocode_scheduler import GeocodeDeadlineError, GeocodeScheduler, TokenBucket
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    """Poll until condition() is true, failing the test after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("timed out waiting for the scheduler")
+        time.sleep(0.001)
+
+class Recorder:
+    """Geocoder stand-ins that log the (fake) time at which each one ran."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+        self.gate = threading.Event()
+
+    def job(self, name: str, hold: bool = False, takes: float = 0.0):
+        def fn():
+            self.calls.append((name, self.clock.now))
+            if hold:
+                self.gate.wait(5)
+            self.clock.now += takes
+            return name
+        return fn
+
+def _submit_in_thread(scheduler, key, fn, client, outcomes, timeout=None):
+    def run():
+        try:
+            outcomes[key] = scheduler.submit(key, fn, timeout=timeout, client=client)
+        except Exception as e:
+            outcomes[key] = e
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def test_token_bucket_paces_requests(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=clock)
+
+    assert bucket.delay() == 0
+    bucket.consume()
+    assert bucket.delay() == pytest.approx(0.5)
+
+    clock.now = 0.25
+    assert bucket.delay() == pytest.approx(0.25)
+    clock.now = 0.5
+    assert bucket.delay() == 0
+
+def test_token_bucket_allows_burst_then_refills_to_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock)
+    for _ in range(3):
+        assert bucket.delay() == 0
+        bucket.consume()
+    assert bucket.delay() == pytest.approx(1.0)
+
+    # Idle time never banks more than the capacity
+    clock.now = 100.0
+    for _ in range(3):
+        bucket.consume()
+    assert bucket.delay() == pytest.approx(1.0)
+
+def test_token_bucket_rejects_invalid_settings():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, capacity=0)
+
+def test_scheduler_rate_limits_and_serves_clients_in_turn(clock):
+    scheduler = GeocodeScheduler(rate=2.0, burst=1, clock=clock, sleep=clock.sleep)
+    recorder = Recorder(clock)
+    outcomes = {}
+
+    # Hold the worker inside the first call while the queue fills up
+    threads = [_submit_in_thread(scheduler, "a1", recorder.job("a1", hold=True), "alice", outcomes)]
+    _wait_for(lambda: recorder.calls)
+
+    for key, client in (("a2", "alice"), ("a3", "alice"), ("b1", "bob"), ("b2", "bob")):
+        queued = scheduler.stats()["queued"]
+        threads.append(_submit_in_thread(scheduler, key, recorder.job(key), client, outcomes))
+        _wait_for(lambda: scheduler.stats()["queued"] == queued + 1)
+
+    # A duplicate query joins the pending request instead of queueing again
+    threads.append(_submit_in_thread(scheduler, "b1", recorder.job("b1-duplicate"), "carol", outcomes))
+    _wait_for(lambda: scheduler.stats()["coalesced"] == 1)
+
+    recorder.gate.set()
+    for thread in threads:
+        thread.join()
+
+    # Alice queued first, but Bob's requests are interleaved with hers, one token (0.5 s) apart
+    assert [name for name, _ in recorder.calls] == ["a1", "a2", "b1", "a3", "b2"]
+    assert [at for _, at in recorder.calls] == pytest.approx([0.0, 0.5, 1.0, 1.5, 2.0])
+    assert outcomes == {"a1": "a1", "a2": "a2", "a3": "a3", "b1": "b1", "b2": "b2"}
+
+    stats = scheduler.stats()
+    assert (stats["submitted"], stats["completed"], stats["queued"]) == (6, 5, 0)
+
+def test_scheduler_rejects_requests_that_cannot_start_before_deadline(clock):
+    scheduler = GeocodeScheduler(rate=1.0, burst=1, clock=clock, sleep=clock.sleep)
+    recorder = Recorder(clock)
+    outcomes = {}
+
+    threads = [_submit_in_thread(scheduler, "first", recorder.job("first", hold=True), "alice", outcomes)]
+    _wait_for(lambda: recorder.calls)
+    threads.append(_submit_in_thread(scheduler, "second", recorder.job("second"), "alice", outcomes))
+    _wait_for(lambda: scheduler.stats()["queued"] == 1)
+
+    # The next token is 1 s away and "second" goes first: "third" cannot start within 1.5 s
+    with pytest.raises(GeocodeDeadlineError):
+        scheduler.submit("third", recorder.job("third"), timeout=1.5, client="bob")
+    assert scheduler.stats()["rejected"] == 1
+
+    recorder.gate.set()
+    for thread in threads:
+        thread.join()
+    assert "third" not in [name for name, _ in recorder.calls]
+
+def test_scheduler_expires_requests_whose_deadline_passed_in_the_queue(clock):
+    scheduler = GeocodeScheduler(rate=1.0, burst=1, clock=clock, sleep=clock.sleep)
+    recorder = Recorder(clock)
+    outcomes = {}
+
+    # The first lookup holds the worker for 10 (fake) seconds
+    threads = [_submit_in_thread(scheduler, "slow", recorder.job("slow", hold=True, takes=10.0),
+                                 "alice", outcomes)]
+    _wait_for(lambda: recorder.calls)
+
+    # Admitted (it could start at t=1), but by the time its turn comes the deadline (t=3) is gone
+    threads.append(_submit_in_thread(scheduler, "late", recorder.job("late"), "bob", outcomes, timeout=3.0))
+    _wait_for(lambda: scheduler.stats()["queued"] == 1)
+
+    recorder.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(outcomes["late"], GeocodeDeadlineError)
+    assert [name for name, _ in recorder.calls] == ["slow"]
+    assert scheduler.stats()["expired"] == 1
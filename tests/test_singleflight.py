@@ -0,0 +1,153 @@
+# test_singleflight.py - SingleFlight and AsyncSingleFlight request coalescing
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.singleflight import AsyncSingleFlight, SingleFlight
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    """Poll until condition() is true, failing the test after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("timed out waiting for callers to join the flight")
+        time.sleep(0.001)
+
+def _run_callers(flight: SingleFlight, key, fn, count: int):
+    """Call flight.do from count threads; return their results (or exceptions)."""
+    outcomes = [None] * count
+
+    def caller(index: int) -> None:
+        try:
+            outcomes[index] = flight.do(key, fn)
+        except Exception as e:
+            outcomes[index] = e
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    threads, outcomes = _run_callers(flight, "key", load, 8)
+    _wait_for(lambda: flight.stats()["coalesced"] == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert outcomes == ["value"] * 8
+    assert flight.stats() == {"in_flight": 0, "coalesced": 7}
+
+def test_error_reaches_every_waiter_and_releases_key():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    threads, outcomes = _run_callers(flight, "key", fail, 4)
+    _wait_for(lambda: flight.stats()["coalesced"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert flight.stats()["in_flight"] == 0
+
+    # The failed call is not remembered: the next caller runs the function again
+    assert flight.do("key", lambda: "recovered") == "recovered"
+    assert len(calls) == 1
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0
+
+def test_async_concurrent_callers_share_one_call():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await release.wait()
+            return "value"
+
+        waiters = [asyncio.ensure_future(flight.do("key", load)) for _ in range(8)]
+        await asyncio.sleep(0)
+        assert flight.stats() == {"in_flight": 1, "coalesced": 7}
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["value"] * 8
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+def test_async_error_reaches_every_waiter_and_releases_key():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        async def recover():
+            return "recovered"
+
+        waiters = [asyncio.ensure_future(flight.do("key", fail)) for _ in range(4)]
+        await asyncio.sleep(0)
+        release.set()
+
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+        # The failed task is forgotten: the next call runs its own function
+        assert await flight.do("key", recover) == "recovered"
+        await asyncio.sleep(0)
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+def test_async_cancelled_waiter_does_not_cancel_the_call():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(flight.do("key", load))
+        second = asyncio.ensure_future(flight.do("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
@@ -0,0 +1,607 @@
+# utils/ephemeris.py - Analytic lunar and solar ephemeris (Meeus, Astronomical Algorithms)
+
+import math
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+
+from utils.lunar_math import julian_day
+
+# Periodic terms for the Moon's longitude and distance (Meeus Table 47.A)
+# Each row: multipliers of D, M, M', F, then Σl (1e-6 degrees), Σr (1e-3 km)
+MOON_LON_DIST_TERMS = (
+    (0, 0, 1, 0, 6288774, -20905355),
+    (2, 0, -1, 0, 1274027, -3699111),
+    (2, 0, 0, 0, 658314, -2955968),
+    (0, 0, 2, 0, 213618, -569925),
+    (0, 1, 0, 0, -185116, 48888),
+    (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158),
+    (2, -1, -1, 0, 57066, -152138),
+    (2, 0, 1, 0, 53322, -170733),
+    (2, -1, 0, 0, 45758, -204586),
+    (0, 1, -1, 0, -40923, -129620),
+    (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755),
+    (2, 0, 0, -2, 15327, 10321),
+    (0, 0, 1, 2, -12528, 0),
+    (0, 0, 1, -2, 10980, 79661),
+    (4, 0, -1, 0, 10675, -34782),
+    (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636),
+    (2, 1, -1, 0, -7888, 24208),
+    (2, 1, 0, 0, -6766, 30824),
+    (1, 0, -1, 0, -5163, -8379),
+    (1, 1, 0, 0, 4987, -16675),
+    (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445),
+    (4, 0, 0, 0, 3861, -11650),
+    (2, 0, -3, 0, 3665, 14403),
+    (0, 1, -2, 0, -2689, -7003),
+    (2, 0, -1, 2, -2602, 0),
+    (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322),
+    (2, -2, 0, 0, 2236, -9884),
+    (0, 1, 2, 0, -2120, 5751),
+    (0, 2, 0, 0, -2069, 0),
+    (2, -2, -1, 0, 2048, -4950),
+    (2, 0, 1, -2, -1773, 4130),
+    (2, 0, 0, 2, -1595, 0),
+    (4, -1, -1, 0, 1215, -3958),
+    (0, 0, 2, 2, -1110, 0),
+    (3, 0, -1, 0, -892, 3258),
+    (2, 1, 1, 0, -810, 2616),
+    (4, -1, -2, 0, 759, -1897),
+    (0, 2, -1, 0, -713, -2117),
+    (2, 2, -1, 0, -700, 2354),
+    (2, 1, -2, 0, 691, 0),
+    (2, -1, 0, -2, 596, 0),
+    (4, 0, 1, 0, 549, -1423),
+    (0, 0, 4, 0, 537, -1117),
+    (4, -1, 0, 0, 520, -1571),
+    (1, 0, -2, 0, -487, -1739),
+    (2, 1, 0, -2, -399, 0),
+    (0, 0, 2, -2, -381, -4421),
+    (1, 1, 1, 0, 351, 0),
+    (3, 0, -2, 0, -340, 0),
+    (4, 0, -3, 0, 330, 0),
+    (2, -1, 2, 0, 327, 0),
+    (0, 2, 1, 0, -323, 1165),
+    (1, 1, -1, 0, 299, 0),
+    (2, 0, 3, 0, 294, 0),
+    (2, 0, -1, -2, 0, 8752),
+)
+
+# Periodic terms for the Moon's latitude (Meeus Table 47.B)
+# Each row: multipliers of D, M, M', F, then Σb (1e-6 degrees)
+MOON_LAT_TERMS = (
+    (0, 0, 0, 1, 5128122),
+    (0, 0, 1, 1, 280602),
+    (0, 0, 1, -1, 277693),
+    (2, 0, 0, -1, 173237),
+    (2, 0, -1, 1, 55413),
+    (2, 0, -1, -1, 46271),
+    (2, 0, 0, 1, 32573),
+    (0, 0, 2, 1, 17198),
+    (2, 0, 1, -1, 9266),
+    (0, 0, 2, -1, 8822),
+    (2, -1, 0, -1, 8216),
+    (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200),
+    (2, 1, 0, -1, -3359),
+    (2, -1, -1, 1, 2463),
+    (2, -1, 0, 1, 2211),
+    (2, -1, -1, -1, 2065),
+    (0, 1, -1, -1, -1870),
+    (4, 0, -1, -1, 1828),
+    (0, 1, 0, 1, -1794),
+    (0, 0, 0, 3, -1749),
+    (0, 1, -1, 1, -1565),
+    (1, 0, 0, 1, -1491),
+    (0, 1, 1, 1, -1475),
+    (0, 1, 1, -1, -1410),
+    (0, 1, 0, -1, -1344),
+    (1, 0, 0, -1, -1335),
+    (0, 0, 3, 1, 1107),
+    (4, 0, 0, -1, 1021),
+    (4, 0, -1, 1, 833),
+    (0, 0, 1, -3, 777),
+    (4, 0, -2, 1, 671),
+    (2, 0, 0, -3, 607),
+    (2, 0, 2, -1, 596),
+    (2, -1, 1, -1, 491),
+    (2, 0, -2, 1, -451),
+    (0, 0, 3, -1, 439),
+    (2, 0, 2, 1, 422),
+    (2, 0, -3, -1, 421),
+    (2, 1, -1, 1, -366),
+    (2, 1, 0, 1, -351),
+    (4, 0, 0, 1, 331),
+    (2, -1, 1, 1, 315),
+    (2, -2, 0, -1, 302),
+    (0, 0, 1, 3, -283),
+    (2, 1, 1, -1, -229),
+    (1, 1, 0, -1, 223),
+    (1, 1, 0, 1, 223),
+    (0, 1, -2, -1, -220),
+    (2, 1, -1, -1, -220),
+    (1, 0, 1, 1, -185),
+    (2, -1, -2, -1, 181),
+    (0, 1, 2, 1, -177),
+    (4, 0, -2, -1, 176),
+    (4, -1, -1, -1, 166),
+    (1, 0, 1, -1, -164),
+    (4, 0, 1, -1, 132),
+    (1, 0, -1, -1, -119),
+    (4, -1, 0, -1, 115),
+    (2, -2, 0, 1, 107),
+)
+
+EARTH_RADIUS_KM = 6378.14
+AU_KM = 149597870.7
+SYNODIC_MONTH = 29.530588853  # Mean length of a lunation in days
+
+# Half-width (degrees of elongation) within which a principal phase name is used
+PRINCIPAL_PHASE_WINDOW = 6.0
+
+def datetime_to_jd(date: datetime) -> float:
+    """
+    Convert a datetime to a Julian day in Universal Time.
+
+    Naive datetimes are taken as local time, matching datetime.now().
+
+    Args:
+        date: Python datetime object
+
+    Returns:
+        Julian day (UT) as float
+    """
+    if date.tzinfo is None:
+        date = date.astimezone()
+    utc = date.astimezone(timezone.utc)
+    return julian_day(utc) + utc.microsecond / 86400e6
+
+def delta_t(year: float) -> float:
+    """
+    Approximate TT - UT in seconds (Espenak & Meeus polynomial fits).
+
+    Args:
+        year: Decimal year
+
+    Returns:
+        Delta T in seconds
+    """
+    if 2005 <= year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t * t
+    if 1986 <= year < 2005:
+        t = year - 2000
+        return (63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3
+                + 0.000651814 * t ** 4 + 0.00002373599 * t ** 5)
+    if 1900 <= year < 1986:
+        t = year - 1900
+        if year < 1920:
+            return -2.79 + 1.494119 * t - 0.0598939 * t ** 2 + 0.0061966 * t ** 3 - 0.000197 * t ** 4
+        if year < 1941:
+            t = year - 1920
+            return 21.20 + 0.84493 * t - 0.076100 * t ** 2 + 0.0020936 * t ** 3
+        if year < 1961:
+            t = year - 1950
+            return 29.07 + 0.407 * t - t ** 2 / 233 + t ** 3 / 2547
+        t = year - 1975
+        return 45.45 + 1.067 * t - t ** 2 / 260 - t ** 3 / 718
+    if 2050 <= year < 2150:
+        return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+    return -20 + 32 * ((year - 1820) / 100) ** 2
+
+def jd_to_tt(jd_ut: float) -> float:
+    """Convert a UT Julian day to Terrestrial Time."""
+    year = 2000.0 + (jd_ut - 2451545.0) / 365.25
+    return jd_ut + delta_t(year) / 86400.0
+
+def nutation(T: float) -> Tuple[float, float]:
+    """
+    Low-precision nutation in longitude and obliquity (Meeus ch. 22).
+
+    Args:
+        T: Julian centuries (TT) since J2000.0
+
+    Returns:
+        Tuple of (Δψ, Δε) in degrees
+    """
+    omega = math.radians(125.04452 - 1934.136261 * T)
+    L_sun = math.radians(280.4665 + 36000.7698 * T)
+    L_moon = math.radians(218.3165 + 481267.8813 * T)
+
+    dpsi = (-17.20 * math.sin(omega) - 1.32 * math.sin(2 * L_sun)
+            - 0.23 * math.sin(2 * L_moon) + 0.21 * math.sin(2 * omega))
+    deps = (9.20 * math.cos(omega) + 0.57 * math.cos(2 * L_sun)
+            + 0.10 * math.cos(2 * L_moon) - 0.09 * math.cos(2 * omega))
+    return dpsi / 3600.0, deps / 3600.0
+
+def mean_obliquity(T: float) -> float:
+    """
+    Mean obliquity of the ecliptic (Meeus 22.2).
+
+    Args:
+        T: Julian centuries (TT) since J2000.0
+
+    Returns:
+        Obliquity in degrees
+    """
+    return 23.4392911111 - (46.8150 * T + 0.00059 * T * T - 0.001813 * T ** 3) / 3600.0
+
+def moon_fundamental_arguments(T: float) -> Tuple[float, float, float, float, float]:
+    """
+    Fundamental arguments of the lunar theory (Meeus 47.1-47.5).
+
+    Args:
+        T: Julian centuries (TT) since J2000.0
+
+    Returns:
+        Tuple of (L', D, M, M', F) in degrees, reduced to 0-360
+    """
+    T2, T3, T4 = T * T, T ** 3, T ** 4
+    L = 218.3164477 + 481267.88123421 * T - 0.0015786 * T2 + T3 / 538841 - T4 / 65194000
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T2 + T3 / 545868 - T4 / 113065000
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T2 + T3 / 24490000
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T2 + T3 / 69699 - T4 / 14712000
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T2 - T3 / 3526000 + T4 / 863310000
+    return L % 360, D % 360, M % 360, Mp % 360, F % 360
+
+def moon_ecliptic(T: float) -> Tuple[float, float, float]:
+    """
+    Geometric geocentric ecliptic position of the Moon (Meeus ch. 47).
+
+    Args:
+        T: Julian centuries (TT) since J2000.0
+
+    Returns:
+        Tuple of (longitude in degrees, latitude in degrees, distance in km),
+        referred to the mean equinox of date
+    """
+    L, D, M, Mp, F = moon_fundamental_arguments(T)
+    E = 1 - 0.002516 * T - 0.0000074 * T * T
+    E2 = E * E
+
+    Lr, Dr, Mr, Mpr, Fr = (math.radians(x) for x in (L, D, M, Mp, F))
+    A1 = math.radians((119.75 + 131.849 * T) % 360)
+    A2 = math.radians((53.09 + 479264.290 * T) % 360)
+    A3 = math.radians((313.45 + 481266.484 * T) % 360)
+
+    sum_l = 0.0
+    sum_r = 0.0
+    for d, m, mp, f, coeff_l, coeff_r in MOON_LON_DIST_TERMS:
+        arg = d * Dr + m * Mr + mp * Mpr + f * Fr
+        eccentricity = E if abs(m) == 1 else E2 if abs(m) == 2 else 1.0
+        sum_l += coeff_l * eccentricity * math.sin(arg)
+        sum_r += coeff_r * eccentricity * math.cos(arg)
+
+    sum_b = 0.0
+    for d, m, mp, f, coeff_b in MOON_LAT_TERMS:
+        arg = d * Dr + m * Mr + mp * Mpr + f * Fr
+        eccentricity = E if abs(m) == 1 else E2 if abs(m) == 2 else 1.0
+        sum_b += coeff_b * eccentricity * math.sin(arg)
+
+    # Additive terms for Venus, Jupiter and the Earth's flattening
+    sum_l += 3958 * math.sin(A1) + 1962 * math.sin(Lr - Fr) + 318 * math.sin(A2)
+    sum_b += (-2235 * math.sin(Lr) + 382 * math.sin(A3) + 175 * math.sin(A1 - Fr)
+              + 175 * math.sin(A1 + Fr) + 127 * math.sin(Lr - Mpr) - 115 * math.sin(Lr + Mpr))
+
+    longitude = (L + sum_l / 1e6) % 360
+    latitude = sum_b / 1e6
+    distance = 385000.56 + sum_r / 1000.0
+    return longitude, latitude, distance
+
+def sun_ecliptic(T: float) -> Tuple[float, float]:
+    """
+    Low-precision geocentric position of the Sun (Meeus ch. 25).
+
+    Args:
+        T: Julian centuries (TT) since J2000.0
+
+    Returns:
+        Tuple of (true longitude in degrees, distance in km), referred to
+        the mean equinox of date
+    """
+    L0 = 280.46646 + 36000.76983 * T + 0.0003032 * T * T
+    M = math.radians((357.52911 + 35999.05029 * T - 0.0001537 * T * T) % 360)
+    e = 0.016708634 - 0.000042037 * T - 0.0000001267 * T * T
+
+    C = ((1.914602 - 0.004817 * T - 0.000014 * T * T) * math.sin(M)
+         + (0.019993 - 0.000101 * T) * math.sin(2 * M)
+         + 0.000289 * math.sin(3 * M))
+
+    true_longitude = (L0 + C) % 360
+    true_anomaly = M + math.radians(C)
+    radius_au = 1.000001018 * (1 - e * e) / (1 + e * math.cos(true_anomaly))
+    return true_longitude, radius_au * AU_KM
+
+def ecliptic_to_equatorial(longitude: float, latitude: float, obliquity: float) -> Tuple[float, float]:
+    """
+    Convert ecliptic coordinates to equatorial coordinates.
+
+    Args:
+        longitude: Ecliptic longitude in degrees
+        latitude: Ecliptic latitude in degrees
+        obliquity: Obliquity of the ecliptic in degrees
+
+    Returns:
+        Tuple of (right ascension, declination) in degrees
+    """
+    lam = math.radians(longitude)
+    beta = math.radians(latitude)
+    eps = math.radians(obliquity)
+
+    ra = math.atan2(math.sin(lam) * math.cos(eps) - math.tan(beta) * math.sin(eps), math.cos(lam))
+    dec = math.asin(math.sin(beta) * math.cos(eps) + math.cos(beta) * math.sin(eps) * math.sin(lam))
+    return math.degrees(ra) % 360, math.degrees(dec)
+
+def sidereal_time(jd_ut: float, nutation_longitude: float = 0.0, obliquity: float = 0.0) -> float:
+    """
+    Greenwich sidereal time (Meeus 12.4), apparent when nutation is given.
+
+    Args:
+        jd_ut: Julian day (UT)
+        nutation_longitude: Nutation in longitude Δψ in degrees
+        obliquity: True obliquity of the ecliptic in degrees
+
+    Returns:
+        Sidereal time in degrees
+    """
+    T = (jd_ut - 2451545.0) / 36525.0
+    gmst = (280.46061837 + 360.98564736629 * (jd_ut - 2451545.0)
+            + 0.000387933 * T * T - T ** 3 / 38710000.0)
+    return (gmst + nutation_longitude * math.cos(math.radians(obliquity))) % 360
+
+def phase_name(elongation: float) -> str:
+    """
+    Name the lunar phase for a Sun-Moon elongation.
+
+    Args:
+        elongation: Moon minus Sun ecliptic longitude in degrees (0 = new)
+
+    Returns:
+        Phase name, matching the Astronomy API's phase strings
+    """
+    angle = elongation % 360
+    principal = (("New Moon", 0), ("First Quarter", 90), ("Full Moon", 180),
+                 ("Last Quarter", 270), ("New Moon", 360))
+    for name, center in principal:
+        if abs(angle - center) <= PRINCIPAL_PHASE_WINDOW:
+            return name
+
+    if angle < 90:
+        return "Waxing Crescent"
+    if angle < 180:
+        return "Waxing Gibbous"
+    if angle < 270:
+        return "Waning Gibbous"
+    return "Waning Crescent"
+
+def geocentric_state(jd_ut: float) -> Dict[str, float]:
+    """
+    Observer-independent state of the Moon at an instant.
+
+    Args:
+        jd_ut: Julian day (UT)
+
+    Returns:
+        Dictionary with apparent geocentric right ascension and declination
+        (degrees), distance (km), elongation from the Sun (degrees, 0 = new),
+        phase angle (degrees), illuminated fraction (0-1), ecliptic
+        coordinates, true obliquity, nutation and apparent sidereal time
+    """
+    T = (jd_to_tt(jd_ut) - 2451545.0) / 36525.0
+
+    moon_lon, moon_lat, distance = moon_ecliptic(T)
+    sun_lon, sun_distance = sun_ecliptic(T)
+
+    dpsi, deps = nutation(T)
+    obliquity = mean_obliquity(T) + deps
+
+    # Apparent longitudes (the Sun also gets its 20.5" aberration)
+    moon_lon = (moon_lon + dpsi) % 360
+    sun_lon = (sun_lon + dpsi - 0.005691611) % 360
+
+    ra, dec = ecliptic_to_equatorial(moon_lon, moon_lat, obliquity)
+
+    # Geocentric elongation ψ and phase angle i (Meeus 48.2, 48.3)
+    beta = math.radians(moon_lat)
+    cos_psi = math.cos(beta) * math.cos(math.radians(moon_lon - sun_lon))
+    psi = math.acos(max(-1.0, min(1.0, cos_psi)))
+    phase_angle = math.atan2(sun_distance * math.sin(psi), distance - sun_distance * math.cos(psi))
+    illumination = (1 + math.cos(phase_angle)) / 2
+
+    return {
+        "jd": jd_ut,
+        "right_ascension": ra,
+        "declination": dec,
+        "distance_km": distance,
+        "ecliptic_longitude": moon_lon,
+        "ecliptic_latitude": moon_lat,
+        "sun_longitude": sun_lon,
+        "elongation": (moon_lon - sun_lon) % 360,
+        "phase_angle": math.degrees(phase_angle),
+        "illumination": illumination,
+        "obliquity": obliquity,
+        "nutation_longitude": dpsi,
+        "sidereal_time": sidereal_time(jd_ut, dpsi, obliquity)
+    }
+
+def geocentric_rates(jd_ut: float, step: float = 1 / 24) -> Dict[str, float]:
+    """
+    Rates of change of the Moon's geocentric position around an instant.
+
+    Central differences of geocentric_state over +/- step, good for moving
+    a position sampled at jd_ut by up to an hour or so either way.
+
+    Args:
+        jd_ut: Julian day (UT)
+        step: Half-width of the difference in days
+
+    Returns:
+        Dictionary with right_ascension_rate, declination_rate (degrees
+        per day) and distance_rate (km per day)
+    """
+    before = geocentric_state(jd_ut - step)
+    after = geocentric_state(jd_ut + step)
+    delta_ra = (after["right_ascension"] - before["right_ascension"] + 180) % 360 - 180
+    return {
+        "right_ascension_rate": delta_ra / (2 * step),
+        "declination_rate": (after["declination"] - before["declination"]) / (2 * step),
+        "distance_rate": (after["distance_km"] - before["distance_km"]) / (2 * step)
+    }
+
+def topocentric_state(geo: Dict[str, float], latitude: float, longitude: float,
+                      elevation: float = 0.0, jd_ut: float = None) -> Dict[str, float]:
+    """
+    Observer-dependent part of the Moon's position (Meeus ch. 13 and 40).
+
+    Args:
+        geo: Result of geocentric_state
+        latitude: Observer latitude in degrees
+        longitude: Observer longitude in degrees (east positive)
+        elevation: Observer height above sea level in metres
+        jd_ut: Observation time if different from geo["jd"]; the sidereal
+            time is advanced accordingly, and so is the Moon's geocentric
+            position when geo carries its rates of change (see
+            geocentric_rates), otherwise the position is reused
+
+    Returns:
+        Dictionary with topocentric right ascension and declination,
+        hour angle, altitude and azimuth (degrees, azimuth from north
+        through east), horizontal parallax and topocentric distance
+    """
+    gst = geo["sidereal_time"]
+    if jd_ut is not None and jd_ut != geo["jd"]:
+        days = jd_ut - geo["jd"]
+        gst = (gst + 360.98564736629 * days) % 360
+        if "right_ascension_rate" in geo:
+            geo = {
+                **geo,
+                "right_ascension": (geo["right_ascension"] + geo["right_ascension_rate"] * days) % 360,
+                "declination": geo["declination"] + geo["declination_rate"] * days,
+                "distance_km": geo["distance_km"] + geo["distance_rate"] * days
+            }
+
+    phi = math.radians(latitude)
+    ra = math.radians(geo["right_ascension"])
+    dec = math.radians(geo["declination"])
+    hour_angle = math.radians((gst + longitude) % 360) - ra
+
+    # Observer's geocentric coordinates on the reference ellipsoid
+    u = math.atan(0.99664719 * math.tan(phi))
+    rho_sin = 0.99664719 * math.sin(u) + elevation / 6378140.0 * math.sin(phi)
+    rho_cos = math.cos(u) + elevation / 6378140.0 * math.cos(phi)
+
+    sin_parallax = EARTH_RADIUS_KM / geo["distance_km"]
+
+    # Parallax in right ascension and declination
+    denominator = math.cos(dec) - rho_cos * sin_parallax * math.cos(hour_angle)
+    delta_ra = math.atan2(-rho_cos * sin_parallax * math.sin(hour_angle), denominator)
+    topo_dec = math.atan2((math.sin(dec) - rho_sin * sin_parallax) * math.cos(delta_ra), denominator)
+    topo_ha = hour_angle - delta_ra
+
+    altitude = math.asin(math.sin(phi) * math.sin(topo_dec)
+                         + math.cos(phi) * math.cos(topo_dec) * math.cos(topo_ha))
+    azimuth = math.atan2(math.sin(topo_ha),
+                         math.cos(topo_ha) * math.sin(phi) - math.tan(topo_dec) * math.cos(phi))
+
+    # Distance from the observer rather than from the Earth's centre
+    x = math.cos(dec) * math.cos(hour_angle) - rho_cos * sin_parallax
+    y = math.cos(dec) * math.sin(hour_angle)
+    z = math.sin(dec) - rho_sin * sin_parallax
+    topo_distance = geo["distance_km"] * math.sqrt(x * x + y * y + z * z)
+
+    return {
+        "right_ascension": (geo["right_ascension"] + math.degrees(delta_ra)) % 360,
+        "declination": math.degrees(topo_dec),
+        "hour_angle": math.degrees(topo_ha) % 360,
+        "altitude": math.degrees(altitude),
+        "azimuth": (math.degrees(azimuth) + 180) % 360,
+        "parallax": math.degrees(math.asin(sin_parallax)),
+        "distance_km": topo_distance
+    }
+
+def horizontal_to_equatorial(altitude: float, azimuth: float, latitude: float) -> Tuple[float, float]:
+    """
+    Hour angle and declination of a point seen at a given altitude and azimuth.
+
+    Args:
+        altitude: Altitude in degrees
+        azimuth: Azimuth in degrees from north through east
+        latitude: Observer latitude in degrees
+
+    Returns:
+        Tuple of (hour angle, declination) in degrees
+    """
+    phi = math.radians(latitude)
+    h = math.radians(altitude)
+    A = math.radians(azimuth)
+
+    dec = math.asin(math.sin(phi) * math.sin(h) + math.cos(phi) * math.cos(h) * math.cos(A))
+    hour_angle = math.atan2(-math.sin(A) * math.cos(h),
+                            math.cos(phi) * math.sin(h) - math.sin(phi) * math.cos(h) * math.cos(A))
+    return math.degrees(hour_angle) % 360, math.degrees(dec)
+
+def geocentric_from_topocentric(right_ascension: float, declination: float, altitude: float,
+                                azimuth: float, distance_km: float, latitude: float, longitude: float,
+                                elevation: float = 0.0, iterations: int = 4) -> Dict[str, float]:
+    """
+    Recover the observer-independent position from one observer's view.
+
+    The sidereal time is read off the observer's horizontal coordinates
+    (local sidereal time = hour angle + right ascension), so the result does
+    not depend on knowing the time zone of the observation. The parallax is
+    then removed by fixed-point iteration on topocentric_state.
+
+    Args:
+        right_ascension: Topocentric right ascension in degrees
+        declination: Topocentric declination in degrees
+        altitude: Topocentric altitude in degrees
+        azimuth: Topocentric azimuth in degrees from north through east
+        distance_km: Geocentric distance in km
+        latitude: Observer latitude in degrees
+        longitude: Observer longitude in degrees (east positive)
+        elevation: Observer height above sea level in metres
+        iterations: Parallax refinement steps (each gains ~2 orders of magnitude)
+
+    Returns:
+        Dictionary with geocentric right ascension and declination,
+        distance and Greenwich sidereal time (degrees), accepted as the geo
+        argument of topocentric_state
+    """
+    hour_angle, _ = horizontal_to_equatorial(altitude, azimuth, latitude)
+    geo = {
+        "right_ascension": right_ascension,
+        "declination": declination,
+        "distance_km": distance_km,
+        "sidereal_time": (hour_angle + right_ascension - longitude) % 360
+    }
+
+    for _ in range(iterations):
+        topo = topocentric_state(geo, latitude, longitude, elevation)
+        delta_ra = (right_ascension - topo["right_ascension"] + 180) % 360 - 180
+        geo["right_ascension"] = (geo["right_ascension"] + delta_ra) % 360
+        geo["declination"] += declination - topo["declination"]
+
+    return geo
+
+def moon_state(jd_ut: float, latitude: float, longitude: float, elevation: float = 0.0) -> Dict[str, Dict[str, float]]:
+    """
+    Full geocentric and topocentric state of the Moon for one observer.
+
+    Args:
+        jd_ut: Julian day (UT)
+        latitude: Observer latitude in degrees
+        longitude: Observer longitude in degrees (east positive)
+        elevation: Observer height above sea level in metres
+
+    Returns:
+        Dictionary with "geocentric" and "topocentric" sub-dictionaries
+    """
+    geo = geocentric_state(jd_ut)
+    return {
+        "geocentric": geo,
+        "topocentric": topocentric_state(geo, latitude, longitude, elevation)
+    }
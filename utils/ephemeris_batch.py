@@ -0,0 +1,248 @@
+# utils/ephemeris_batch.py - NumPy-vectorized lunar ephemeris over arrays of times and observers
+
+from typing import Dict, Union
+
+import numpy as np
+
+from utils.ephemeris import (
+    AU_KM,
+    EARTH_RADIUS_KM,
+    MOON_LAT_TERMS,
+    MOON_LON_DIST_TERMS,
+    delta_t,
+)
+
+ArrayLike = Union[np.ndarray, float, list]
+
+_UNIX_EPOCH_JD = 2440587.5
+
+# Periodic term tables split into argument multipliers and coefficients
+_LON_DIST = np.array(MOON_LON_DIST_TERMS, dtype=np.float64)
+_LAT = np.array(MOON_LAT_TERMS, dtype=np.float64)
+
+# Delta T tabulated yearly so it can be interpolated for whole arrays at once
+_DELTA_T_YEARS = np.arange(1600.0, 2201.0)
+_DELTA_T_VALUES = np.array([delta_t(year) for year in _DELTA_T_YEARS])
+
+def to_julian_days(times: ArrayLike) -> np.ndarray:
+    """
+    Convert an array of times to UT Julian days.
+
+    Args:
+        times: datetime64 values (taken as UTC) or floats already in Julian days
+
+    Returns:
+        float64 array of Julian days (UT)
+    """
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        seconds = (times - np.datetime64("1970-01-01T00:00:00")) / np.timedelta64(1, "s")
+        return _UNIX_EPOCH_JD + seconds / 86400.0
+    return times.astype(np.float64)
+
+def _centuries_tt(jd_ut: np.ndarray) -> np.ndarray:
+    """Julian centuries (TT) since J2000.0 for UT Julian days."""
+    years = 2000.0 + (jd_ut - 2451545.0) / 365.25
+    jd_tt = jd_ut + np.interp(years, _DELTA_T_YEARS, _DELTA_T_VALUES) / 86400.0
+    return (jd_tt - 2451545.0) / 36525.0
+
+def _series(T: np.ndarray):
+    """Vectorized Meeus ch. 47 series; see utils.ephemeris.moon_ecliptic."""
+    T2, T3, T4 = T * T, T ** 3, T ** 4
+    L = 218.3164477 + 481267.88123421 * T - 0.0015786 * T2 + T3 / 538841 - T4 / 65194000
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T2 + T3 / 545868 - T4 / 113065000
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T2 + T3 / 24490000
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T2 + T3 / 69699 - T4 / 14712000
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T2 - T3 / 3526000 + T4 / 863310000
+    L, D, M, Mp, F = (np.mod(x, 360.0) for x in (L, D, M, Mp, F))
+
+    E = 1 - 0.002516 * T - 0.0000074 * T2
+    Lr, Dr, Mr, Mpr, Fr = (np.radians(x) for x in (L, D, M, Mp, F))
+
+    sum_l = np.zeros_like(T)
+    sum_r = np.zeros_like(T)
+    sum_b = np.zeros_like(T)
+
+    # One vectorized pass per term keeps memory at O(len(T)) for large batches
+    for d, m, mp, f, coeff_l, coeff_r in _LON_DIST:
+        arg = d * Dr + m * Mr + mp * Mpr + f * Fr
+        scale = E ** abs(m)
+        sum_l += coeff_l * scale * np.sin(arg)
+        sum_r += coeff_r * scale * np.cos(arg)
+
+    for d, m, mp, f, coeff_b in _LAT:
+        arg = d * Dr + m * Mr + mp * Mpr + f * Fr
+        sum_b += coeff_b * E ** abs(m) * np.sin(arg)
+
+    A1 = np.radians(np.mod(119.75 + 131.849 * T, 360.0))
+    A2 = np.radians(np.mod(53.09 + 479264.290 * T, 360.0))
+    A3 = np.radians(np.mod(313.45 + 481266.484 * T, 360.0))
+    sum_l += 3958 * np.sin(A1) + 1962 * np.sin(Lr - Fr) + 318 * np.sin(A2)
+    sum_b += (-2235 * np.sin(Lr) + 382 * np.sin(A3) + 175 * np.sin(A1 - Fr)
+              + 175 * np.sin(A1 + Fr) + 127 * np.sin(Lr - Mpr) - 115 * np.sin(Lr + Mpr))
+
+    longitude = np.mod(L + sum_l / 1e6, 360.0)
+    latitude = sum_b / 1e6
+    distance = 385000.56 + sum_r / 1000.0
+    return longitude, latitude, distance
+
+def _sun(T: np.ndarray):
+    """Vectorized low-precision solar position; see utils.ephemeris.sun_ecliptic."""
+    L0 = 280.46646 + 36000.76983 * T + 0.0003032 * T * T
+    M = np.radians(np.mod(357.52911 + 35999.05029 * T - 0.0001537 * T * T, 360.0))
+    e = 0.016708634 - 0.000042037 * T - 0.0000001267 * T * T
+    C = ((1.914602 - 0.004817 * T - 0.000014 * T * T) * np.sin(M)
+         + (0.019993 - 0.000101 * T) * np.sin(2 * M)
+         + 0.000289 * np.sin(3 * M))
+    true_longitude = np.mod(L0 + C, 360.0)
+    radius_au = 1.000001018 * (1 - e * e) / (1 + e * np.cos(M + np.radians(C)))
+    return true_longitude, radius_au * AU_KM
+
+def geocentric_batch(jd_ut: ArrayLike) -> Dict[str, np.ndarray]:
+    """
+    Observer-independent lunar state for an array of instants.
+
+    Args:
+        jd_ut: Julian days (UT)
+
+    Returns:
+        Dictionary of float64 arrays, keyed like utils.ephemeris.geocentric_state
+    """
+    jd_ut = np.asarray(jd_ut, dtype=np.float64)
+    T = _centuries_tt(jd_ut)
+
+    moon_lon, moon_lat, distance = _series(T)
+    sun_lon, sun_distance = _sun(T)
+
+    omega = np.radians(125.04452 - 1934.136261 * T)
+    L_sun = np.radians(280.4665 + 36000.7698 * T)
+    L_moon = np.radians(218.3165 + 481267.8813 * T)
+    dpsi = (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * L_sun)
+            - 0.23 * np.sin(2 * L_moon) + 0.21 * np.sin(2 * omega)) / 3600.0
+    deps = (9.20 * np.cos(omega) + 0.57 * np.cos(2 * L_sun)
+            + 0.10 * np.cos(2 * L_moon) - 0.09 * np.cos(2 * omega)) / 3600.0
+    obliquity = 23.4392911111 - (46.8150 * T + 0.00059 * T * T - 0.001813 * T ** 3) / 3600.0 + deps
+
+    moon_lon = np.mod(moon_lon + dpsi, 360.0)
+    sun_lon = np.mod(sun_lon + dpsi - 0.005691611, 360.0)
+
+    lam, beta, eps = np.radians(moon_lon), np.radians(moon_lat), np.radians(obliquity)
+    ra = np.mod(np.degrees(np.arctan2(np.sin(lam) * np.cos(eps) - np.tan(beta) * np.sin(eps),
+                                      np.cos(lam))), 360.0)
+    dec = np.degrees(np.arcsin(np.sin(beta) * np.cos(eps) + np.cos(beta) * np.sin(eps) * np.sin(lam)))
+
+    cos_psi = np.cos(beta) * np.cos(np.radians(moon_lon - sun_lon))
+    psi = np.arccos(np.clip(cos_psi, -1.0, 1.0))
+    phase_angle = np.arctan2(sun_distance * np.sin(psi), distance - sun_distance * np.cos(psi))
+
+    Tu = (jd_ut - 2451545.0) / 36525.0
+    gmst = (280.46061837 + 360.98564736629 * (jd_ut - 2451545.0)
+            + 0.000387933 * Tu * Tu - Tu ** 3 / 38710000.0)
+
+    return {
+        "jd": jd_ut,
+        "right_ascension": ra,
+        "declination": dec,
+        "distance_km": distance,
+        "ecliptic_longitude": moon_lon,
+        "ecliptic_latitude": moon_lat,
+        "sun_longitude": sun_lon,
+        "elongation": np.mod(moon_lon - sun_lon, 360.0),
+        "phase_angle": np.degrees(phase_angle),
+        "illumination": (1 + np.cos(phase_angle)) / 2,
+        "obliquity": obliquity,
+        "nutation_longitude": dpsi,
+        "sidereal_time": np.mod(gmst + dpsi * np.cos(eps), 360.0)
+    }
+
+def topocentric_batch(geo: Dict[str, np.ndarray], latitudes: ArrayLike, longitudes: ArrayLike,
+                      elevation: ArrayLike = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Observer-dependent lunar state, broadcasting geocentric arrays against observers.
+
+    Args:
+        geo: Result of geocentric_batch
+        latitudes: Observer latitudes in degrees
+        longitudes: Observer longitudes in degrees (east positive)
+        elevation: Observer heights above sea level in metres
+
+    Returns:
+        Dictionary of float64 arrays, keyed like utils.ephemeris.topocentric_state
+    """
+    phi = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.asarray(longitudes, dtype=np.float64)
+    elevation = np.asarray(elevation, dtype=np.float64)
+
+    ra = np.radians(geo["right_ascension"])
+    dec = np.radians(geo["declination"])
+    hour_angle = np.radians(np.mod(geo["sidereal_time"] + lon, 360.0)) - ra
+
+    u = np.arctan(0.99664719 * np.tan(phi))
+    rho_sin = 0.99664719 * np.sin(u) + elevation / 6378140.0 * np.sin(phi)
+    rho_cos = np.cos(u) + elevation / 6378140.0 * np.cos(phi)
+
+    sin_parallax = EARTH_RADIUS_KM / geo["distance_km"]
+
+    denominator = np.cos(dec) - rho_cos * sin_parallax * np.cos(hour_angle)
+    delta_ra = np.arctan2(-rho_cos * sin_parallax * np.sin(hour_angle), denominator)
+    topo_dec = np.arctan2((np.sin(dec) - rho_sin * sin_parallax) * np.cos(delta_ra), denominator)
+    topo_ha = hour_angle - delta_ra
+
+    altitude = np.arcsin(np.sin(phi) * np.sin(topo_dec) + np.cos(phi) * np.cos(topo_dec) * np.cos(topo_ha))
+    azimuth = np.arctan2(np.sin(topo_ha), np.cos(topo_ha) * np.sin(phi) - np.tan(topo_dec) * np.cos(phi))
+
+    x = np.cos(dec) * np.cos(hour_angle) - rho_cos * sin_parallax
+    y = np.cos(dec) * np.sin(hour_angle)
+    z = np.sin(dec) - rho_sin * sin_parallax
+
+    return {
+        "right_ascension": np.mod(geo["right_ascension"] + np.degrees(delta_ra), 360.0),
+        "declination": np.degrees(topo_dec),
+        "hour_angle": np.mod(np.degrees(topo_ha), 360.0),
+        "altitude": np.degrees(altitude),
+        "azimuth": np.mod(np.degrees(azimuth) + 180.0, 360.0),
+        "parallax": np.degrees(np.arcsin(sin_parallax)),
+        "distance_km": geo["distance_km"] * np.sqrt(x * x + y * y + z * z)
+    }
+
+def moon_positions_batch(times: ArrayLike, latitudes: ArrayLike, longitudes: ArrayLike,
+                         elevation: ArrayLike = 0.0, dtype=np.float64) -> Dict[str, np.ndarray]:
+    """
+    Compute lunar state for many (time, observer) combinations in one pass.
+
+    Inputs broadcast against each other with the usual NumPy rules, so a
+    column of times against a row of observers yields a time x observer
+    grid. The series are always evaluated in float64 (the arguments grow by
+    ~480000 degrees per century); dtype only controls the output arrays.
+
+    Args:
+        times: datetime64 values (UTC) or Julian days (UT)
+        latitudes: Observer latitudes in degrees
+        longitudes: Observer longitudes in degrees (east positive)
+        elevation: Observer heights above sea level in metres
+        dtype: Floating-point type of the returned arrays (float32 or float64)
+
+    Returns:
+        Dictionary of columnar arrays: altitude, azimuth, right_ascension,
+        declination (topocentric, degrees), distance_km (geocentric),
+        illumination (fraction 0-1), phase_angle and elongation (degrees)
+    """
+    jd = to_julian_days(times)
+    geo = geocentric_batch(jd)
+    topo = topocentric_batch(geo, latitudes, longitudes, elevation)
+
+    shape = np.broadcast_shapes(jd.shape, np.shape(latitudes), np.shape(longitudes), np.shape(elevation))
+
+    def column(values: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(values, shape).astype(dtype)
+
+    return {
+        "altitude": column(topo["altitude"]),
+        "azimuth": column(topo["azimuth"]),
+        "right_ascension": column(topo["right_ascension"]),
+        "declination": column(topo["declination"]),
+        "distance_km": column(geo["distance_km"]),
+        "illumination": column(geo["illumination"]),
+        "phase_angle": column(geo["phase_angle"]),
+        "elongation": column(geo["elongation"])
+    }
@@ -2,7 +2,18 @@
 
 import math
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from utils.phase_table import next_phase_event
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the array variants
+    np = None
+
+# Fields of the structured array returned by calculate_libration_array
+LIBRATION_FIELDS = ("longitude", "latitude", "total", "longitudinal_only",
+                    "latitudinal_only", "diurnal_longitude", "diurnal_latitude")
 
 class LunarMath:
     """Calculate lunar libration and orientation effects."""
@@ -120,6 +131,105 @@ class LunarMath:
             # Return 0 if calculation fails (e.g., moon at zenith)
             return 0.0
 
+    @staticmethod
+    def calculate_libration_array(julian_days, longitudes, latitudes, structured: bool = False):
+        """
+        Array version of calculate_libration.
+        
+        Inputs broadcast against each other, so a month of Julian days can be
+        evaluated for one observer (or many) in a single vectorized pass.
+        
+        Args:
+            julian_days: Array of Julian day numbers
+            longitudes: Observer longitudes in degrees
+            latitudes: Observer latitudes in degrees
+            structured: Return a NumPy structured array instead of a dict
+            
+        Returns:
+            Dictionary of float64 arrays with the same keys as
+            calculate_libration, or a structured array with those fields
+        """
+        if np is None:
+            raise ImportError("NumPy is required for calculate_libration_array")
+        
+        jd = np.asarray(julian_days, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        
+        # Time since J2000.0 in centuries
+        T = (jd - 2451545.0) / 36525.0
+        
+        # Same fundamental arguments as the scalar version, in radians
+        M_moon_rad = np.radians(np.mod(134.963 + 477198.868 * T, 360))
+        M_sun_rad = np.radians(np.mod(357.529 + 35999.050 * T, 360))
+        F_rad = np.radians(np.mod(93.272 + 483202.019 * T, 360))
+        
+        lib_lon = (-1.274 * np.sin(M_moon_rad - 2 * F_rad)
+                   + 0.658 * np.sin(-2 * F_rad)
+                   - 0.186 * np.sin(M_sun_rad)
+                   - 0.059 * np.sin(2 * M_moon_rad - 2 * F_rad)
+                   - 0.057 * np.sin(M_moon_rad - 2 * F_rad + M_sun_rad))
+        
+        lib_lat = (-0.173 * np.sin(F_rad - 2 * F_rad)
+                   - 0.055 * np.sin(M_moon_rad - F_rad - 2 * F_rad)
+                   - 0.046 * np.sin(M_moon_rad + F_rad - 2 * F_rad)
+                   + 0.033 * np.sin(F_rad + 2 * F_rad))
+        
+        shape = np.broadcast_shapes(jd.shape, longitudes.shape, latitudes.shape)
+        diurnal_lon = np.broadcast_to(longitudes * 0.0003, shape)
+        diurnal_lat = np.broadcast_to(latitudes * 0.0002, shape)
+        lib_lon = np.broadcast_to(lib_lon, shape)
+        lib_lat = np.broadcast_to(lib_lat, shape)
+        
+        total_lon = lib_lon + diurnal_lon
+        total_lat = lib_lat + diurnal_lat
+        
+        columns = {
+            "longitude": total_lon,
+            "latitude": total_lat,
+            "total": np.hypot(total_lon, total_lat),
+            "longitudinal_only": lib_lon,
+            "latitudinal_only": lib_lat,
+            "diurnal_longitude": diurnal_lon,
+            "diurnal_latitude": diurnal_lat
+        }
+        
+        if not structured:
+            return {key: np.array(value) for key, value in columns.items()}
+        
+        result = np.empty(shape, dtype=[(name, np.float64) for name in LIBRATION_FIELDS])
+        for name in LIBRATION_FIELDS:
+            result[name] = columns[name]
+        return result
+    
+    @staticmethod
+    def calculate_orientation_array(latitudes, azimuths, altitudes):
+        """
+        Array version of calculate_orientation.
+        
+        Args:
+            latitudes: Observer latitudes in degrees
+            azimuths: Moon azimuths in degrees
+            altitudes: Moon altitudes in degrees
+            
+        Returns:
+            float64 array of position angles in degrees (0-360)
+        """
+        if np is None:
+            raise ImportError("NumPy is required for calculate_orientation_array")
+        
+        lat_rad = np.radians(np.asarray(latitudes, dtype=np.float64))
+        az_rad = np.radians(np.asarray(azimuths, dtype=np.float64))
+        alt_rad = np.radians(np.asarray(altitudes, dtype=np.float64))
+        
+        position_angle = np.arctan2(
+            np.cos(lat_rad) * np.sin(az_rad),
+            np.sin(lat_rad) * np.cos(alt_rad) -
+            np.cos(lat_rad) * np.sin(alt_rad) * np.cos(az_rad)
+        )
+        
+        return np.mod(np.degrees(position_angle), 360)
+
 def julian_day(date: datetime) -> float:
     """
     Convert datetime to Julian day number.
@@ -147,16 +257,33 @@ def julian_day(date: datetime) -> float:
     
     return jdn + time_fraction
 
-def get_next_phase_info(current_phase_angle: float) -> Dict[str, Any]:
+def get_next_phase_info(current_phase_angle: float, date: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Calculate when the next major lunar phase occurs.
     
+    When the current time is given and lies within the precomputed phase
+    table (1900-2100), the exact instant of the next phase is looked up.
+    Otherwise the wait is extrapolated from the phase angle assuming a
+    constant 29.53-day cycle, which can be off by more than half a day.
+    
     Args:
         current_phase_angle: Current phase angle in degrees
+        date: Current time (naive values are taken as local time)
         
     Returns:
-        Dictionary with next phase name and days until it occurs
+        Dictionary with next phase name and days until it occurs, plus its
+        ISO 8601 UTC date when looked up from the table
     """
+    if date is not None:
+        event = next_phase_event(date)
+        if event is not None:
+            now = date if date.tzinfo is not None else date.astimezone()
+            return {
+                "name": event["name"],
+                "days": (event["date"] - now).total_seconds() / 86400,
+                "date": event["date"].isoformat()
+            }
+    
     # Major lunar phases and their angles
     phase_angles = {
         "New Moon": 0,
@@ -0,0 +1,286 @@
+# utils/phase_table.py - Precomputed table of principal lunar phase instants
+
+import bisect
+import os
+import struct
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+# Principal phases in the order they occur; kind k is at elongation 90 * k
+PHASE_EVENT_NAMES = ("New Moon", "First Quarter", "Full Moon", "Last Quarter")
+
+# Table bundled with the app (rebuild with `python -m utils.phase_table`)
+DEFAULT_TABLE_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   os.pardir, "resources", "phase_events.bin"))
+
+# File layout (little-endian): header, then one float64 Julian day (UT) per
+# event. Events strictly alternate New -> First Quarter -> Full -> Last
+# Quarter, so only the kind of the first one is stored.
+_MAGIC = b"LPHS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")  # magic, version, kind of first event, event count
+
+_UNIX_EPOCH_JD = 2440587.5
+_MEAN_NEW_MOON_J2000 = 2451550.09766  # Meeus 49.1, k = 0
+_SYNODIC_MONTH = 29.530588861
+
+def _to_jd(date: datetime) -> float:
+    """Convert a datetime (naive = local time, like datetime.now()) to a UT Julian day."""
+    return _UNIX_EPOCH_JD + date.timestamp() / 86400.0
+
+def _from_jd(jd: float) -> datetime:
+    """Convert a UT Julian day to an aware UTC datetime."""
+    return datetime.fromtimestamp((jd - _UNIX_EPOCH_JD) * 86400.0, tz=timezone.utc)
+
+def solve_phase_events(start_year: int, end_year: int, tolerance: float = 1e-6) -> Tuple[array, int]:
+    """
+    Solve for every principal phase instant between two years.
+
+    Each event starts from its mean time (Meeus ch. 49) and is refined by
+    the secant method on the apparent geocentric elongation from
+    utils.ephemeris until it is 90 * k degrees.
+
+    Args:
+        start_year: First year covered (from January 1)
+        end_year: Last year covered (through December 31)
+        tolerance: Convergence threshold in days (1e-6 days is ~0.1 s)
+
+    Returns:
+        Tuple of (sorted UT Julian days, kind of the first event)
+    """
+    # Imported here: utils.ephemeris depends on utils.lunar_math, which
+    # imports this module for its lookups
+    from utils.ephemeris import jd_to_tt, moon_ecliptic, sun_ecliptic
+
+    def elongation(jd_ut: float) -> float:
+        T = (jd_to_tt(jd_ut) - 2451545.0) / 36525.0
+        # Nutation cancels in the difference; the Sun keeps its aberration
+        return moon_ecliptic(T)[0] - sun_ecliptic(T)[0] + 0.005691611
+
+    def residual(jd_ut: float, target: float) -> float:
+        return (elongation(jd_ut) - target + 180) % 360 - 180
+
+    first_jd = _to_jd(datetime(start_year, 1, 1, tzinfo=timezone.utc))
+    last_jd = _to_jd(datetime(end_year + 1, 1, 1, tzinfo=timezone.utc))
+
+    jds = array("d")
+    first_kind = None
+    quarter = int((first_jd - _MEAN_NEW_MOON_J2000) / _SYNODIC_MONTH * 4) - 4
+    while True:
+        kind = quarter % 4
+        target = 90.0 * kind
+
+        # Secant iteration from the mean phase time and a point a few hours later
+        x0 = _MEAN_NEW_MOON_J2000 + _SYNODIC_MONTH * quarter / 4
+        x1 = x0 + 0.25
+        f0 = residual(x0, target)
+        f1 = residual(x1, target)
+        for _ in range(50):
+            if f1 == f0:
+                break
+            x0, x1 = x1, x1 - f1 * (x1 - x0) / (f1 - f0)
+            f0, f1 = f1, residual(x1, target)
+            if abs(x1 - x0) < tolerance:
+                break
+
+        quarter += 1
+        if x1 < first_jd:
+            continue
+        if x1 >= last_jd:
+            break
+        if first_kind is None:
+            first_kind = kind
+        jds.append(x1)
+
+    return jds, first_kind
+
+class PhaseTable:
+    """Sorted principal phase instants with O(log n) next/previous lookups."""
+
+    def __init__(self, jds: array, first_kind: int):
+        """
+        Wrap a solved event table.
+
+        Args:
+            jds: Sorted UT Julian days of consecutive principal phases
+            first_kind: Index into PHASE_EVENT_NAMES of the first event
+        """
+        self.jds = jds
+        self.first_kind = first_kind
+
+    @classmethod
+    def build(cls, start_year: int = 1900, end_year: int = 2100) -> "PhaseTable":
+        """
+        Solve a new table (takes a few seconds per century).
+
+        Args:
+            start_year: First year covered
+            end_year: Last year covered
+
+        Returns:
+            PhaseTable instance
+        """
+        return cls(*solve_phase_events(start_year, end_year))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABLE_PATH) -> "PhaseTable":
+        """
+        Read a table written by save.
+
+        Args:
+            path: Table file
+
+        Returns:
+            PhaseTable instance
+
+        Raises:
+            ValueError: If the file is not a phase table
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, version, first_kind, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a phase event table: {path}")
+
+        jds = array("d")
+        jds.frombytes(data[_HEADER.size:_HEADER.size + count * 8])
+        if jds.itemsize != 8 or len(jds) != count:
+            raise ValueError(f"Truncated phase event table: {path}")
+        return cls(jds, first_kind)
+
+    def save(self, path: str = DEFAULT_TABLE_PATH) -> None:
+        """
+        Write the table to a file (written aside, then moved into place).
+
+        Args:
+            path: Table file
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.first_kind, len(self.jds)))
+            f.write(self.jds.tobytes())
+        os.replace(tmp_path, path)
+
+    def _event(self, index: int) -> Dict[str, Any]:
+        jd = self.jds[index]
+        return {
+            "name": PHASE_EVENT_NAMES[(self.first_kind + index) % 4],
+            "julian_day": jd,
+            "date": _from_jd(jd)
+        }
+
+    def covers(self, jd: float) -> bool:
+        """Whether jd lies within the table, so both neighbouring events are known."""
+        return len(self.jds) > 0 and self.jds[0] <= jd < self.jds[-1]
+
+    def next_event(self, jd: float) -> Optional[Dict[str, Any]]:
+        """
+        First principal phase strictly after jd.
+
+        Args:
+            jd: Julian day (UT)
+
+        Returns:
+            Dictionary with name, julian_day and date (UTC), or None past the table
+        """
+        index = bisect.bisect_right(self.jds, jd)
+        return self._event(index) if index < len(self.jds) else None
+
+    def previous_event(self, jd: float) -> Optional[Dict[str, Any]]:
+        """
+        Last principal phase at or before jd.
+
+        Args:
+            jd: Julian day (UT)
+
+        Returns:
+            Dictionary with name, julian_day and date (UTC), or None before the table
+        """
+        index = bisect.bisect_right(self.jds, jd) - 1
+        return self._event(index) if index >= 0 else None
+
+    def events_between(self, start_jd: float, end_jd: float) -> List[Dict[str, Any]]:
+        """
+        All principal phases in [start_jd, end_jd).
+
+        Args:
+            start_jd: First Julian day (UT)
+            end_jd: End Julian day (UT), exclusive
+
+        Returns:
+            List of event dictionaries in time order
+        """
+        first = bisect.bisect_left(self.jds, start_jd)
+        last = bisect.bisect_left(self.jds, end_jd)
+        return [self._event(index) for index in range(first, last)]
+
+_table: Optional[PhaseTable] = None
+_table_lock = threading.Lock()
+
+def get_phase_table() -> Optional[PhaseTable]:
+    """
+    The bundled phase table, loaded on first use.
+
+    Returns:
+        PhaseTable, or None if the bundled file is missing or unreadable
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                try:
+                    _table = PhaseTable.load(DEFAULT_TABLE_PATH)
+                except (OSError, ValueError, struct.error):
+                    return None
+    return _table
+
+def next_phase_event(date: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Next principal phase after a moment, from the bundled table.
+
+    Args:
+        date: Moment to search from (naive values are taken as local time)
+
+    Returns:
+        Event dictionary, or None if the moment is outside the table
+    """
+    table = get_phase_table()
+    jd = _to_jd(date)
+    if table is None or not table.covers(jd):
+        return None
+    return table.next_event(jd)
+
+def previous_phase_event(date: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Most recent principal phase at or before a moment, from the bundled table.
+
+    Args:
+        date: Moment to search from (naive values are taken as local time)
+
+    Returns:
+        Event dictionary, or None if the moment is outside the table
+    """
+    table = get_phase_table()
+    jd = _to_jd(date)
+    if table is None or not table.covers(jd):
+        return None
+    return table.previous_event(jd)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Solve principal lunar phase instants into a binary table.")
+    parser.add_argument("--start", type=int, default=1900, help="first year covered")
+    parser.add_argument("--end", type=int, default=2100, help="last year covered")
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH, help="table file to write")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = PhaseTable.build(args.start, args.end)
+    table.save(args.output)
+    print(f"Solved {len(table.jds)} phase events for {args.start}-{args.end} "
+          f"in {time.perf_counter() - started:.1f}s -> {args.output}")
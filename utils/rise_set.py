@@ -0,0 +1,168 @@
+# utils/rise_set.py - Batched moonrise, moonset and transit solver
+
+import math
+from typing import Dict
+
+import numpy as np
+
+from utils.ephemeris_batch import ArrayLike, geocentric_batch, to_julian_days, topocentric_batch
+
+MOON_RADIUS_KM = 1737.4
+HORIZON_REFRACTION = 0.5667  # Standard refraction at the horizon in degrees (34')
+
+# Event kinds solved together in one refinement pass
+_RISE, _SET, _TRANSIT = 0, 1, 2
+
+SIDEREAL_RATE = 360.98564736629  # Degrees of sidereal time per day
+
+class _GeocentricGrid:
+    """
+    Geocentric lunar state tabulated on whole UTC hours and linearly interpolated.
+
+    The Moon's geocentric position is smooth enough that hourly samples
+    interpolate to ~1e-4 degrees (well under a second of rise time), and it
+    is the same for every observer, so the expensive series is evaluated
+    once per hour instead of once per observer and bisection step. Only the
+    hours the requested days actually touch are tabulated.
+    """
+
+    def __init__(self, starts: np.ndarray, span_days: float):
+        first_hours = np.floor(starts.ravel() * 24.0).astype(np.int64)
+        hours = np.unique(first_hours[:, None] + np.arange(int(math.ceil(span_days * 24)) + 2))
+        self.jd = hours / 24.0
+
+        geo = geocentric_batch(self.jd)
+        self.right_ascension = np.unwrap(geo["right_ascension"], period=360.0)
+        self.declination = geo["declination"]
+        self.distance_km = geo["distance_km"]
+        # Apparent sidereal time minus its uniform part (nutation only)
+        self.sidereal_offset = np.unwrap(geo["sidereal_time"] - SIDEREAL_RATE * (self.jd - 2451545.0),
+                                         period=360.0)
+
+    def __call__(self, jd: np.ndarray) -> Dict[str, np.ndarray]:
+        """Interpolated state, keyed like utils.ephemeris_batch.geocentric_batch."""
+        return {
+            "right_ascension": np.mod(np.interp(jd, self.jd, self.right_ascension), 360.0),
+            "declination": np.interp(jd, self.jd, self.declination),
+            "distance_km": np.interp(jd, self.jd, self.distance_km),
+            "sidereal_time": np.mod(np.interp(jd, self.jd, self.sidereal_offset)
+                                    + SIDEREAL_RATE * (jd - 2451545.0), 360.0)
+        }
+
+def _evaluate(grid: _GeocentricGrid, jd: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray):
+    """
+    Horizon and meridian functions whose zero crossings are the events.
+
+    Returns:
+        Tuple of (upper-limb height above the refracted horizon, hour angle
+        wrapped to [-180, 180), topocentric altitude), all in degrees
+    """
+    topo = topocentric_batch(grid(jd), latitudes, longitudes)
+    semidiameter = np.degrees(np.arcsin(MOON_RADIUS_KM / topo["distance_km"]))
+    height = topo["altitude"] + semidiameter + HORIZON_REFRACTION
+    hour_angle = np.mod(topo["hour_angle"] + 180.0, 360.0) - 180.0
+    return height, hour_angle, topo["altitude"]
+
+def _first_crossing(mask: np.ndarray):
+    """Index of the first True along the last axis, and whether there is one."""
+    return np.argmax(mask, axis=-1), mask.any(axis=-1)
+
+def solve_rise_set(latitudes: ArrayLike, longitudes: ArrayLike, days: ArrayLike,
+                   step_hours: float = 1.0, tolerance: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Moonrise, moonset and upper transit for many observers and days at once.
+
+    Each day is the observer's local mean solar day (UTC midnight shifted by
+    longitude / 15 hours). The horizon function is sampled every step_hours
+    across the day for all inputs in one vectorized pass; sign changes
+    between samples bracket the events, which are then refined together by
+    bisection until the brackets are narrower than the tolerance. Rise and
+    set refer to the upper limb touching the refracted horizon.
+
+    Events closer together than step_hours (possible only near the poles)
+    can be missed.
+
+    Args:
+        latitudes: Observer latitudes in degrees
+        longitudes: Observer longitudes in degrees (east positive)
+        days: datetime64 days (or Julian days of UTC midnight); broadcast
+            against the observers, e.g. lats[:, None] with days[None, :]
+        step_hours: Sampling interval used to bracket events
+        tolerance: Precision of the returned times in seconds
+
+    Returns:
+        Dictionary of arrays in the broadcast shape: rise, set and transit
+        as UT Julian days (NaN when the event does not happen that day),
+        transit_altitude in degrees (NaN without a transit), and boolean
+        always_up / always_down for days without rise or set
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    days = np.asarray(days)
+    if np.issubdtype(days.dtype, np.datetime64):
+        days = days.astype("datetime64[D]")
+    midnights = to_julian_days(days)
+
+    shape = np.broadcast_shapes(latitudes.shape, longitudes.shape, midnights.shape)
+    latitudes = np.broadcast_to(latitudes, shape)
+    longitudes = np.broadcast_to(longitudes, shape)
+    starts = np.broadcast_to(midnights, shape) - longitudes / 360.0
+
+    # Sample the day (both ends included) along a trailing axis
+    samples = int(math.ceil(24.0 / step_hours))
+    offsets = np.linspace(0.0, 1.0, samples + 1)
+    times = starts[..., None] + offsets
+    grid = _GeocentricGrid(starts, 1.0)
+    height, hour_angle, _ = _evaluate(grid, times, latitudes[..., None], longitudes[..., None])
+
+    rising = (height[..., :-1] < 0) & (height[..., 1:] >= 0)
+    setting = (height[..., :-1] >= 0) & (height[..., 1:] < 0)
+    # Hour angle passing 0 upwards; the jump from +180 to -180 is the lower transit
+    transiting = (hour_angle[..., :-1] < 0) & (hour_angle[..., 1:] >= 0)
+
+    # Gather every bracket of every kind into flat arrays
+    kinds, flat_index, lows = [], [], []
+    for kind, mask in ((_RISE, rising), (_SET, setting), (_TRANSIT, transiting)):
+        first, found = _first_crossing(mask)
+        index = np.flatnonzero(found)
+        kinds.append(np.full(index.size, kind))
+        flat_index.append(index)
+        lows.append(starts.ravel()[index] + offsets[first.ravel()[index]])
+
+    kinds = np.concatenate(kinds)
+    flat_index = np.concatenate(flat_index)
+    low = np.concatenate(lows)
+    high = low + offsets[1]
+    bracket_latitudes = latitudes.ravel()[flat_index]
+    bracket_longitudes = longitudes.ravel()[flat_index]
+
+    # Orient each function so it is negative at the low end of its bracket
+    sign = np.where(kinds == _SET, -1.0, 1.0)
+    iterations = max(1, int(math.ceil(math.log2(offsets[1] * 86400.0 / tolerance))))
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        mid_height, mid_hour_angle, _ = _evaluate(grid, middle, bracket_latitudes, bracket_longitudes)
+        value = np.where(kinds == _TRANSIT, mid_hour_angle, mid_height) * sign
+        below = value < 0
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+    roots = (low + high) / 2
+
+    result = {}
+    for name, kind in (("rise", _RISE), ("set", _SET), ("transit", _TRANSIT)):
+        values = np.full(int(np.prod(shape)), np.nan)
+        selected = kinds == kind
+        values[flat_index[selected]] = roots[selected]
+        result[name] = values.reshape(shape)
+
+    transit_altitude = np.full(int(np.prod(shape)), np.nan)
+    transits = kinds == _TRANSIT
+    if transits.any():
+        _, _, altitude = _evaluate(grid, roots[transits], bracket_latitudes[transits], bracket_longitudes[transits])
+        transit_altitude[flat_index[transits]] = altitude
+    result["transit_altitude"] = transit_altitude.reshape(shape)
+
+    no_crossing = ~rising.any(axis=-1) & ~setting.any(axis=-1)
+    result["always_up"] = no_crossing & (height[..., 0] >= 0)
+    result["always_down"] = no_crossing & (height[..., 0] < 0)
+    return result
@@ -1,6 +1,15 @@
 // utils/script.js - Frontend JavaScript for Lunar Phase Calculator
 
 let currentData = null;
+let suggestTimer = null;
+let suggestController = null;
+let liveFeed = null;
+
+// Grid /moon-image.png snaps its parameters to (config.py: MOON_ATLAS_PHASES,
+// MOON_ATLAS_ROTATIONS and MOON_IMAGE_LIBRATION_STEP)
+const MOON_IMAGE_ELONGATION_STEP = 5;
+const MOON_IMAGE_POSITION_ANGLE_STEP = 15;
+const MOON_IMAGE_LIBRATION_STEP = 0.25;
 
 /**
  * Initialize the application when the page loads
@@ -52,13 +61,62 @@ function setupEventListeners() {
         }
     });
     
-    // Add input validation and auto-suggestions in future
+    // Validate input and offer suggestions from the offline gazetteer
     document.getElementById('locationInput').addEventListener('input', function(e) {
-        // Could add live search suggestions here
         validateLocationInput(e.target.value);
+        scheduleLocationSuggestions(e.target.value);
     });
 }
 
+/**
+ * Debounce suggestion requests while the user is typing
+ */
+function scheduleLocationSuggestions(value) {
+    clearTimeout(suggestTimer);
+    suggestTimer = setTimeout(function() {
+        fetchLocationSuggestions(value.trim());
+    }, 120);
+}
+
+/**
+ * Fill the location datalist with gazetteer matches for the typed prefix
+ */
+async function fetchLocationSuggestions(query) {
+    const datalist = document.getElementById('locationSuggestions');
+
+    if (query.length < 2) {
+        datalist.innerHTML = '';
+        return;
+    }
+
+    // Drop the answer to a previous, now outdated prefix
+    if (suggestController) {
+        suggestController.abort();
+    }
+    suggestController = new AbortController();
+
+    try {
+        const response = await fetch(`/locations/suggest?q=${encodeURIComponent(query)}`, {
+            signal: suggestController.signal
+        });
+        if (!response.ok) {
+            return;
+        }
+
+        const data = await response.json();
+        datalist.innerHTML = '';
+        data.suggestions.forEach(function(suggestion) {
+            const option = document.createElement('option');
+            option.value = suggestion.name;
+            datalist.appendChild(option);
+        });
+    } catch (err) {
+        if (err.name !== 'AbortError') {
+            console.log('Location suggestions unavailable:', err.message);
+        }
+    }
+}
+
 /**
  * Validate location input (basic validation for now)
  */
@@ -102,6 +160,7 @@ async function fetchLunarData() {
         
         displayLunarData(currentData);
         showContent();
+        startLiveFeed(currentData.observer);
         
     } catch (err) {
         console.error('Error fetching lunar data:', err);
@@ -111,6 +170,28 @@ async function fetchLunarData() {
     }
 }
 
+/**
+ * Keep the position and orientation current with server-pushed updates
+ */
+function startLiveFeed(observer) {
+    if (liveFeed) {
+        liveFeed.close();
+        liveFeed = null;
+    }
+    if (!window.EventSource) {
+        return;
+    }
+    
+    liveFeed = new EventSource(`/lunar-data/live?lat=${observer.latitude}&lon=${observer.longitude}`);
+    liveFeed.addEventListener('position', function(event) {
+        const update = JSON.parse(event.data);
+        currentData.position = { ...currentData.position, ...update.position };
+        currentData.orientation = { ...currentData.orientation, ...update.orientation };
+        displayMoonImage(currentData);
+        displayDataSections(currentData);
+    });
+}
+
 /**
  * Display the fetched lunar data in the UI
  */
@@ -126,19 +207,28 @@ function displayLunarData(data) {
  */
 function displayMoonImage(data) {
     const moonImg = document.getElementById('moonImg');
-    const moonImage = document.getElementById('moonImage');
     
-    // For now, just use the default moon.png
-    // In future, this will call render.js to create custom moon phase image
-    moonImg.src = '/static/moon.png';
+    // Rendered server-side for the current phase, orientation and libration. The values are
+    // rounded to the server's grid so nearby updates ask for the same URL, and so the same
+    // (browser-cached) image, as the server would pick for them anyway.
+    const snap = (value, step) => Math.round(value / step) * step;
+    const snapAngle = (value, step) => ((snap(value, step) % 360) + 360) % 360;
+    const params = new URLSearchParams({
+        elongation: snapAngle(data.phase.angle, MOON_IMAGE_ELONGATION_STEP).toString(),
+        position_angle: snapAngle(data.orientation ? data.orientation.position_angle : 0,
+                                  MOON_IMAGE_POSITION_ANGLE_STEP).toString(),
+        libration_longitude: snap(data.libration.longitude, MOON_IMAGE_LIBRATION_STEP).toString(),
+        libration_latitude: snap(data.libration.latitude, MOON_IMAGE_LIBRATION_STEP).toString()
+    });
+    const src = `/moon-image.png?${params}`;
+    if (moonImg.getAttribute('src') !== src) {
+        moonImg.onerror = function() {
+            moonImg.onerror = null;
+            moonImg.src = '/static/moon.png';
+        };
+        moonImg.src = src;
+    }
     moonImg.alt = `${data.phase.name} - ${data.phase.illumination.toFixed(1)}% illuminated`;
-    
-    // Add visual indicators for phase
-    moonImage.style.filter = `brightness(${0.7 + (data.phase.illumination / 100) * 0.5})`;
-    
-    // Apply libration rotation effect (subtle visual indication)
-    const rotationAngle = data.libration.total * 2; // Amplify for visibility
-    moonImg.style.transform = `rotate(${rotationAngle}deg)`;
 }
 
 /**
@@ -171,6 +261,22 @@ function displayLibrationInfo(data) {
     `;
 }
 
+/**
+ * Format a moonrise/moonset timestamp in the browser's local time
+ */
+function formatRiseSetTime(riseSet, timestamp) {
+    if (timestamp) {
+        return new Date(timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+    }
+    if (riseSet.always_up) {
+        return "Up all day";
+    }
+    if (riseSet.always_down) {
+        return "Down all day";
+    }
+    return "None today";
+}
+
 /**
  * Create and display all data sections
  */
@@ -197,6 +303,8 @@ function displayDataSections(data) {
                     value: data.position.altitude > 0 ? "Above Horizon ✅" : "Below Horizon ❌" 
                 },
                 { label: "Altitude", value: `${data.position.altitude.toFixed(2)}°` },
+                { label: "Moonrise", value: formatRiseSetTime(data.rise_set, data.rise_set.rise) },
+                { label: "Moonset", value: formatRiseSetTime(data.rise_set, data.rise_set.set) },
                 { 
                     label: "Next Phase", 
                     value: `${data.next_phase.name} in ${data.next_phase.days.toFixed(1)} days` 